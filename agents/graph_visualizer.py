@@ -215,6 +215,8 @@ def create_ego_graph(
     graph: RelationGraph,
     entity_id: str,
     depth: int = 2,
+    direction: str = "both",
+    max_nodes: Optional[int] = None,
     **kwargs
 ) -> go.Figure:
     """
@@ -224,12 +226,14 @@ def create_ego_graph(
         graph: Le graphe complet
         entity_id: ID de l'entité centrale
         depth: Profondeur du sous-graphe
+        direction: Arêtes suivies ("out", "in" ou "both")
+        max_nodes: Nombre maximal d'entités affichées (None = illimité)
         **kwargs: Arguments additionnels pour create_interactive_graph
     
     Returns:
         Figure Plotly du graphe ego
     """
-    subgraph = graph.get_subgraph([entity_id], depth=depth)
+    subgraph = graph.get_subgraph([entity_id], depth=depth, direction=direction, max_nodes=max_nodes)
     
     # Titre personnalisé
     entity = graph.get_entity(entity_id)
@@ -0,0 +1,567 @@
+"""Asyncio-native Notion client and context fetcher.
+
+Many pages and databases can be fetched on one event loop instead of one
+blocking ``requests`` call (or one thread) per request. ``SyncNotionClient``
+exposes the same client behind the synchronous ``NotionClientProtocol`` so
+the Streamlit and CLI callers keep working unchanged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+from agents.notion_context_fetcher import (
+    DirectNotionClient,
+    NotionClientUnavailable,
+    NotionContextFetcher,
+    NotionPageContent,
+    NotionPagePreview,
+)
+from agents.notion_block_writer import MAX_BLOCKS_PER_REQUEST, PartialPageError, iter_batches
+from config.context_cache import context_cache
+from config.notion_disk_cache import notion_disk_cache
+from config.notion_rate_limiter import NotionRateLimiter, current_priority, notion_priority, notion_rate_limiter
+from config.notion_transport import IDEMPOTENT_METHODS
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AsyncNotionClient:
+    """Notion REST client built on ``httpx.AsyncClient``.
+
+    Mirrors ``DirectNotionClient`` (same caps, same markdown rendering) but
+    every method is a coroutine, and block trees are walked breadth-first with
+    ``asyncio.gather`` bounded by a semaphore. Requests share the process-wide
+    ``notion_rate_limiter`` with the synchronous callers.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://api.notion.com/v1",
+        headers: Optional[Dict[str, str]] = None,
+        max_concurrency: Optional[int] = None,
+        transport: Any = None,
+        rate_limiter: Optional[NotionRateLimiter] = None,
+    ) -> None:
+        import httpx  # noqa: F401 - fail early when the dependency is missing
+        from config.notion_config import NotionConfig
+
+        self.headers = headers or NotionConfig.get_direct_headers()
+        self.base_url = base_url.rstrip("/")
+        self.request_timeout = float(os.getenv("NOTION_REQUEST_TIMEOUT", "20"))
+        self.max_records = int(os.getenv("NOTION_MAX_RECORDS", "200"))
+        self.page_size = int(os.getenv("NOTION_PAGE_SIZE", "50"))
+        self.max_concurrency = max(1, int(max_concurrency or os.getenv("NOTION_BLOCK_CONCURRENCY", "8")))
+        self.max_retries = 3
+        self.backoff_factor = 0.8
+        self.rate_limiter = rate_limiter or notion_rate_limiter
+        # Optional httpx transport (tests inject ``httpx.MockTransport``)
+        self._transport = transport
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _get_client(self):
+        """Create the ``httpx.AsyncClient`` lazily, on the running loop."""
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.request_timeout,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=max(10, self.max_concurrency)),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    async def __aenter__(self) -> "AsyncNotionClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _request(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs):
+        """Send a request through the rate limiter, retrying 429/5xx.
+
+        A 429 is reported to the shared limiter, which pauses every caller for
+        ``Retry-After``; 5xx responses are retried with exponential backoff,
+        for idempotent requests only (GET/DELETE, or ``idempotent=True`` for a
+        database query): a replayed page creation or block append duplicates it.
+        """
+        client = self._get_client()
+        assert self._semaphore is not None
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else (429,)
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self.rate_limiter.acquire_async()
+                response = await client.request(method, url, **kwargs)
+            throttled = self.rate_limiter.observe(response)
+            if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            LOGGER.debug("[Notion async] %s %s -> %s, retry %s", method, url, response.status_code, attempt)
+            if not throttled:
+                await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    async def iter_pages(
+        self,
+        database_id: str,
+        filter: Optional[Dict[str, Any]] = None,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        filter_properties: Optional[Sequence[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the pages of a database lazily (no record cap), batch by batch."""
+        url = f"{self.base_url}/databases/{database_id}/query"
+        params = {"filter_properties": list(filter_properties)} if filter_properties else None
+        start_cursor = None
+        while True:
+            payload: Dict[str, Any] = {"page_size": page_size or self.page_size}
+            if filter:
+                payload["filter"] = filter
+            if sorts:
+                payload["sorts"] = sorts
+            if start_cursor:
+                payload["start_cursor"] = start_cursor
+            response = await self._request("POST", url, params=params, json=payload, idempotent=True)
+            response.raise_for_status()
+            data = response.json()
+            for record in data.get("results", []):
+                yield record
+            start_cursor = data.get("next_cursor")
+            if not data.get("has_more") or not start_cursor:
+                return
+
+    async def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        """Query database pages, capped at ``NOTION_MAX_RECORDS`` (see ``iter_pages``)."""
+        LOGGER.info("[Notion async] list_pages start | db=%s", database_id)
+        results: List[Dict[str, Any]] = []
+        pages = self.iter_pages(database_id)
+        try:
+            async for record in pages:
+                if len(results) >= self.max_records:
+                    LOGGER.warning(
+                        "[Notion async] list_pages truncated to NOTION_MAX_RECORDS=%s | db=%s",
+                        self.max_records,
+                        database_id,
+                    )
+                    break
+                results.append(record)
+        finally:
+            await pages.aclose()
+        LOGGER.info("[Notion async] list_pages done | db=%s total=%s", database_id, len(results))
+        return results
+
+    async def list_pages_edited_since(self, database_id: str, since: str) -> List[Dict[str, Any]]:
+        """Query pages edited on or after ``since``, newest first (incremental sync)."""
+        results: List[Dict[str, Any]] = []
+        pages = self.iter_pages(
+            database_id,
+            filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}},
+            sorts=[{"timestamp": "last_edited_time", "direction": "descending"}],
+        )
+        try:
+            async for record in pages:
+                if (record.get("last_edited_time") or "") < since:
+                    break
+                results.append(record)
+        finally:
+            await pages.aclose()
+        return results
+
+    async def list_page_ids(self, database_id: str) -> List[str]:
+        """Return the id of every page of a database (title property only)."""
+        return [
+            record["id"]
+            async for record in self.iter_pages(database_id, filter_properties=["title"], page_size=100)
+            if record.get("id")
+        ]
+
+    async def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        """Retrieve a single page."""
+        response = await self._request("GET", f"{self.base_url}/pages/{page_id}")
+        response.raise_for_status()
+        return response.json()
+
+    async def retrieve_page_content(self, page_id: str) -> str:
+        """Retrieve page content blocks, level by level, and render them as markdown."""
+        children_by_parent = await self.fetch_block_tree(page_id)
+        return "\n".join(DirectNotionClient.render_block_tree(page_id, children_by_parent))
+
+    async def fetch_block_tree(self, root_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Return ``{parent_id: [child blocks]}`` for the whole tree under ``root_id``."""
+        children_by_parent: Dict[str, List[Dict[str, Any]]] = {}
+        frontier: List[str] = [root_id]
+        seen = {root_id}
+        while frontier:
+            fetched = await asyncio.gather(*(self._fetch_block_children(block_id) for block_id in frontier))
+            next_frontier: List[str] = []
+            for parent_id, blocks in zip(frontier, fetched):
+                children_by_parent[parent_id] = blocks
+                for block in blocks:
+                    child_id = block.get("id")
+                    if block.get("has_children") and child_id and child_id not in seen:
+                        seen.add(child_id)
+                        next_frontier.append(child_id)
+            frontier = next_frontier
+        return children_by_parent
+
+    async def _fetch_block_children(self, block_id: str) -> List[Dict[str, Any]]:
+        """Fetch every child of a block, following ``has_more``/``next_cursor``."""
+        url = f"{self.base_url}/blocks/{block_id}/children"
+        blocks: List[Dict[str, Any]] = []
+        start_cursor: Optional[str] = None
+        try:
+            while True:
+                params: Dict[str, Any] = {"page_size": 100}
+                if start_cursor:
+                    params["start_cursor"] = start_cursor
+                response = await self._request("GET", url, params=params)
+                response.raise_for_status()
+                data = response.json()
+                blocks.extend(data.get("results", []))
+                start_cursor = data.get("next_cursor")
+                if not data.get("has_more") or not start_cursor:
+                    break
+        except Exception as e:
+            LOGGER.debug(f"Failed to fetch children for block {block_id}: {e}")
+        return blocks
+
+    async def create_page(
+        self,
+        database_id: str,
+        properties: Dict[str, Any],
+        children: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Create a page in a database (sandbox databases only).
+
+        The first 100 blocks go with the creation, the rest is appended in
+        ordered batches (see ``notion_block_writer.create_page_with_blocks``);
+        a failed batch raises ``PartialPageError`` naming the created page.
+        """
+        from config.notion_config import NotionConfig
+
+        NotionConfig.assert_sandbox_database_id(database_id.replace("-", ""))
+        blocks = list(children or [])
+        payload: Dict[str, Any] = {
+            "parent": {"database_id": database_id},
+            "properties": properties,
+        }
+        if blocks:
+            payload["children"] = blocks[:MAX_BLOCKS_PER_REQUEST]
+        response = await self._request("POST", f"{self.base_url}/pages", json=payload)
+        response.raise_for_status()
+        page = response.json()
+        written = len(payload.get("children", []))
+        try:
+            for batch in iter_batches(blocks[MAX_BLOCKS_PER_REQUEST:]):
+                response = await self._request(
+                    "PATCH", f"{self.base_url}/blocks/{page['id']}/children", json={"children": list(batch)}
+                )
+                response.raise_for_status()
+                written += len(batch)
+        except Exception as exc:
+            raise PartialPageError(page, written, len(blocks)) from exc
+        return page
+
+
+class SyncNotionClient:
+    """Synchronous facade over ``AsyncNotionClient`` (``NotionClientProtocol``).
+
+    Coroutines run on a private event loop owned by a daemon thread, so the
+    facade can be called from Streamlit reruns, the CLI or worker threads.
+    """
+
+    def __init__(self, async_client: Optional[AsyncNotionClient] = None, timeout: Optional[float] = None) -> None:
+        self.async_client = async_client or AsyncNotionClient()
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="notion-async-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self, coro: Awaitable[T]) -> T:
+        # The loop thread has its own context: carry the caller's request priority over
+        future = asyncio.run_coroutine_threadsafe(_with_priority(coro, current_priority()), self._loop)
+        return future.result(self.timeout)
+
+    def iter_pages(self, database_id: str, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        pages = self.async_client.iter_pages(database_id, **kwargs)
+        try:
+            while True:
+                try:
+                    yield self._run(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(pages.aclose())
+
+    def list_pages(self, database_id: str) -> Sequence[Dict[str, Any]]:
+        return self._run(self.async_client.list_pages(database_id))
+
+    def list_pages_edited_since(self, database_id: str, since: str) -> List[Dict[str, Any]]:
+        return self._run(self.async_client.list_pages_edited_since(database_id, since))
+
+    def list_page_ids(self, database_id: str) -> List[str]:
+        return self._run(self.async_client.list_page_ids(database_id))
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        return self._run(self.async_client.retrieve_page(page_id))
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        return self._run(self.async_client.retrieve_page_content(page_id))
+
+    def create_page(
+        self,
+        database_id: str,
+        properties: Dict[str, Any],
+        children: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        return self._run(self.async_client.create_page(database_id, properties, children))
+
+    def close(self) -> None:
+        """Close the HTTP client and stop the background loop."""
+        if self._loop.is_closed():
+            return
+        self._run(self.async_client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+_shared_sync_client: Optional[SyncNotionClient] = None
+_shared_sync_client_lock = threading.Lock()
+
+
+def shared_sync_client() -> SyncNotionClient:
+    """Process-wide ``SyncNotionClient`` (one loop thread, one connection pool).
+
+    Fetchers are created per generation; each owning a facade would leak a
+    thread and an ``httpx`` client per run. Closed at interpreter exit.
+    """
+    global _shared_sync_client
+    with _shared_sync_client_lock:
+        if _shared_sync_client is None:
+            _shared_sync_client = SyncNotionClient()
+            atexit.register(_shared_sync_client.close)
+        return _shared_sync_client
+
+
+async def _with_priority(coro: Awaitable[T], priority) -> T:
+    with notion_priority(priority):
+        return await coro
+
+
+class _PrefetchedRecordClient:
+    """Client stub used for record conversion: content is always prefetched."""
+
+    def list_pages(self, database_id: str) -> Sequence[Dict[str, Any]]:
+        return []
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        raise NotionClientUnavailable("Record conversion must not trigger network calls.")
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        return ""
+
+
+class AsyncNotionContextFetcher:
+    """Async counterpart of ``NotionContextFetcher`` sharing its cache and formatting."""
+
+    SANDBOX_DATABASES = NotionContextFetcher.SANDBOX_DATABASES
+
+    def __init__(self, client: Optional[AsyncNotionClient] = None) -> None:
+        self.client = client or self._build_default_client()
+        # Pure conversion/formatting helpers are reused from the sync fetcher
+        self._converter = NotionContextFetcher(client=_PrefetchedRecordClient())
+
+    @staticmethod
+    def _build_default_client() -> Optional[AsyncNotionClient]:
+        from config.notion_config import NotionConfig
+
+        if not NotionConfig.validate_token():
+            LOGGER.warning("No valid Notion token found.")
+            return None
+        try:
+            return AsyncNotionClient()
+        except ImportError:
+            LOGGER.warning("httpx library not available; cannot use async client.")
+            return None
+
+    def _assert_client(self) -> AsyncNotionClient:
+        if self.client is None:
+            raise NotionClientUnavailable(
+                "No async Notion client available. Provide a client when instantiating AsyncNotionContextFetcher."
+            )
+        return self.client
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def fetch_all_databases(self, force_refresh: bool = False, lightweight: bool = True) -> Dict[str, List[NotionPagePreview]]:
+        """Return previews grouped by domain, listing every database concurrently."""
+
+        domains = list(self.SANDBOX_DATABASES.items())
+        listings = await asyncio.gather(
+            *(self._fetch_domain(domain, database_id, force_refresh, lightweight) for domain, database_id in domains)
+        )
+        return {domain: previews for (domain, _), previews in zip(domains, listings)}
+
+    async def fetch_page_preview(self, page_id: str, domain: Optional[str] = None, force_refresh: bool = False) -> NotionPagePreview:
+        """Return a cached or freshly retrieved preview for a page."""
+
+        if not force_refresh:
+            cached = context_cache.get("preview", page_id)
+            if cached is not None:
+                return cached
+
+        record, content = await self._retrieve_page_and_content(page_id)
+        detected_domain = domain or record.get("domain") or "inconnu"
+        preview = self._converter._record_to_preview({**record, "content": content}, detected_domain, eager_content=True)
+        context_cache.set("preview", page_id, preview)
+        return preview
+
+    async def fetch_page_full(self, page_id: str, domain: Optional[str] = None, force_refresh: bool = False) -> NotionPageContent:
+        """Return the full payload; metadata and blocks are fetched concurrently."""
+
+        if not force_refresh:
+            cached = context_cache.get("full", page_id)
+            if cached is not None:
+                return cached
+
+        record, content = await self._retrieve_page_and_content(page_id)
+        detected_domain = domain or record.get("domain") or "inconnu"
+        preview = self._converter._record_to_preview(record, detected_domain)
+        payload = NotionPageContent(
+            **preview.__dict__,
+            content=record.get("content") or content,
+            properties=record.get("properties", {}),
+        )
+        context_cache.set("full", page_id, payload)
+        return payload
+
+    def format_context_for_llm(self, pages: Iterable[NotionPageContent], compact: bool = True) -> str:
+        """Create a deterministic prompt fragment from selected pages."""
+        return self._converter.format_context_for_llm(pages, compact=compact)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _fetch_domain(
+        self,
+        domain: str,
+        database_id: Optional[str],
+        force_refresh: bool,
+        lightweight: bool,
+    ) -> List[NotionPagePreview]:
+        if not database_id:
+            return []
+        cache_key = f"{domain}:{database_id}"
+        if not force_refresh:
+            cached = context_cache.get("list", cache_key)
+            if cached is not None:
+                return cached
+
+        records = await self._sync_database_records(database_id)
+        if not lightweight:
+            contents = await asyncio.gather(
+                *(self._retrieve_content(record) for record in records)
+            )
+            records = [{**record, "content": content} for record, content in zip(records, contents)]
+        previews = [
+            self._converter._record_to_preview(record, domain, eager_content=not lightweight) for record in records
+        ]
+        context_cache.set("list", cache_key, previews)
+        context_cache.set_many(
+            "record",
+            {record["id"]: {**record, "domain": domain} for record in records if record.get("id")},
+        )
+        return previews
+
+    async def _sync_database_records(self, database_id: str) -> List[Dict[str, Any]]:
+        """Same listing as ``NotionContextFetcher._sync_database_records`` (no cap,
+        disk-tier sync state, delta queries), so both fetchers can share the
+        ``list`` cache entries."""
+        client = self._assert_client()
+        converter = self._converter
+        normalised = NotionContextFetcher._normalise_id(database_id)
+        state = notion_disk_cache.get("sync", database_id) if converter.incremental_sync else None
+        if not state or not state.get("high_water"):
+            state = {"records": {}, "high_water": "", "reconciled_at": time.time()}
+            pages = client.iter_pages(normalised)
+            NotionContextFetcher._merge_sync_records(state, [record async for record in pages])
+        else:
+            changed = await client.list_pages_edited_since(normalised, state["high_water"])
+            NotionContextFetcher._merge_sync_records(state, changed)
+            LOGGER.debug("[Notion async] delta sync | db=%s changed=%s", database_id, len(changed))
+            if time.time() - state["reconciled_at"] >= converter.reconcile_interval:
+                await self._reconcile_sync_state(normalised, database_id, state)
+
+        if converter.incremental_sync:
+            notion_disk_cache.set("sync", database_id, state)
+        return list(state["records"].values())
+
+    async def _reconcile_sync_state(self, normalised: str, database_id: str, state: Dict[str, Any]) -> None:
+        try:
+            live_ids = set(await self._assert_client().list_page_ids(normalised))
+        except Exception as e:
+            LOGGER.warning("[Notion async] sync reconciliation failed | db=%s: %s", database_id, e)
+            return
+        removed = [page_id for page_id in state["records"] if page_id not in live_ids]
+        for page_id in removed:
+            del state["records"][page_id]
+        state["reconciled_at"] = time.time()
+
+    async def _retrieve_content(self, record: Dict[str, Any]) -> str:
+        if record.get("content"):
+            return record["content"]
+        page_id = record.get("id")
+        if not page_id:
+            return ""
+        return await self._assert_client().retrieve_page_content(NotionContextFetcher._normalise_id(page_id))
+
+    async def _retrieve_page_and_content(self, page_id: str) -> tuple[Dict[str, Any], str]:
+        client = self._assert_client()
+        normalised = NotionContextFetcher._normalise_id(page_id)
+        record, content = await asyncio.gather(
+            client.retrieve_page(normalised),
+            client.retrieve_page_content(normalised),
+        )
+        return record, content
+
+
+__all__ = [
+    "AsyncNotionClient",
+    "AsyncNotionContextFetcher",
+    "SyncNotionClient",
+    "shared_sync_client",
+]
@@ -0,0 +1,207 @@
+"""
+Conversion Markdown → blocs Notion et écriture par lots
+
+L'API Notion impose trois limites à l'export d'une fiche :
+- 2000 caractères par segment de rich text (les segments d'un même bloc
+  sont concaténés à l'affichage, on découpe donc sans perte) ;
+- 100 segments de rich text par bloc (au-delà, le paragraphe continue dans
+  un bloc suivant du même type) ;
+- 100 blocs par requête (création de page ou ``PATCH /blocks/{id}/children``).
+
+``create_page_with_blocks`` envoie le premier lot avec la création de la page
+puis ajoute les lots suivants dans l'ordre, chacun passant par le transport
+partagé (et donc par le rate limiter).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from config.notion_rate_limiter import RequestPriority
+from config.notion_transport import NotionTransport, notion_transport
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 2000
+MAX_RICH_TEXT_SEGMENTS = 100
+MAX_BLOCKS_PER_REQUEST = 100
+
+_LINE_PREFIXES: Tuple[Tuple[str, str], ...] = (
+    ("### ", "heading_3"),
+    ("## ", "heading_2"),
+    ("# ", "heading_1"),
+    ("- ", "bulleted_list_item"),
+)
+
+
+class PartialPageError(RuntimeError):
+    """La page a été créée mais un lot de blocs suivant a échoué.
+
+    Porte l'id et l'URL de la page déjà présente dans Notion et le nombre de
+    blocs écrits, pour que l'appelant signale (ou complète) la page partielle
+    au lieu d'en créer une seconde copie.
+    """
+
+    def __init__(self, page: Mapping[str, Any], blocks_written: int, total_blocks: int) -> None:
+        self.page_id = page.get("id", "")
+        self.page_url = page.get("url", "")
+        self.blocks_written = blocks_written
+        self.total_blocks = total_blocks
+        super().__init__(
+            f"Page {self.page_id} créée mais contenu incomplet : {blocks_written}/{total_blocks} blocs écrits"
+        )
+
+
+def _utf16_length(char: str) -> int:
+    # Notion compte les caractères comme JavaScript (unités UTF-16)
+    return 2 if ord(char) > 0xFFFF else 1
+
+
+def split_text(text: str, limit: int = MAX_TEXT_LENGTH) -> List[str]:
+    """Découpe ``text`` en morceaux d'au plus ``limit`` caractères Notion."""
+
+    if len(text) * 2 <= limit or len(text.encode("utf-16-le")) // 2 <= limit:
+        return [text]
+
+    chunks: List[str] = []
+    start = 0
+    size = 0
+    for index, char in enumerate(text):
+        width = _utf16_length(char)
+        if size + width > limit:
+            chunks.append(text[start:index])
+            start, size = index, 0
+        size += width
+    chunks.append(text[start:])
+    return chunks
+
+
+def rich_text(text: str) -> List[Dict[str, Any]]:
+    """Retourne les segments de rich text couvrant ``text`` en entier."""
+
+    return [{"text": {"content": chunk}} for chunk in split_text(text)]
+
+
+def markdown_to_blocks(content: str) -> List[Dict[str, Any]]:
+    """Convertit le Markdown d'une fiche en blocs Notion, sans tronquer."""
+
+    blocks: List[Dict[str, Any]] = []
+    for line in content.split("\n"):
+        block_type, text = "paragraph", line
+        for prefix, prefixed_type in _LINE_PREFIXES:
+            if line.startswith(prefix):
+                block_type, text = prefixed_type, line[len(prefix):].strip()
+                break
+        segments = rich_text(text)
+        for start in range(0, len(segments), MAX_RICH_TEXT_SEGMENTS):
+            blocks.append({block_type: {"rich_text": segments[start : start + MAX_RICH_TEXT_SEGMENTS]}})
+    return blocks
+
+
+def iter_batches(
+    blocks: Sequence[Dict[str, Any]], size: int = MAX_BLOCKS_PER_REQUEST
+) -> Iterator[Sequence[Dict[str, Any]]]:
+    """Découpe ``blocks`` en lots consécutifs de ``size`` blocs au plus."""
+
+    for start in range(0, len(blocks), size):
+        yield blocks[start : start + size]
+
+
+def append_blocks(
+    page_id: str,
+    blocks: Sequence[Dict[str, Any]],
+    headers: Mapping[str, str],
+    *,
+    transport: Optional[NotionTransport] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    timeout: float = 30,
+) -> int:
+    """Ajoute ``blocks`` sous ``page_id`` par lots de 100, dans l'ordre.
+
+    Les lots sont envoyés l'un après l'autre : Notion ajoute toujours en fin de
+    page, deux lots concurrents pourraient donc être inversés. ``on_progress``
+    reçoit ``(blocs_envoyés, total)`` après chaque lot. Retourne le nombre de
+    blocs ajoutés ; lève ``HTTPError`` au premier lot refusé.
+    """
+
+    transport = transport or notion_transport
+    total = len(blocks)
+    sent = 0
+    for batch in iter_batches(blocks):
+        response = transport.patch(
+            f"blocks/{page_id}/children",
+            headers=dict(headers),
+            json={"children": list(batch)},
+            timeout=timeout,
+            priority=RequestPriority.INTERACTIVE,
+        )
+        response.raise_for_status()
+        sent += len(batch)
+        LOGGER.info("Blocs ajoutés à %s : %s/%s", page_id, sent, total)
+        if on_progress:
+            on_progress(sent, total)
+    return sent
+
+
+def create_page_with_blocks(
+    payload: Dict[str, Any],
+    blocks: Sequence[Dict[str, Any]],
+    headers: Mapping[str, str],
+    *,
+    transport: Optional[NotionTransport] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    timeout: float = 30,
+) -> Dict[str, Any]:
+    """Crée la page avec le premier lot de blocs puis ajoute le reste.
+
+    Retourne la réponse JSON de la création de page. Une fiche de moins de
+    100 blocs ne coûte ainsi qu'une seule requête. Si un lot suivant échoue,
+    lève ``PartialPageError`` (id, URL et blocs écrits de la page créée).
+    """
+
+    transport = transport or notion_transport
+    first, rest = blocks[:MAX_BLOCKS_PER_REQUEST], blocks[MAX_BLOCKS_PER_REQUEST:]
+    body = dict(payload)
+    if first:
+        body["children"] = list(first)
+    response = transport.post(
+        "pages",
+        headers=dict(headers),
+        json=body,
+        timeout=timeout,
+        priority=RequestPriority.INTERACTIVE,
+    )
+    response.raise_for_status()
+    page = response.json()
+    total = len(blocks)
+    written = len(first)
+    if on_progress:
+        on_progress(written, total)
+
+    def _appended(sent: int, _: int) -> None:
+        nonlocal written
+        written = len(first) + sent
+        if on_progress:
+            on_progress(written, total)
+
+    if rest:
+        try:
+            append_blocks(page["id"], rest, headers, transport=transport, timeout=timeout, on_progress=_appended)
+        except Exception as exc:
+            raise PartialPageError(page, written, total) from exc
+    return page
+
+
+__all__ = [
+    "MAX_BLOCKS_PER_REQUEST",
+    "MAX_RICH_TEXT_SEGMENTS",
+    "MAX_TEXT_LENGTH",
+    "PartialPageError",
+    "append_blocks",
+    "create_page_with_blocks",
+    "iter_batches",
+    "markdown_to_blocks",
+    "rich_text",
+    "split_text",
+]
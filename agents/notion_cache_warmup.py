@@ -0,0 +1,237 @@
+"""
+Préchauffage du cache Notion (après un déploiement ou au démarrage de Streamlit)
+
+Sans préchauffage, la première génération paie le listing de toutes les bases
+du bac à sable, la page Vision et les fiches de contexte les plus utilisées.
+``warm_up`` charge dans ``context_cache`` (et le cache disque) :
+1. les listings des bases du bac à sable ;
+2. la page Vision (``NotionConfig.VISION_PAGE_ID``) ;
+3. les fiches récemment utilisées (``context.selected_ids`` des sorties sauvegardées) ;
+4. les index de noms du résolveur de relations.
+
+Toutes les requêtes partent en priorité ``BACKGROUND`` : un utilisateur actif
+passe devant. ``start_background_warm_up`` lance le tout dans un thread (une
+fois par processus) et ``warmup_status`` expose la progression.
+
+Usage CLI : ``python app_cli.py warm-up [--max-recent 50]`` (charge ``.env``)
+ou ``python -m agents.notion_cache_warmup`` avec l'environnement déjà exporté.
+Au démarrage de Streamlit, ``NOTION_WARMUP_ON_STARTUP=false`` le désactive.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.notion_config import NotionConfig
+from config.notion_rate_limiter import RequestPriority, notion_priority
+
+LOGGER = logging.getLogger(__name__)
+
+OUTPUTS_DIR = Path(__file__).resolve().parent.parent / "outputs"
+RESOLVER_DOMAINS = ("personnages", "lieux", "communautes", "especes", "objets")
+
+
+@dataclass
+class WarmupProgress:
+    """Avancement du préchauffage (copie immuable transmise aux callbacks)."""
+
+    step: str = "pending"
+    done: int = 0
+    total: int = 0
+    finished: bool = False
+    errors: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        if self.finished:
+            loaded = ", ".join(f"{name}: {count}" for name, count in self.counts.items())
+            return f"Cache préchauffé ({loaded})" + (f" — {len(self.errors)} erreur(s)" if self.errors else "")
+        return f"Préchauffage {self.step} {self.done}/{self.total}"
+
+
+def recent_context_pages(outputs_dir: Optional[Path] = None, limit: int = 50) -> List[Tuple[str, Optional[str]]]:
+    """Retourne ``(page_id, domaine)`` des fiches de contexte des sorties les plus récentes."""
+
+    directory = Path(outputs_dir or OUTPUTS_DIR)
+    if not directory.is_dir():
+        return []
+    files = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    pages: Dict[str, Optional[str]] = {}
+    for path in files:
+        try:
+            context = (json.loads(path.read_text(encoding="utf-8")) or {}).get("context") or {}
+        except (OSError, ValueError, AttributeError):
+            continue
+        if not isinstance(context, dict):
+            continue
+        domains = {
+            preview.get("id"): preview.get("domain")
+            for preview in context.get("previews") or []
+            if isinstance(preview, dict)
+        }
+        for page_id in context.get("selected_ids") or []:
+            if isinstance(page_id, str) and page_id not in pages:
+                pages[page_id] = domains.get(page_id)
+                if len(pages) >= limit:
+                    return list(pages.items())
+    return list(pages.items())
+
+
+def warm_up(
+    fetcher: Any = None,
+    resolver: Any = None,
+    outputs_dir: Optional[Path] = None,
+    max_recent: int = 50,
+    on_progress: Optional[Callable[[WarmupProgress], None]] = None,
+) -> WarmupProgress:
+    """Préchauffe les caches Notion et retourne le bilan final.
+
+    Une étape en échec est notée dans ``errors`` sans interrompre les suivantes.
+    """
+
+    if fetcher is None:
+        from agents.notion_context_fetcher import NotionContextFetcher
+
+        fetcher = NotionContextFetcher()
+    if resolver is None:
+        from agents.notion_relation_resolver import NotionRelationResolver
+
+        resolver = NotionRelationResolver()
+
+    progress = WarmupProgress()
+
+    def report(step: str, done: int, total: int) -> None:
+        progress.step, progress.done, progress.total = step, done, total
+        if on_progress:
+            on_progress(replace(progress, errors=list(progress.errors), counts=dict(progress.counts)))
+
+    def fail(step: str, error: Exception) -> None:
+        LOGGER.warning("[Warm-up] %s failed: %s", step, error)
+        progress.errors.append(f"{step}: {error}")
+
+    with notion_priority(RequestPriority.BACKGROUND):
+        domains = [domain for domain, database_id in fetcher.SANDBOX_DATABASES.items() if database_id]
+        report("listings", 0, len(domains))
+        listed = 0
+        try:
+            for domain, previews in fetcher.iter_databases(domains=domains):
+                if domain in domains:
+                    listed += 1
+                    progress.counts["pages"] = progress.counts.get("pages", 0) + len(previews)
+                    report("listings", listed, len(domains))
+        except Exception as e:
+            fail("listings", e)
+
+        report("vision", 0, 1)
+        try:
+            fetcher.fetch_page_full(NotionConfig.VISION_PAGE_ID, domain="vision")
+            progress.counts["vision"] = 1
+            report("vision", 1, 1)
+        except Exception as e:
+            fail("vision", e)
+
+        recent = recent_context_pages(outputs_dir, limit=max_recent)
+        report("recent", 0, len(recent))
+        fetched = [0]
+
+        def _on_page(result: Any) -> None:
+            fetched[0] += 1
+            if not result.ok:
+                progress.errors.append(f"recent {result.page_id}: {result.error}")
+            report("recent", fetched[0], len(recent))
+
+        if recent:
+            try:
+                results = fetcher.fetch_pages_full(
+                    [page_id for page_id, _ in recent], domains=dict(recent), on_result=_on_page
+                )
+                progress.counts["recent"] = sum(1 for result in results if result.ok)
+            except Exception as e:
+                fail("recent", e)
+
+        report("resolver", 0, len(RESOLVER_DOMAINS))
+        names = 0
+        for index, domain in enumerate(RESOLVER_DOMAINS, start=1):
+            try:
+                names += len(resolver.fetch_entity_names(domain))
+            except Exception as e:
+                fail(f"resolver {domain}", e)
+            report("resolver", index, len(RESOLVER_DOMAINS))
+        progress.counts["names"] = names
+
+    progress.finished = True
+    report("done", progress.total, progress.total)
+    LOGGER.info("[Warm-up] %s", progress.describe())
+    return progress
+
+
+_state_lock = threading.Lock()
+_status = WarmupProgress()
+_future: Optional[Future] = None
+
+
+def _record_status(progress: WarmupProgress) -> None:
+    global _status
+    with _state_lock:
+        _status = progress
+
+
+def warmup_status() -> WarmupProgress:
+    """Dernier état connu du préchauffage en arrière-plan."""
+
+    with _state_lock:
+        return _status
+
+
+def start_background_warm_up(**kwargs: Any) -> Future:
+    """Lance ``warm_up`` dans un thread, une seule fois par processus.
+
+    Les appels suivants retournent le même ``Future`` (en cours ou terminé).
+    """
+
+    global _future
+    with _state_lock:
+        if _future is not None:
+            return _future
+        user_callback = kwargs.pop("on_progress", None)
+
+        def _on_progress(progress: WarmupProgress) -> None:
+            _record_status(progress)
+            if user_callback:
+                user_callback(progress)
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notion-warmup")
+        _future = executor.submit(warm_up, on_progress=_on_progress, **kwargs)
+        executor.shutdown(wait=False)
+        return _future
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Préchauffe le cache Notion (listings, Vision, fiches récentes, index du résolveur).")
+    parser.add_argument("--max-recent", type=int, default=50, help="Nombre maximum de fiches récentes à précharger")
+    parser.add_argument("--outputs", type=Path, default=None, help="Dossier des sorties sauvegardées")
+    args = parser.parse_args(argv)
+
+    if not NotionConfig.validate_token():
+        print("NOTION_TOKEN manquant: préchauffage impossible")
+        return 1
+
+    def _print(progress: WarmupProgress) -> None:
+        print(f"  {progress.describe()}", flush=True)
+
+    result = warm_up(outputs_dir=args.outputs, max_recent=args.max_recent, on_progress=_print)
+    for error in result.errors:
+        print(f"  [!] {error}")
+    return 0 if not result.errors else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
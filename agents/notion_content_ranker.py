@@ -0,0 +1,224 @@
+"""BM25 ranking of Notion pages over their cached full content.
+
+``NotionContextMatcher.score_relevance`` compared the brief with each page
+through ``difflib.SequenceMatcher`` (quadratic in practice), so full-content
+scoring was limited to a handful of pages fetched on demand.
+``ContentRanker`` tokenises each full content once and keeps the corpus as
+sparse NumPy arrays (CSC layout: one slice of ``(row, weight)`` per term), so
+a brief is scored against every cached page with a few vectorised additions.
+
+Scores are normalised to ``[0, 1]``: a page of average length containing
+every term of the brief once scores 1.0 (BM25 divided by the summed IDF of
+the brief terms, capped), which keeps the matcher thresholds meaningful.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from agents.notion_context_index import STOP_WORDS, _normalise_text
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Accent-free lowercase tokens, without stop words nor 1-2 letter words."""
+
+    return [token for token in _normalise_text(text or "").split() if len(token) > 2 and token not in STOP_WORDS]
+
+
+@dataclass(frozen=True)
+class _Document:
+    version: Optional[str]
+    term_ids: np.ndarray  # int32, unique per document
+    counts: np.ndarray  # float32, term frequencies
+    length: int
+
+
+@dataclass(frozen=True)
+class _Matrix:
+    """Compiled corpus: term-major postings with precomputed BM25 weights."""
+
+    page_ids: List[str]
+    row_of: Dict[str, int]
+    term_ptr: np.ndarray
+    rows: np.ndarray
+    weights: np.ndarray
+    idf: np.ndarray
+    missing_idf: float
+
+
+class ContentRanker:
+    """Thread-safe BM25 index of full page contents, keyed by page id.
+
+    Documents are versioned by ``last_edited``: ``upsert`` of an unchanged
+    version is a no-op. The compiled matrix is rebuilt lazily (vectorised,
+    O(nnz)) on the first query after a change.
+    """
+
+    def __init__(self, k1: float = K1, b: float = B) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = RLock()
+        self._vocabulary: Dict[str, int] = {}
+        self._docs: Dict[str, _Document] = {}
+        # Pages looked up in the caches without a full content, by version
+        self._absent: Dict[str, Optional[str]] = {}
+        self._matrix: Optional[_Matrix] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, page_id: object) -> bool:
+        return page_id in self._docs
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def has(self, page_id: str, version: Optional[str] = None) -> bool:
+        """True when the content of ``page_id`` is indexed (at ``version`` if given)."""
+
+        document = self._docs.get(page_id)
+        return document is not None and (version is None or document.version == version)
+
+    def needs_lookup(self, page_id: str, version: Optional[str]) -> bool:
+        """True unless this version is indexed or already known to be absent from the caches."""
+
+        if self.has(page_id, version):
+            return False
+        return page_id not in self._absent or self._absent[page_id] != version
+
+    def mark_absent(self, page_id: str, version: Optional[str]) -> None:
+        with self._lock:
+            self._absent[page_id] = version
+
+    def upsert(self, page_id: str, text: str, version: Optional[str] = None) -> bool:
+        """Index ``text`` for ``page_id``; returns False when ``version`` is already indexed."""
+
+        if version is not None and self.has(page_id, version):
+            return False
+        counts = Counter(tokenize(text))
+        with self._lock:
+            term_ids = np.fromiter(
+                (self._vocabulary.setdefault(term, len(self._vocabulary)) for term in counts),
+                dtype=np.int32,
+                count=len(counts),
+            )
+            self._docs[page_id] = _Document(
+                version=version,
+                term_ids=term_ids,
+                counts=np.fromiter(counts.values(), dtype=np.float32, count=len(counts)),
+                length=sum(counts.values()),
+            )
+            self._absent.pop(page_id, None)
+            self._matrix = None
+        return True
+
+    def remove(self, page_id: str) -> None:
+        with self._lock:
+            self._absent.pop(page_id, None)
+            if self._docs.pop(page_id, None) is not None:
+                self._matrix = None
+
+    def _compile(self) -> _Matrix:
+        with self._lock:
+            if self._matrix is not None:
+                return self._matrix
+            page_ids = list(self._docs)
+            docs = [self._docs[page_id] for page_id in page_ids]
+            vocabulary_size = len(self._vocabulary)
+            n_docs = len(docs)
+            if docs:
+                terms = np.concatenate([doc.term_ids for doc in docs])
+                counts = np.concatenate([doc.counts for doc in docs])
+                sizes = np.fromiter((len(doc.term_ids) for doc in docs), dtype=np.int64, count=n_docs)
+                lengths = np.fromiter((doc.length for doc in docs), dtype=np.float32, count=n_docs)
+            else:
+                terms = np.empty(0, dtype=np.int32)
+                counts = np.empty(0, dtype=np.float32)
+                sizes = np.empty(0, dtype=np.int64)
+                lengths = np.empty(0, dtype=np.float32)
+            rows = np.repeat(np.arange(n_docs, dtype=np.int32), sizes)
+            average = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+            norms = self.k1 * (1.0 - self.b + self.b * lengths / average)
+            weights = counts * (self.k1 + 1.0) / (counts + norms[rows])
+
+            order = np.argsort(terms, kind="stable")
+            df = np.bincount(terms, minlength=vocabulary_size)
+            term_ptr = np.zeros(vocabulary_size + 1, dtype=np.int64)
+            np.cumsum(df, out=term_ptr[1:])
+            self._matrix = _Matrix(
+                page_ids=page_ids,
+                row_of={page_id: row for row, page_id in enumerate(page_ids)},
+                term_ptr=term_ptr,
+                rows=rows[order],
+                weights=weights[order].astype(np.float32),
+                idf=np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32),
+                missing_idf=float(np.log1p((n_docs + 0.5) / 0.5)),
+            )
+            return self._matrix
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _score_all(self, query: str) -> Tuple[_Matrix, np.ndarray]:
+        matrix = self._compile()
+        scores = np.zeros(len(matrix.page_ids), dtype=np.float32)
+        terms = set(tokenize(query))
+        if not terms or not matrix.page_ids:
+            return matrix, scores
+        total_idf = 0.0
+        for term in terms:
+            term_id = self._vocabulary.get(term)
+            if term_id is None or term_id + 1 >= len(matrix.term_ptr):
+                total_idf += matrix.missing_idf
+                continue
+            idf = matrix.idf[term_id]
+            total_idf += float(idf)
+            start, end = matrix.term_ptr[term_id], matrix.term_ptr[term_id + 1]
+            # Rows are unique within a term slice: fancy-index += is exact
+            scores[matrix.rows[start:end]] += idf * matrix.weights[start:end]
+        if total_idf > 0:
+            np.minimum(scores / total_idf, 1.0, out=scores)
+        return matrix, scores
+
+    def rank(
+        self,
+        query: str,
+        allowed: Optional[Iterable[str]] = None,
+        top_k: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """``(page_id, score)`` of the indexed pages matching ``query``, best first."""
+
+        matrix, scores = self._score_all(query)
+        hits = np.flatnonzero(scores)
+        if allowed is not None:
+            allowed_set = allowed if isinstance(allowed, (set, frozenset, dict)) else set(allowed)
+            hits = np.fromiter(
+                (row for row in hits if matrix.page_ids[row] in allowed_set), dtype=np.int64
+            )
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        if top_k is not None:
+            hits = hits[:top_k]
+        return [(matrix.page_ids[row], float(scores[row])) for row in hits]
+
+    def score(self, query: str, page_id: str) -> float:
+        """Normalised BM25 score of one page (0.0 when its content is not indexed)."""
+
+        matrix, scores = self._score_all(query)
+        row = matrix.row_of.get(page_id)
+        return 0.0 if row is None else float(scores[row])
+
+
+# Shared by every matcher of the process, like ``context_token_index``.
+content_ranker = ContentRanker()
+
+__all__ = ["ContentRanker", "content_ranker", "tokenize"]
@@ -5,12 +5,25 @@ from __future__ import annotations
 
 import logging
 import os
-import time
 import math
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence
-
-from config.context_cache import context_cache
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+from config.context_cache import Freshness, context_cache
+from config.notion_disk_cache import notion_disk_cache
+from config.notion_rate_limiter import (
+    NotionRateLimiter,
+    RequestPriority,
+    current_priority,
+    notion_priority,
+    notion_rate_limiter,
+)
+from config.notion_transport import NotionTransport, notion_transport
+from config.single_flight import notion_single_flight
 
 LOGGER = logging.getLogger(__name__)
 
@@ -49,10 +62,367 @@ class NotionPageContent(NotionPagePreview):
     properties: Dict[str, Any]
 
 
+@dataclass
+class PageFetchResult:
+    """Outcome of one page of a ``fetch_pages_full`` batch."""
+
+    page_id: str
+    page: Optional[NotionPageContent] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.page is not None
+
+
 class NotionClientUnavailable(RuntimeError):
     """Raised when the Notion client cannot be instantiated."""
 
 
+# Block types rendered as markdown lines, with the prefix used for each one.
+BLOCK_MARKDOWN_PREFIXES: Dict[str, str] = {
+    "paragraph": "",
+    "heading_1": "# ",
+    "heading_2": "## ",
+    "heading_3": "### ",
+    "bulleted_list_item": "- ",
+    "numbered_list_item": "1. ",
+    "quote": "> ",
+    "callout": "💡 ",
+    "toggle": "▶ ",
+}
+
+
+class DirectNotionClient:
+    """Direct Notion API client used as fallback when MCP tools are unavailable.
+
+    Block trees are fetched breadth-first: every level's children lists are
+    requested concurrently (bounded by ``NOTION_BLOCK_CONCURRENCY``) and the
+    markdown is rebuilt in document order once the whole tree is known.
+    Every request goes through the shared pooled ``notion_transport`` (keep-alive,
+    5xx retries, metrics) and the process-wide ``notion_rate_limiter``.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://api.notion.com/v1",
+        headers: Optional[Dict[str, str]] = None,
+        max_concurrency: Optional[int] = None,
+        rate_limiter: Optional[NotionRateLimiter] = None,
+        transport: Optional[NotionTransport] = None,
+    ) -> None:
+        from config.notion_config import NotionConfig
+
+        # Utiliser la version stable directe pour éviter erreurs 400
+        self.headers = headers or NotionConfig.get_direct_headers()
+        self.base_url = base_url.rstrip("/")
+        # Timeouts and caps
+        self.request_timeout = float(os.getenv("NOTION_REQUEST_TIMEOUT", "20"))
+        self.max_records = int(os.getenv("NOTION_MAX_RECORDS", "200"))
+        self.page_size = int(os.getenv("NOTION_PAGE_SIZE", "50"))
+        self.max_concurrency = max(1, int(max_concurrency or os.getenv("NOTION_BLOCK_CONCURRENCY", "8")))
+        self.rate_limiter = rate_limiter or notion_rate_limiter
+        self.transport = transport or notion_transport
+        LOGGER.info(
+            "DirectNotionClient initialised | timeout=%ss max_records=%s page_size=%s concurrency=%s",
+            self.request_timeout,
+            self.max_records,
+            self.page_size,
+            self.max_concurrency,
+        )
+
+    def _request(self, method: str, url: str, priority: Optional[RequestPriority] = None, **kwargs):
+        kwargs.setdefault("headers", self.headers)
+        kwargs.setdefault("timeout", self.request_timeout)
+        return self.transport.request(method, url, priority=priority, rate_limiter=self.rate_limiter, **kwargs)
+
+    def iter_pages(
+        self,
+        database_id: str,
+        filter: Optional[Dict[str, Any]] = None,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+        filter_properties: Optional[Sequence[str]] = None,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the pages of a database lazily, one query batch at a time.
+
+        There is no record cap: memory stays bounded to one batch and the next
+        batch is only requested once the caller has consumed the current one,
+        so breaking out of the loop stops the query.
+        """
+        url = f"{self.base_url}/databases/{database_id}/query"
+        params = {"filter_properties": list(filter_properties)} if filter_properties else None
+        start_cursor = None
+        batches = 0
+        while True:
+            payload: Dict[str, Any] = {"page_size": page_size or self.page_size}
+            if filter:
+                payload["filter"] = filter
+            if sorts:
+                payload["sorts"] = sorts
+            if start_cursor:
+                payload["start_cursor"] = start_cursor
+            # Read-only query: safe to retry on timeouts and 5xx
+            response = self._request("POST", url, params=params, json=payload, idempotent=True)
+            response.raise_for_status()
+            data = response.json()
+            batches += 1
+            LOGGER.debug("[Notion] iter_pages batch | db=%s batch=%s size=%s", database_id, batches, len(data.get("results", [])))
+            yield from data.get("results", [])
+            start_cursor = data.get("next_cursor")
+            if not data.get("has_more") or not start_cursor:
+                return
+
+    def list_pages(self, database_id: str) -> Sequence[Dict[str, Any]]:
+        """Query database pages, capped at ``NOTION_MAX_RECORDS`` (see ``iter_pages``)."""
+        LOGGER.info("[Notion] list_pages start | db=%s", database_id)
+        results = list(islice(self.iter_pages(database_id), self.max_records + 1))
+        if len(results) > self.max_records:
+            LOGGER.warning(
+                "[Notion] list_pages truncated to NOTION_MAX_RECORDS=%s | db=%s (use iter_pages for the full database)",
+                self.max_records,
+                database_id,
+            )
+            results = results[: self.max_records]
+        LOGGER.info("[Notion] list_pages done | db=%s total=%s", database_id, len(results))
+        return results
+
+    def list_pages_edited_since(self, database_id: str, since: str) -> List[Dict[str, Any]]:
+        """Query pages edited on or after ``since`` (ISO timestamp), newest first.
+
+        Used by the incremental sync: the filter keeps the delta small and the
+        descending sort lets us stop as soon as an older record shows up.
+        """
+        results: List[Dict[str, Any]] = []
+        for record in self.iter_pages(
+            database_id,
+            filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}},
+            sorts=[{"timestamp": "last_edited_time", "direction": "descending"}],
+        ):
+            if (record.get("last_edited_time") or "") < since:
+                break
+            results.append(record)
+        LOGGER.info("[Notion] list_pages_edited_since | db=%s since=%s changed=%s", database_id, since, len(results))
+        return results
+
+    def list_page_ids(self, database_id: str) -> List[str]:
+        """Return the id of every page of a database (no record cap).
+
+        Only the title property is requested, which keeps the reconciliation
+        pass of the incremental sync cheap.
+        """
+        records = self.iter_pages(database_id, filter_properties=["title"], page_size=100)
+        return [record["id"] for record in records if record.get("id")]
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        """Retrieve a single page."""
+        url = f"{self.base_url}/pages/{page_id}"
+        response = self._request("GET", url)
+        response.raise_for_status()
+        return response.json()
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        """Retrieve page content blocks, level by level, and render them as markdown."""
+        children_by_parent = self.fetch_block_tree(page_id)
+        return "\n".join(self.render_block_tree(page_id, children_by_parent))
+
+    def fetch_block_tree(self, root_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Return ``{parent_id: [child blocks]}`` for the whole tree under ``root_id``.
+
+        Each level is fetched with at most ``max_concurrency`` requests in flight;
+        the next level only contains blocks flagged with ``has_children``.
+        """
+        children_by_parent: Dict[str, List[Dict[str, Any]]] = {}
+        frontier: List[str] = [root_id]
+        seen = {root_id}
+        levels = 0
+        # Worker threads do not inherit context variables: pass the caller's priority along
+        priority = current_priority()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="notion-blocks") as executor:
+            while frontier:
+                levels += 1
+                if len(frontier) == 1 or self.max_concurrency == 1:
+                    fetched = [self._fetch_block_children(block_id, priority) for block_id in frontier]
+                else:
+                    fetched = list(executor.map(self._fetch_block_children, frontier, [priority] * len(frontier)))
+                next_frontier: List[str] = []
+                for parent_id, blocks in zip(frontier, fetched):
+                    children_by_parent[parent_id] = blocks
+                    for block in blocks:
+                        child_id = block.get("id")
+                        if block.get("has_children") and child_id and child_id not in seen:
+                            seen.add(child_id)
+                            next_frontier.append(child_id)
+                frontier = next_frontier
+        LOGGER.debug(
+            "[Notion] block tree fetched | root=%s parents=%s levels=%s",
+            root_id,
+            len(children_by_parent),
+            levels,
+        )
+        return children_by_parent
+
+    def _fetch_block_children(self, block_id: str, priority: Optional[RequestPriority] = None) -> List[Dict[str, Any]]:
+        """Fetch every child of a block, following ``has_more``/``next_cursor``."""
+        url = f"{self.base_url}/blocks/{block_id}/children"
+        blocks: List[Dict[str, Any]] = []
+        start_cursor: Optional[str] = None
+        try:
+            while True:
+                params: Dict[str, Any] = {"page_size": 100}
+                if start_cursor:
+                    params["start_cursor"] = start_cursor
+                response = self._request("GET", url, params=params, priority=priority)
+                response.raise_for_status()
+                data = response.json()
+                blocks.extend(data.get("results", []))
+                start_cursor = data.get("next_cursor")
+                if not data.get("has_more") or not start_cursor:
+                    break
+        except Exception as e:
+            # 404 or transient errors are expected on some legacy blocks; keep silent in normal runs
+            LOGGER.debug(f"Failed to fetch children for block {block_id}: {e}")
+            return blocks
+        return blocks
+
+    @classmethod
+    def render_block_tree(
+        cls,
+        root_id: str,
+        children_by_parent: Dict[str, List[Dict[str, Any]]],
+    ) -> List[str]:
+        """Render a fetched block tree depth-first, in document order."""
+        lines: List[str] = []
+        # Explicit stack of (block, indent) so deep trees do not hit the recursion limit
+        stack = [(block, 0) for block in reversed(children_by_parent.get(root_id, []))]
+        while stack:
+            block, indent = stack.pop()
+            line = cls._render_block(block, indent)
+            if line is not None:
+                lines.append(line)
+            block_id = block.get("id")
+            if block.get("has_children") and block_id:
+                for child in reversed(children_by_parent.get(block_id, [])):
+                    stack.append((child, indent + 1))
+        return lines
+
+    @classmethod
+    def _render_block(cls, block: Dict[str, Any], indent: int) -> Optional[str]:
+        """Return the markdown line of a block, or None when it has no text."""
+        block_type = block.get("type")
+        prefix = BLOCK_MARKDOWN_PREFIXES.get(block_type or "")
+        if prefix is None:
+            return None
+        text = cls._extract_rich_text(block.get(block_type, {}).get("rich_text", []))
+        if not text:
+            return None
+        return f"{'  ' * indent}{prefix}{text}"
+
+    @staticmethod
+    def _extract_rich_text(rich_text_array: List[Dict[str, Any]]) -> str:
+        """Extract plain text from Notion rich text array."""
+        return "".join(rt.get("plain_text", "") for rt in rich_text_array)
+
+
+def _property_value(prop: Mapping[str, Any]) -> Any:
+    """Plain value of a raw Notion property, as compared by database filters."""
+    prop_type = prop.get("type")
+    value = prop.get(prop_type) if prop_type else None
+    if prop_type in ("title", "rich_text"):
+        return "".join(part.get("plain_text", "") for part in value or [])
+    if prop_type in ("select", "status"):
+        return (value or {}).get("name")
+    if prop_type == "multi_select":
+        return [option.get("name") for option in value or []]
+    if prop_type == "relation":
+        return [relation.get("id") for relation in value or []]
+    if prop_type == "date":
+        return (value or {}).get("start")
+    return value
+
+
+_TEXT_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "equals": lambda value, expected: value == expected,
+    "does_not_equal": lambda value, expected: value != expected,
+    "contains": lambda value, expected: expected in (value or ""),
+    "does_not_contain": lambda value, expected: expected not in (value or ""),
+    "starts_with": lambda value, expected: (value or "").startswith(expected),
+    "ends_with": lambda value, expected: (value or "").endswith(expected),
+}
+_ORDER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "equals": lambda value, expected: value == expected,
+    "does_not_equal": lambda value, expected: value != expected,
+    "greater_than": lambda value, expected: value is not None and value > expected,
+    "less_than": lambda value, expected: value is not None and value < expected,
+    "greater_than_or_equal_to": lambda value, expected: value is not None and value >= expected,
+    "less_than_or_equal_to": lambda value, expected: value is not None and value <= expected,
+    # Dates / timestamps (ISO 8601 strings compare chronologically)
+    "after": lambda value, expected: bool(value) and value > expected,
+    "before": lambda value, expected: bool(value) and value < expected,
+    "on_or_after": lambda value, expected: bool(value) and value >= expected,
+    "on_or_before": lambda value, expected: bool(value) and value <= expected,
+}
+_LIST_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "contains": lambda value, expected: expected in (value or []),
+    "does_not_contain": lambda value, expected: expected not in (value or []),
+}
+
+
+def _record_matches(record: Mapping[str, Any], condition: Mapping[str, Any]) -> bool:
+    """Evaluate a Notion database ``filter`` against a raw page record.
+
+    Used for clients without server-side filtering (``list_pages`` only).
+    Covers compound ``and``/``or``, timestamp filters and the text, select,
+    status, checkbox, number, date, multi-select and relation conditions;
+    anything else raises ``ValueError`` rather than returning unfiltered pages.
+    """
+    if "and" in condition:
+        return all(_record_matches(record, part) for part in condition["and"])
+    if "or" in condition:
+        return any(_record_matches(record, part) for part in condition["or"])
+    if "timestamp" in condition:
+        field = condition["timestamp"]
+        value, operators = record.get(field), _ORDER_OPERATORS
+    elif "property" in condition:
+        prop = (record.get("properties") or {}).get(condition["property"]) or {}
+        field = next((key for key in condition if key != "property"), "")
+        value = _property_value(prop)
+        operators = _LIST_OPERATORS if field in ("multi_select", "relation") else (
+            _TEXT_OPERATORS if field in ("title", "rich_text") else _ORDER_OPERATORS
+        )
+    else:
+        raise ValueError(f"Unsupported Notion filter: {dict(condition)}")
+
+    clause = condition.get(field) or {}
+    if len(clause) != 1:
+        raise ValueError(f"Unsupported Notion filter: {dict(condition)}")
+    ((operator, expected),) = clause.items()
+    if operator == "is_empty":
+        return value in (None, "", [])
+    if operator == "is_not_empty":
+        return value not in (None, "", [])
+    if operator not in operators:
+        raise ValueError(f"Unsupported Notion filter operator {field}.{operator}")
+    return operators[operator](value, expected)
+
+
+def _sort_records(records: List[Dict[str, Any]], sorts: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Apply Notion ``sorts`` (timestamps or properties) client-side; empty values go last."""
+
+    def sort_value(record: Mapping[str, Any], sort: Mapping[str, Any]) -> Any:
+        if "timestamp" in sort:
+            return record.get(sort["timestamp"])
+        return _property_value((record.get("properties") or {}).get(sort.get("property")) or {})
+
+    # Stable sorts, least significant key first
+    for sort in reversed(sorts):
+        present = [record for record in records if sort_value(record, sort) not in (None, "", [])]
+        missing = [record for record in records if sort_value(record, sort) in (None, "", [])]
+        present.sort(key=lambda record: sort_value(record, sort), reverse=sort.get("direction") == "descending")
+        records = present + missing
+    return records
+
+
 class NotionContextFetcher:
     """Fetch and format Notion pages used as LLM context."""
 
@@ -67,8 +437,13 @@ class NotionContextFetcher:
         "objets": None,
     }
 
-    def __init__(self, client: Optional[NotionClientProtocol] = None) -> None:
+    def __init__(self, client: Optional[NotionClientProtocol] = None, incremental_sync: Optional[bool] = None) -> None:
         self.client = client or self._build_default_client()
+        if incremental_sync is None:
+            incremental_sync = os.getenv("NOTION_INCREMENTAL_SYNC", "true").lower() in ("1", "true", "yes")
+        self.incremental_sync = incremental_sync
+        # Deleted/archived pages never show up in a delta query: relist ids periodically
+        self.reconcile_interval = float(os.getenv("NOTION_SYNC_RECONCILE_SECONDS", str(6 * 3600)))
 
     def _build_default_client(self) -> Optional[NotionClientProtocol]:
         """Try constructing a MCP-backed client, return None if impossible."""
@@ -100,183 +475,20 @@ class NotionContextFetcher:
     def _build_fallback_client(self) -> Optional[NotionClientProtocol]:
         """Build a fallback client using direct Notion API calls."""
         try:
-            import requests
-            from requests.adapters import HTTPAdapter
-            from urllib3.util.retry import Retry
             from config.notion_config import NotionConfig
-            
+
             if not NotionConfig.validate_token():
                 LOGGER.warning("No valid Notion token found.")
                 return None
-            
-            class DirectNotionClient(NotionClientProtocol):
-                """Direct Notion API client as fallback."""
-                
-                def __init__(self):
-                    # Utiliser la version stable directe pour éviter erreurs 400
-                    self.headers = NotionConfig.get_direct_headers()
-                    self.base_url = "https://api.notion.com/v1"
-                    # HTTP session with retries for robustness (handles 429/5xx)
-                    self.session = requests.Session()
-                    retry = Retry(
-                        total=3,
-                        connect=3,
-                        read=3,
-                        backoff_factor=0.8,
-                        status_forcelist=(429, 500, 502, 503, 504),
-                        allowed_methods=("GET", "POST", "PATCH"),
-                        raise_on_status=False,
-                    )
-                    adapter = HTTPAdapter(max_retries=retry)
-                    self.session.mount("http://", adapter)
-                    self.session.mount("https://", adapter)
-                    # Timeouts and caps
-                    self.request_timeout = float(os.getenv("NOTION_REQUEST_TIMEOUT", "20"))
-                    self.max_records = int(os.getenv("NOTION_MAX_RECORDS", "200"))
-                    self.page_size = int(os.getenv("NOTION_PAGE_SIZE", "50"))
-                    LOGGER.info(
-                        "DirectNotionClient initialised | timeout=%ss max_records=%s page_size=%s",
-                        self.request_timeout,
-                        self.max_records,
-                        self.page_size,
-                    )
-                
-                def _request(self, method: str, url: str, **kwargs):
-                    kwargs.setdefault("headers", self.headers)
-                    kwargs.setdefault("timeout", self.request_timeout)
-                    return self.session.request(method, url, **kwargs)
-                
-                def list_pages(self, database_id: str) -> Sequence[Dict[str, Any]]:
-                    """Query database for all pages."""
-                    url = f"{self.base_url}/databases/{database_id}/query"
-                    results: List[Dict[str, Any]] = []
-                    has_more = True
-                    start_cursor = None
-                    pages_fetched = 0
-                    LOGGER.info("[Notion] list_pages start | db=%s", database_id)
-                    while has_more and len(results) < self.max_records:
-                        payload: Dict[str, Any] = {"page_size": self.page_size}
-                        if start_cursor:
-                            payload["start_cursor"] = start_cursor
-                        response = self._request("POST", url, json=payload)
-                        response.raise_for_status()
-                        data = response.json()
-                        batch = data.get("results", [])
-                        results.extend(batch)
-                        has_more = bool(data.get("has_more"))
-                        start_cursor = data.get("next_cursor")
-                        pages_fetched += 1
-                        LOGGER.debug(
-                            "[Notion] list_pages batch | db=%s size=%s total=%s has_more=%s",
-                            database_id,
-                            len(batch),
-                            len(results),
-                            has_more,
-                        )
-                        # Soft rate-limit guard
-                        time.sleep(0.2)
-                        if pages_fetched >= 10:  # safety cap on batches
-                            LOGGER.warning(
-                                "[Notion] list_pages reached batch cap (10) | db=%s total=%s",
-                                database_id,
-                                len(results),
-                            )
-                            break
-                    if len(results) > self.max_records:
-                        results = results[: self.max_records]
-                    LOGGER.info(
-                        "[Notion] list_pages done | db=%s total=%s batches=%s",
-                        database_id,
-                        len(results),
-                        pages_fetched,
-                    )
-                    return results
-                
-                def retrieve_page(self, page_id: str) -> Dict[str, Any]:
-                    """Retrieve a single page."""
-                    url = f"{self.base_url}/pages/{page_id}"
-                    response = self._request("GET", url)
-                    response.raise_for_status()
-                    return response.json()
-                
-                def retrieve_page_content(self, page_id: str) -> str:
-                    """Retrieve page content blocks recursively."""
-                    def fetch_blocks_recursive(block_id: str, indent: int = 0) -> List[str]:
-                        """Fetch blocks and their children recursively."""
-                        url = f"{self.base_url}/blocks/{block_id}/children"
-                        try:
-                            response = self._request("GET", url)
-                            response.raise_for_status()
-                            blocks = response.json().get("results", [])
-                        except Exception as e:
-                            # 404 or transient errors are expected on some legacy blocks; keep silent in normal runs
-                            LOGGER.debug(f"Failed to fetch children for block {block_id}: {e}")
-                            return []
-                        
-                        content_parts = []
-                        indent_str = "  " * indent  # Indentation for nested content
-                        
-                        for block in blocks:
-                            block_type = block.get("type")
-                            block_id = block.get("id")
-                            has_children = block.get("has_children", False)
-                            
-                            # Extract text based on block type
-                            if block_type == "paragraph":
-                                text = self._extract_rich_text(block.get("paragraph", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}{text}")
-                            elif block_type == "heading_1":
-                                text = self._extract_rich_text(block.get("heading_1", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}# {text}")
-                            elif block_type == "heading_2":
-                                text = self._extract_rich_text(block.get("heading_2", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}## {text}")
-                            elif block_type == "heading_3":
-                                text = self._extract_rich_text(block.get("heading_3", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}### {text}")
-                            elif block_type == "bulleted_list_item":
-                                text = self._extract_rich_text(block.get("bulleted_list_item", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}- {text}")
-                            elif block_type == "numbered_list_item":
-                                text = self._extract_rich_text(block.get("numbered_list_item", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}1. {text}")
-                            elif block_type == "quote":
-                                text = self._extract_rich_text(block.get("quote", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}> {text}")
-                            elif block_type == "callout":
-                                text = self._extract_rich_text(block.get("callout", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}💡 {text}")
-                            elif block_type == "toggle":
-                                text = self._extract_rich_text(block.get("toggle", {}).get("rich_text", []))
-                                if text:
-                                    content_parts.append(f"{indent_str}▶ {text}")
-                            
-                            # Recursively fetch children if present
-                            if has_children and block_id:
-                                children = fetch_blocks_recursive(block_id, indent + 1)
-                                content_parts.extend(children)
-                        
-                        return content_parts
-                    
-                    # Start fetching from the page root
-                    all_content = fetch_blocks_recursive(page_id)
-                    return "\n".join(all_content)
-                
-                @staticmethod
-                def _extract_rich_text(rich_text_array: List[Dict[str, Any]]) -> str:
-                    """Extract plain text from Notion rich text array."""
-                    return "".join(rt.get("plain_text", "") for rt in rich_text_array)
-            
+
+            # Opt-in: route the sync protocol through the asyncio client (one event loop)
+            if os.getenv("NOTION_ASYNC_CLIENT", "false").lower() in ("1", "true", "yes"):
+                from agents.notion_async_client import shared_sync_client
+
+                return shared_sync_client()
+
             return DirectNotionClient()
-            
+
         except ImportError:
             LOGGER.warning("requests library not available; cannot use fallback client.")
             return None
@@ -292,67 +504,262 @@ class NotionContextFetcher:
         """Return previews grouped by domain using sandbox databases only.
 
         Args:
-            force_refresh: Ignore cache and refetch.
+            force_refresh: Ignore cache and refetch. With incremental sync enabled
+                only the pages edited since the last sync are queried.
             lightweight: When True, avoid any content retrieval; only use properties
                 (title, light summary from properties) and compute a coarse token estimate.
         """
 
-        previews_by_domain: Dict[str, List[NotionPagePreview]] = {}
+        previews_by_domain = dict(self.iter_databases(force_refresh=force_refresh, lightweight=lightweight))
+        # Keep the declaration order of SANDBOX_DATABASES for callers iterating the dict
+        return {domain: previews_by_domain[domain] for domain in self.SANDBOX_DATABASES}
+
+    def iter_databases(
+        self,
+        force_refresh: bool = False,
+        lightweight: bool = True,
+        domains: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, List[NotionPagePreview]]]:
+        """Yield ``(domain, previews)`` as soon as each domain is available.
+
+        Cached and unconfigured domains come first; the others are listed
+        concurrently (every request still goes through the shared rate limiter)
+        and yielded in completion order. If a domain fails, the remaining ones
+        are still yielded before the first error is raised. ``domains``
+        restricts the listing to a subset of ``SANDBOX_DATABASES``.
+
+        An expired listing still within its max staleness is yielded at once
+        and refreshed in the background (see ``listing_freshness``).
+        """
+
+        pending: Dict[str, str] = {}
         for domain, database_id in self.SANDBOX_DATABASES.items():
+            if domains is not None and domain not in domains:
+                continue
             if not database_id:
                 LOGGER.debug("No sandbox database configured for domain '%s'", domain)
-                previews_by_domain[domain] = []
+                yield domain, []
                 continue
-
-            cache_key = f"{domain}:{database_id}"
             if not force_refresh:
-                cached = context_cache.get("list", cache_key)
+                cached, freshness = context_cache.lookup("list", f"{domain}:{database_id}")
                 if cached is not None:
-                    previews_by_domain[domain] = cached
+                    if freshness is Freshness.STALE and self.client is not None:
+                        self._revalidate("list", f"{domain}:{database_id}", self._list_domain, domain, database_id, lightweight)
+                    yield domain, cached
+                    continue
+            pending[domain] = database_id
+
+        if not pending:
+            return
+        self._assert_client()
+        errors: List[Exception] = []
+        with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="notion-list") as executor:
+            # Each worker runs in a copy of the caller's context (request priority)
+            futures = {
+                executor.submit(copy_context().run, self._list_domain, domain, database_id, lightweight): domain
+                for domain, database_id in pending.items()
+            }
+            for future in as_completed(futures):
+                domain = futures[future]
+                try:
+                    previews = future.result()
+                except Exception as e:
+                    LOGGER.warning("[Notion] listing failed | domain=%s: %s", domain, e)
+                    errors.append(e)
                     continue
+                yield domain, previews
+        if errors:
+            raise errors[0]
+
+    def listing_freshness(self, domains: Optional[Sequence[str]] = None) -> Dict[str, Freshness]:
+        """Freshness of each cached domain listing, so the UI can show "refreshing…"."""
+
+        return {
+            domain: context_cache.freshness("list", f"{domain}:{database_id}")
+            for domain, database_id in self.SANDBOX_DATABASES.items()
+            if database_id and (domains is None or domain in domains)
+        }
+
+    def _revalidate(self, namespace: str, key: str, loader: Callable[..., Any], *args: Any) -> None:
+        """Refresh a stale entry in the background; ``loader`` stores the new value (once)."""
 
-            records = self._list_database_pages(database_id)
-            previews = [self._record_to_preview(record, domain, eager_content=not lightweight) for record in records]
-            previews_by_domain[domain] = previews
-            context_cache.set("list", cache_key, previews)
+        def _refresh() -> None:
+            with notion_priority(RequestPriority.BACKGROUND):
+                loader(*args)
 
-        return previews_by_domain
+        context_cache.refresh_in_background(namespace, key, _refresh)
+
+    def _list_domain(self, domain: str, database_id: str, lightweight: bool) -> List[NotionPagePreview]:
+        # Sessions listing the same database at the same time share one sync
+        return notion_single_flight.do(
+            ("list", domain, database_id, lightweight),
+            lambda: self._load_domain_listing(domain, database_id, lightweight),
+        )
+
+    def _load_domain_listing(self, domain: str, database_id: str, lightweight: bool) -> List[NotionPagePreview]:
+        records = self._sync_database_records(database_id)
+        previews = [self._record_to_preview(record, domain, eager_content=not lightweight) for record in records]
+        context_cache.set("list", f"{domain}:{database_id}", previews)
+        # Keep the raw records: they carry everything retrieve_page would return
+        context_cache.set_many(
+            "record",
+            {record["id"]: {**record, "domain": domain} for record in records if record.get("id")},
+        )
+        return previews
 
     def fetch_page_preview(self, page_id: str, domain: Optional[str] = None, force_refresh: bool = False) -> NotionPagePreview:
-        """Return a cached or freshly retrieved preview for a page."""
+        """Return a cached or freshly retrieved preview for a page.
+
+        A page already seen in a listing is served from its record, without
+        any network call. Concurrent callers for the same page share one fetch.
+        An expired preview is still served while it is refreshed in the background.
+        """
 
         if not force_refresh:
-            cached = context_cache.get("preview", page_id)
-            if cached is not None:
-                return cached
+            cached, freshness = context_cache.lookup("preview", page_id)
+            if cached is not None and not self._is_outdated(page_id, cached):
+                if freshness is Freshness.STALE and self.client is not None:
+                    self._revalidate("preview", page_id, self._load_page_preview, page_id, domain, False)
+                return self._with_domain(cached, domain)
+        preview = notion_single_flight.do(
+            # A forced refresh must not join (and get the result of) a normal load
+            ("preview", self._normalise_id(page_id), force_refresh),
+            lambda: self._load_page_preview(page_id, domain, force_refresh),
+        )
+        return self._with_domain(preview, domain)
 
-        record = self._retrieve_page(page_id)
+    def _load_page_preview(self, page_id: str, domain: Optional[str], force_refresh: bool) -> NotionPagePreview:
+        # Another caller may have filled the cache while we waited to lead
+        cached = None if force_refresh else self._fresh_cached("preview", page_id)
+        if cached is not None:
+            return cached
+
+        known = None if force_refresh else self._known_record(page_id)
+        record = known or self._retrieve_page(page_id)
         detected_domain = domain or record.get("domain") or "inconnu"
-        # Use eager mode for single-page preview to allow content-based summary
-        preview = self._record_to_preview(record, detected_domain, eager_content=True)
+        version = record.get("last_edited_time")
+        preview = None if force_refresh else self._from_disk("preview", page_id, version, domain)
+        if preview is None:
+            # Use eager mode for single-page preview to allow content-based summary,
+            # unless the listing record is enough (the selector already shows it)
+            preview = self._record_to_preview(record, detected_domain, eager_content=known is None)
+            if known is None:
+                self._to_disk("preview", page_id, version, preview)
         context_cache.set("preview", page_id, preview)
         return preview
 
     def fetch_page_full(self, page_id: str, domain: Optional[str] = None, force_refresh: bool = False) -> NotionPageContent:
-        """Return the full payload (metadata + markdown) for a page."""
+        """Return the full payload (metadata + markdown) for a page.
 
-        if not force_refresh:
-            cached = context_cache.get("full", page_id)
-            if cached is not None:
-                return cached
+        Metadata comes from the listing record when one is current; otherwise
+        ``retrieve_page`` and the block walk run in parallel. Concurrent callers
+        for the same page share one fetch.
+        """
 
-        record = self._retrieve_page(page_id)
-        detected_domain = domain or record.get("domain") or "inconnu"
-        preview = self._record_to_preview(record, detected_domain)
-        content = self._retrieve_content(page_id, record)
-        payload = NotionPageContent(
-            **preview.__dict__,
-            content=content,
-            properties=record.get("properties", {}),
+        cached = None if force_refresh else self._fresh_cached("full", page_id)
+        if cached is not None:
+            return cached
+        payload = notion_single_flight.do(
+            # A forced refresh must not join (and get the result of) a normal load
+            ("full", self._normalise_id(page_id), force_refresh),
+            lambda: self._load_page_full(page_id, domain, force_refresh),
         )
+        return self._with_domain(payload, domain)
+
+    def cached_page_full(
+        self, page_id: str, version: Optional[str] = None, domain: Optional[str] = None, *, use_disk: bool = True
+    ) -> Optional[NotionPageContent]:
+        """Return the full payload if the memory (or disk, for ``version``) cache holds it; never requests."""
+
+        cached = self._fresh_cached("full", page_id)
+        if cached is not None:
+            return self._with_domain(cached, domain)
+        return self._from_disk("full", page_id, version, domain) if use_disk else None
+
+    def _load_page_full(self, page_id: str, domain: Optional[str], force_refresh: bool) -> NotionPageContent:
+        cached = None if force_refresh else self._fresh_cached("full", page_id)
+        if cached is not None:
+            return cached
+
+        record = None if force_refresh else self._known_record(page_id)
+        content: Optional[str] = None
+        if record is None:
+            record, content = self._retrieve_record_and_content(page_id, use_disk=not force_refresh)
+        detected_domain = domain or record.get("domain") or "inconnu"
+        version = record.get("last_edited_time")
+        payload = None if force_refresh else self._from_disk("full", page_id, version, domain)
+        if payload is None:
+            preview = self._record_to_preview(record, detected_domain)
+            if content is None:
+                content = self._retrieve_content(page_id, record, use_disk=not force_refresh)
+            else:
+                self._to_disk("blocks", page_id, version, content)
+            payload = NotionPageContent(
+                **preview.__dict__,
+                content=content,
+                properties=record.get("properties", {}),
+            )
+            self._to_disk("full", page_id, version, payload)
         context_cache.set("full", page_id, payload)
         return payload
 
+    def fetch_pages_full(
+        self,
+        page_ids: Iterable[str],
+        domains: Optional[Mapping[str, Optional[str]]] = None,
+        force_refresh: bool = False,
+        on_result: Optional[Callable[[PageFetchResult], None]] = None,
+    ) -> List[PageFetchResult]:
+        """Fetch many full pages concurrently.
+
+        Ids are deduplicated (first occurrence wins) and results come back in
+        request order, one ``PageFetchResult`` per page; a failing page carries
+        its exception instead of aborting the batch. Memory-cache hits are
+        reported first through ``on_result`` (called from the caller's thread),
+        misses as soon as each one completes.
+        """
+
+        domains = domains or {}
+        unique_ids: List[str] = []
+        seen = set()
+        for page_id in page_ids:
+            key = self._normalise_id(page_id)
+            if page_id and key not in seen:
+                seen.add(key)
+                unique_ids.append(page_id)
+
+        results: Dict[str, PageFetchResult] = {}
+        misses: List[str] = []
+        for page_id in unique_ids:
+            cached = None if force_refresh else self._fresh_cached("full", page_id)
+            if cached is None:
+                misses.append(page_id)
+                continue
+            results[page_id] = PageFetchResult(page_id, page=cached)
+            if on_result:
+                on_result(results[page_id])
+
+        if misses:
+            workers = min(len(misses), max(1, int(os.getenv("NOTION_PAGE_CONCURRENCY", "4"))))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notion-page") as executor:
+                futures = {
+                    executor.submit(
+                        copy_context().run, self.fetch_page_full, page_id, domains.get(page_id), force_refresh
+                    ): page_id
+                    for page_id in misses
+                }
+                for future in as_completed(futures):
+                    page_id = futures[future]
+                    try:
+                        results[page_id] = PageFetchResult(page_id, page=future.result())
+                    except Exception as e:
+                        LOGGER.warning("[Notion] fetch_pages_full failed | page=%s: %s", page_id, e)
+                        results[page_id] = PageFetchResult(page_id, error=e)
+                    if on_result:
+                        on_result(results[page_id])
+
+        return [results[page_id] for page_id in unique_ids]
+
     def format_context_for_llm(self, pages: Iterable[NotionPageContent], compact: bool = True) -> str:
         """Create a deterministic prompt fragment from selected pages."""
 
@@ -374,19 +781,162 @@ class NotionContextFetcher:
                 "No MCP Notion client available. Provide a client when instantiating NotionContextFetcher."
             )
 
-    def _list_database_pages(self, database_id: str) -> Sequence[Dict[str, Any]]:
+    def iter_database_pages(
+        self,
+        database_id: str,
+        filter: Optional[Dict[str, Any]] = None,
+        sorts: Optional[List[Dict[str, Any]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every record of a database, batch by batch.
+
+        Uses the client's ``iter_pages`` (no record cap, early termination);
+        clients without it fall back to ``list_pages``, with ``filter`` and
+        ``sorts`` applied client-side on the returned records.
+        """
+
+        self._assert_client()
+        iter_pages = getattr(self.client, "iter_pages", None)
+        if iter_pages is not None:
+            yield from iter_pages(self._normalise_id(database_id), filter=filter, sorts=sorts)
+            return
+        records = list(self.client.list_pages(self._normalise_id(database_id)))
+        if filter:
+            records = [record for record in records if _record_matches(record, filter)]
+        if sorts:
+            records = _sort_records(records, sorts)
+        yield from records
+
+    def _list_database_pages(self, database_id: str) -> Iterator[Dict[str, Any]]:
+        return self.iter_database_pages(database_id)
+
+    def _sync_database_records(self, database_id: str) -> List[Dict[str, Any]]:
+        """Return the records of a database, refreshed incrementally when possible.
+
+        The merged listing and its high-water mark (newest ``last_edited_time``
+        seen) are kept in the disk tier under ``("sync", database_id)``. A
+        refresh only queries pages edited since the mark and merges them; a
+        periodic reconciliation pass drops pages that were deleted or archived.
+        Clients without delta support (or a disabled disk tier) get a full listing.
+        """
+
         self._assert_client()
-        return self.client.list_pages(self._normalise_id(database_id))
+        list_delta = getattr(self.client, "list_pages_edited_since", None)
+        state = notion_disk_cache.get("sync", database_id) if self.incremental_sync else None
+        if list_delta is None or not state or not state.get("high_water"):
+            state = {"records": {}, "high_water": "", "reconciled_at": time.time()}
+            self._merge_sync_records(state, self._list_database_pages(database_id))
+        else:
+            changed = list_delta(self._normalise_id(database_id), state["high_water"])
+            self._merge_sync_records(state, changed)
+            LOGGER.debug("[Notion] delta sync | db=%s changed=%s", database_id, len(changed))
+            if time.time() - state["reconciled_at"] >= self.reconcile_interval:
+                self._reconcile_sync_state(database_id, state)
+
+        if self.incremental_sync:
+            notion_disk_cache.set("sync", database_id, state)
+        return list(state["records"].values())
+
+    @staticmethod
+    def _merge_sync_records(state: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> None:
+        merged: Dict[str, Dict[str, Any]] = state["records"]
+        for record in records:
+            page_id = record.get("id")
+            if not page_id:
+                continue
+            if record.get("archived") or record.get("in_trash"):
+                merged.pop(page_id, None)
+                continue
+            merged[page_id] = record
+            state["high_water"] = max(state["high_water"], record.get("last_edited_time") or "")
+
+    def _reconcile_sync_state(self, database_id: str, state: Dict[str, Any]) -> None:
+        list_ids = getattr(self.client, "list_page_ids", None)
+        if list_ids is None:
+            return
+        try:
+            live_ids = set(list_ids(self._normalise_id(database_id)))
+        except Exception as e:
+            LOGGER.warning("[Notion] sync reconciliation failed | db=%s: %s", database_id, e)
+            return
+        removed = [page_id for page_id in state["records"] if page_id not in live_ids]
+        for page_id in removed:
+            del state["records"][page_id]
+        state["reconciled_at"] = time.time()
+        LOGGER.info("[Notion] sync reconciliation | db=%s removed=%s", database_id, len(removed))
 
     def _retrieve_page(self, page_id: str) -> Dict[str, Any]:
         self._assert_client()
         return self.client.retrieve_page(self._normalise_id(page_id))
 
-    def _retrieve_content(self, page_id: str, record: Optional[Dict[str, Any]] = None) -> str:
+    def _known_record(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """Return the page record from a still-fresh listing, if any."""
+
+        return context_cache.get("record", page_id) or context_cache.get("record", self._normalise_id(page_id))
+
+    def _fresh_cached(self, namespace: str, page_id: str) -> Any:
+        """Return the cached preview/full payload unless a listing saw a newer edit."""
+
+        cached = context_cache.get(namespace, page_id)
+        if cached is None or self._is_outdated(page_id, cached):
+            return None
+        return cached
+
+    @staticmethod
+    def _with_domain(page: Any, domain: Optional[str]) -> Any:
+        # A coalesced caller may have asked with another domain hint than the leader
+        if domain and getattr(page, "domain", domain) != domain:
+            return replace(page, domain=domain)
+        return page
+
+    def _is_outdated(self, page_id: str, cached: NotionPagePreview) -> bool:
+        """True when a fresher listing reports a newer edit than the cached payload."""
+
+        known = self._known_record(page_id)
+        edited = known.get("last_edited_time") if known else None
+        return bool(edited and cached.last_edited and edited != cached.last_edited)
+
+    def _retrieve_record_and_content(self, page_id: str, *, use_disk: bool = True) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Retrieve the page record, walking its blocks in parallel when worthwhile.
+
+        If the disk tier already holds the page, the walk is skipped (content
+        None) so that an unchanged page only costs ``retrieve_page``.
+        """
+
+        if use_disk and notion_disk_cache.version("full", page_id) is not None:
+            return self._retrieve_page(page_id), None
+        self._assert_client()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="notion-content") as executor:
+            content_future = executor.submit(
+                copy_context().run, self.client.retrieve_page_content, self._normalise_id(page_id)
+            )
+            record = self._retrieve_page(page_id)
+            content = content_future.result()
+        # Prefer content embedded in the record (MCP clients), as _retrieve_content does
+        return record, record.get("content") or content
+
+    def _retrieve_content(self, page_id: str, record: Optional[Dict[str, Any]] = None, *, use_disk: bool = True) -> str:
         if record and record.get("content"):
             return record["content"]
+        version = (record or {}).get("last_edited_time")
+        cached = self._from_disk("blocks", page_id, version) if use_disk else None
+        if cached is not None:
+            return cached
         self._assert_client()
-        return self.client.retrieve_page_content(self._normalise_id(page_id))
+        content = self.client.retrieve_page_content(self._normalise_id(page_id))
+        self._to_disk("blocks", page_id, version, content)
+        return content
+
+    # The disk tier is versioned by last_edited_time: without it we cannot
+    # tell whether a stored entry is current, so nothing is read or written.
+    def _from_disk(self, kind: str, page_id: str, version: Optional[str], domain: Optional[str] = None) -> Any:
+        if not version:
+            return None
+        value = notion_disk_cache.get(kind, page_id, version)
+        return None if value is None else self._with_domain(value, domain)
+
+    def _to_disk(self, kind: str, page_id: str, version: Optional[str], value: Any) -> None:
+        if version:
+            notion_disk_cache.set(kind, page_id, value, version)
 
     @staticmethod
     def _normalise_id(raw_id: str) -> str:
@@ -629,9 +1179,11 @@ class NotionContextFetcher:
 
 
 __all__ = [
+    "DirectNotionClient",
     "NotionContextFetcher",
     "NotionClientProtocol",
     "NotionClientUnavailable",
     "NotionPagePreview",
     "NotionPageContent",
+    "PageFetchResult",
 ]
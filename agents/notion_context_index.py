@@ -0,0 +1,243 @@
+"""Inverted token index over Notion page previews.
+
+``NotionContextMatcher`` used to re-normalise the title, summary and tags of
+every page and score the whole corpus on each call (i.e. on every Streamlit
+rerun while the brief is typed). ``ContextTokenIndex`` normalises each page
+once, keeps ``token -> page ids`` postings, and only scores the pages that
+share at least one token with the brief.
+
+The index is refreshed incrementally: ``sync`` re-tokenises a page only when
+its preview changed (new object with another title, summary, tags or
+``last_edited``) and drops pages that disappeared from a synced domain.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from threading import RLock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from agents.notion_context_fetcher import NotionPagePreview
+
+STOP_WORDS = {
+    "le",
+    "la",
+    "les",
+    "des",
+    "un",
+    "une",
+    "du",
+    "de",
+    "et",
+    "a",
+    "au",
+    "aux",
+    "en",
+    "sur",
+    "dans",
+    "pour",
+    "avec",
+    "par",
+    "que",
+    "qui",
+    "quoi",
+    "comme",
+    "dont",
+    "ou",
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def _strip_accents(value: str) -> str:
+    normalized = unicodedata.normalize("NFKD", value)
+    if normalized.isascii():
+        return normalized
+    # Test each distinct character once: full page contents go through here
+    marks = {ord(ch): None for ch in set(normalized) if unicodedata.combining(ch)}
+    return normalized.translate(marks) if marks else normalized
+
+
+def _normalise_text(value: str) -> str:
+    value = _strip_accents(value.lower())
+    value = _PUNCTUATION.sub(" ", value)
+    value = _SPACES.sub(" ", value)
+    return value.strip()
+
+
+@dataclass(frozen=True)
+class IndexedPage:
+    """Normalised view of a preview, computed once per page version."""
+
+    page: NotionPagePreview
+    title_norm: str
+    title_tokens: FrozenSet[str]
+    summary_tokens: FrozenSet[str]
+    tokens: FrozenSet[str]
+    # Title tokens long enough to trigger the "title mentioned in the brief" boost
+    boost_tokens: FrozenSet[str]
+
+    @classmethod
+    def build(cls, page: NotionPagePreview) -> "IndexedPage":
+        title_norm = _normalise_text(page.title)
+        summary_norm = _normalise_text(page.summary)
+        tags_norm = _normalise_text(" ".join(page.tags))
+        title_tokens = frozenset(title_norm.split())
+        summary_tokens = frozenset(summary_norm.split())
+        return cls(
+            page=page,
+            title_norm=title_norm,
+            title_tokens=title_tokens,
+            summary_tokens=summary_tokens,
+            tokens=title_tokens | summary_tokens | frozenset(tags_norm.split()),
+            boost_tokens=frozenset(t for t in title_tokens if t not in STOP_WORDS and len(t) >= 4),
+        )
+
+    def same_version(self, page: NotionPagePreview) -> bool:
+        current = self.page
+        return current is page or (
+            current.last_edited == page.last_edited
+            and current.title == page.title
+            and current.summary == page.summary
+            and list(current.tags) == list(page.tags)
+            and current.domain == page.domain
+        )
+
+    def score(self, keywords: Sequence[str], keyword_set: Set[str]) -> Tuple[float, List[str]]:
+        """Token-overlap score (same formula as ``fuzzy_match_pages``)."""
+
+        matches = [kw for kw in keywords if kw in self.tokens]
+        keyword_ratio = len(matches) / len(keywords) if keywords else 0.0
+        title_overlap = len(self.title_tokens & keyword_set) / len(keyword_set) if keyword_set else 0.0
+        summary_overlap = len(self.summary_tokens & keyword_set) / len(keyword_set) if keyword_set else 0.0
+        return 0.6 * max(title_overlap, summary_overlap) + 0.4 * keyword_ratio, matches
+
+
+class ContextTokenIndex:
+    """Thread-safe ``token -> page ids`` index with incremental updates."""
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._pages: Dict[str, IndexedPage] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._title_postings: Dict[str, Set[str]] = {}
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, page_id: str) -> Optional[IndexedPage]:
+        return self._pages.get(page_id)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def upsert(self, page: NotionPagePreview) -> bool:
+        """Index ``page``; returns False when the indexed version is already current."""
+
+        with self._lock:
+            existing = self._pages.get(page.id)
+            if existing is not None and existing.same_version(page):
+                return False
+            if existing is not None:
+                self._unlink(existing)
+            indexed = IndexedPage.build(page)
+            self._pages[page.id] = indexed
+            for token in indexed.tokens:
+                self._postings.setdefault(token, set()).add(page.id)
+            for token in indexed.boost_tokens:
+                self._title_postings.setdefault(token, set()).add(page.id)
+            self.updates += 1
+            return True
+
+    def remove(self, page_id: str) -> None:
+        with self._lock:
+            existing = self._pages.pop(page_id, None)
+            if existing is not None:
+                self._unlink(existing)
+
+    def _unlink(self, indexed: IndexedPage) -> None:
+        page_id = indexed.page.id
+        for postings, tokens in ((self._postings, indexed.tokens), (self._title_postings, indexed.boost_tokens)):
+            for token in tokens:
+                ids = postings.get(token)
+                if ids is not None:
+                    ids.discard(page_id)
+                    if not ids:
+                        del postings[token]
+
+    def sync(self, pages: Iterable[NotionPagePreview]) -> Dict[str, int]:
+        """Bring the index in line with ``pages`` and return their positions by id.
+
+        Only changed pages are re-tokenised. Pages of the synced domains that
+        are no longer listed are removed; other domains are left untouched.
+        """
+
+        positions: Dict[str, int] = {}
+        domains: Set[str] = set()
+        with self._lock:
+            for position, page in enumerate(pages):
+                if page.id in positions:
+                    continue
+                positions[page.id] = position
+                domains.add(page.domain)
+                existing = self._pages.get(page.id)
+                if existing is None or existing.page is not page:
+                    self.upsert(page)
+            stale = [
+                page_id
+                for page_id, indexed in self._pages.items()
+                if indexed.page.domain in domains and page_id not in positions
+            ] if len(self._pages) > len(positions) else []
+            for page_id in stale:
+                self.remove(page_id)
+        return positions
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        keywords: Sequence[str],
+        brief_tokens: Iterable[str] = (),
+        allowed: Optional[Dict[str, int]] = None,
+        top_k: Optional[int] = None,
+    ) -> List[Tuple[IndexedPage, float, List[str]]]:
+        """Score the pages sharing a token with the brief, best first.
+
+        Candidates come from the keyword postings plus the title postings of
+        ``brief_tokens`` (pages whose title is mentioned in the brief). Pages
+        outside ``allowed`` (id -> position, as returned by ``sync``) are
+        skipped; ties keep the ``allowed`` order.
+        """
+
+        keyword_list = list(keywords)
+        keyword_set = set(keyword_list)
+        with self._lock:
+            candidate_ids: Set[str] = set()
+            for token in keyword_set:
+                candidate_ids.update(self._postings.get(token, ()))
+            for token in brief_tokens:
+                candidate_ids.update(self._title_postings.get(token, ()))
+            if allowed is not None:
+                candidate_ids.intersection_update(allowed)
+            scored = []
+            for page_id in candidate_ids:
+                indexed = self._pages[page_id]
+                score, matches = indexed.score(keyword_list, keyword_set)
+                scored.append((indexed, score, matches))
+
+        order = allowed or {}
+        scored.sort(key=lambda item: (-item[1], order.get(item[0].page.id, 0), item[0].page.id))
+        return scored[:top_k] if top_k is not None else scored
+
+
+# Shared by every matcher of the process (one per Streamlit session).
+context_token_index = ContextTokenIndex()
+
+__all__ = ["ContextTokenIndex", "IndexedPage", "STOP_WORDS", "context_token_index"]
@@ -3,8 +3,12 @@
 
 from __future__ import annotations
 
+import logging
+import os
 import re
-import unicodedata
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 from typing import Dict, Iterable, List, Optional, Sequence
@@ -14,33 +18,36 @@ from agents.notion_context_fetcher import (
     NotionPageContent,
     NotionPagePreview,
 )
+from agents.notion_content_ranker import ContentRanker, content_ranker
+from agents.notion_context_index import (
+    STOP_WORDS,
+    ContextTokenIndex,
+    _normalise_text,
+    _strip_accents,
+    context_token_index,
+)
+from agents.notion_semantic_index import SemanticIndex, semantic_index
+
+# Semantic neighbours only complete the keyword matches: a cosine of 1.0 maps to
+# 0.8 (under auto-select) and weak similarities are ignored.
+SEMANTIC_WEIGHT = 0.8
+SEMANTIC_MIN_SIMILARITY = 0.2
+
+LOGGER = logging.getLogger(__name__)
+
+_refine_executor: Optional[ThreadPoolExecutor] = None
+_refine_executor_lock = threading.Lock()
+
+
+def _get_refine_executor() -> ThreadPoolExecutor:
+    """Pool shared by every matcher: fetches abandoned at the deadline finish here."""
 
-STOP_WORDS = {
-    "le",
-    "la",
-    "les",
-    "des",
-    "un",
-    "une",
-    "du",
-    "de",
-    "et",
-    "a",
-    "au",
-    "aux",
-    "en",
-    "sur",
-    "dans",
-    "pour",
-    "avec",
-    "par",
-    "que",
-    "qui",
-    "quoi",
-    "comme",
-    "dont",
-    "ou",
-}
+    global _refine_executor
+    with _refine_executor_lock:
+        if _refine_executor is None:
+            workers = max(1, int(os.getenv("NOTION_PAGE_CONCURRENCY", "4")))
+            _refine_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="context-refine")
+        return _refine_executor
 
 
 @dataclass
@@ -57,13 +64,27 @@ class MatchSuggestion(MatchCandidate):
     """Final suggestion enriched with auto-selection flag."""
 
     auto_select: bool
+    # True when the score includes the full page content (not only metadata)
+    refined: bool = False
 
 
 class NotionContextMatcher:
     """Suggest context pages based on a free-form brief."""
 
-    def __init__(self, fetcher: Optional[NotionContextFetcher] = None) -> None:
+    def __init__(
+        self,
+        fetcher: Optional[NotionContextFetcher] = None,
+        index: Optional[ContextTokenIndex] = None,
+        ranker: Optional[ContentRanker] = None,
+        semantic: Optional[SemanticIndex] = None,
+    ) -> None:
         self.fetcher = fetcher or NotionContextFetcher()
+        # Inverted index over the previews, shared across sessions by default
+        self.index = index if index is not None else context_token_index
+        # BM25 over the cached full contents, shared as well
+        self.ranker = ranker if ranker is not None else content_ranker
+        # Embeddings of every listed page, persisted across restarts
+        self.semantic = semantic if semantic is not None else semantic_index
 
     # ------------------------------------------------------------------
     # Keyword extraction
@@ -127,7 +148,11 @@ class NotionContextMatcher:
 
     @staticmethod
     def score_relevance(brief: str, page_content: str) -> float:
-        """Fine grained score using the full content of the page."""
+        """Fine grained score using the full content of the page.
+
+        Quadratic ``SequenceMatcher`` comparison, kept for one-off checks;
+        ``suggest_context`` ranks full contents with ``ContentRanker``.
+        """
 
         if not brief or not page_content:
             return 0.0
@@ -153,10 +178,23 @@ class NotionContextMatcher:
         min_score: float = 0.5,
         auto_select_threshold: float = 0.7,
         domains: Optional[Sequence[str]] = None,
-        use_full_content: bool = False,
+        use_full_content: bool = True,
         available_pages: Optional[Sequence[NotionPagePreview]] = None,
+        use_semantic: bool = True,
+        refine_timeout: Optional[float] = None,
     ) -> List[MatchSuggestion]:
-        """Return the most relevant context pages for a given brief."""
+        """Return the most relevant context pages for a given brief.
+
+        With ``use_full_content`` every page whose full content is cached is
+        scored with BM25 (no request), then the refine pool pages missing
+        from the cache are fetched concurrently and scored the same way. A
+        page not fetched within ``refine_timeout`` seconds (default
+        ``CONTEXT_REFINE_TIMEOUT``, 2.5s) keeps its metadata-only score;
+        ``MatchSuggestion.refined`` tells which scores used the full content.
+
+        With ``use_semantic`` the nearest pages in embedding space join the
+        candidates even without any shared keyword.
+        """
 
         keywords = self.extract_keywords(brief)
         brief_norm = _normalise_text(brief)
@@ -167,18 +205,29 @@ class NotionContextMatcher:
             # Optionally filter by domains if provided
             if domains:
                 available_pages = [p for p in available_pages if p.domain in domains]
-        rough_candidates = self.fuzzy_match_pages(keywords, available_pages)
 
         # Decide scoring thresholds. When avoiding full-content fetches,
         # relax the minimum score a bit to avoid filtering out relevant
         # metadata-only matches.
         effective_min_score = min_score if use_full_content else min(min_score, 0.3)
 
-        # Refine with full-content scoring only for the top candidates if
-        # explicitly requested. By default we operate on previews only to keep
-        # the UI extremely responsive.
+        # Full-content scoring covers the whole cached corpus; only the refine
+        # pool may trigger fetches for pages not cached yet.
         TOP_K_REFINE = max(10, max_fiches * 5) if use_full_content else 0
-        rough_candidates.sort(key=lambda c: c.score, reverse=True)
+        rough_candidates = self._rank_candidates(
+            keywords,
+            brief_tokens_set,
+            available_pages,
+            # Pages sharing no token with the brief score 0: only the first ones
+            # are needed (refine pool / top-N fill), unless a 0 threshold keeps all
+            fill=None if effective_min_score <= 0 else max(TOP_K_REFINE, max_fiches),
+        )
+        if use_full_content:
+            rough_candidates = self._blend_content_scores(brief, rough_candidates, available_pages)
+        if use_semantic:
+            rough_candidates = self._blend_semantic_scores(
+                brief, rough_candidates, available_pages, top_k=max(TOP_K_REFINE, max_fiches)
+            )
         refine_pool = rough_candidates[:TOP_K_REFINE]
 
         suggestions: List[MatchSuggestion] = []
@@ -219,16 +268,15 @@ class NotionContextMatcher:
                         if len(suggestions) >= max_fiches:
                             break
         if TOP_K_REFINE > 0 and len(suggestions) < max_fiches:
+            if refine_timeout is None:
+                refine_timeout = float(os.getenv("CONTEXT_REFINE_TIMEOUT", "2.5"))
+            content_scores = self._refine_scores(
+                brief, [c.page for c in refine_pool if c.page.id not in added_ids], refine_timeout
+            )
             for candidate in refine_pool:
                 if candidate.page.id in added_ids:
                     continue
-                refined_score = candidate.score
-                try:
-                    page_payload = self.fetcher.fetch_page_full(candidate.page.id, domain=candidate.page.domain)
-                except Exception:  # pragma: no cover - integration fallback
-                    page_payload = None
-                if isinstance(page_payload, NotionPageContent):
-                    refined_score = max(refined_score, self.score_relevance(brief, page_payload.content))
+                refined_score = max(candidate.score, content_scores.get(candidate.page.id, 0.0))
                 if refined_score < effective_min_score:
                     continue
 
@@ -285,32 +333,184 @@ class NotionContextMatcher:
             added_ids[candidate.page.id] = None
 
         suggestions.sort(key=lambda item: item.score, reverse=True)
+        if use_full_content:
+            for suggestion in suggestions:
+                suggestion.refined = self.ranker.has(suggestion.page.id, suggestion.page.last_edited)
         return suggestions
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _load_available_pages(self, domains: Optional[Sequence[str]]) -> List[NotionPagePreview]:
-        data = self.fetcher.fetch_all_databases()
-        previews: List[NotionPagePreview] = []
-        for domain, pages in data.items():
-            if domains and domain not in domains:
+    def _rank_candidates(
+        self,
+        keywords: Sequence[str],
+        brief_tokens: Iterable[str],
+        pages: Sequence[NotionPagePreview],
+        fill: Optional[int],
+    ) -> List[MatchCandidate]:
+        """Scored candidates from the inverted index, best first.
+
+        Equivalent to sorting ``fuzzy_match_pages`` over ``pages`` but only the
+        pages present in the matching postings are scored; up to ``fill``
+        non-matching pages (score 0, listing order) are appended.
+        """
+
+        positions = self.index.sync(pages)
+        ranked = [
+            MatchCandidate(page=indexed.page, score=score, matched_keywords=matches)
+            for indexed, score, matches in self.index.search(keywords, brief_tokens, allowed=positions)
+        ]
+        seen = {candidate.page.id for candidate in ranked}
+        padding = 0
+        for page in pages:
+            if fill is not None and padding >= fill:
+                break
+            if page.id in seen:
                 continue
-            previews.extend(pages)
-        return previews
+            seen.add(page.id)
+            ranked.append(MatchCandidate(page=page, score=0.0, matched_keywords=[]))
+            padding += 1
+        return ranked
 
+    def _blend_content_scores(
+        self,
+        brief: str,
+        candidates: List[MatchCandidate],
+        pages: Sequence[NotionPagePreview],
+    ) -> List[MatchCandidate]:
+        """Raise candidates to their BM25 full-content score, best first.
+
+        Every page of ``pages`` with a cached full content is scored, so a page
+        only relevant through its body joins the candidates too.
+        """
+
+        self._sync_cached_contents(pages)
+        return self._merge_scores(candidates, dict(self.ranker.rank(brief, allowed={page.id for page in pages})), pages)
 
-def _strip_accents(value: str) -> str:
-    normalized = unicodedata.normalize("NFKD", value)
-    return "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    def _blend_semantic_scores(
+        self,
+        brief: str,
+        candidates: List[MatchCandidate],
+        pages: Sequence[NotionPagePreview],
+        top_k: int,
+    ) -> List[MatchCandidate]:
+        """Add the ``top_k`` nearest pages by embedding (weighted by ``SEMANTIC_WEIGHT``)."""
+
+        by_id = {page.id: page for page in pages}
+        lookup = getattr(self.fetcher, "cached_page_full", None)
+
+        def _text(page_id: str) -> str:
+            page = by_id[page_id]
+            payload = None
+            if lookup is not None and self.ranker.has(page.id, page.last_edited):
+                payload = lookup(page.id, page.last_edited, page.domain)
+            parts = [page.title, page.summary, " ".join(page.tags)]
+            if isinstance(payload, NotionPageContent):
+                parts.append(payload.content)
+            return " ".join(parts)
+
+        # A page is re-embedded when edited or once its full content is cached
+        self.semantic.sync(
+            (
+                (page.id, f"{page.last_edited}:{'full' if self.ranker.has(page.id, page.last_edited) else 'preview'}")
+                for page in by_id.values()
+            ),
+            _text,
+        )
+        hits = self.semantic.search(brief, top_k=top_k, allowed=by_id, min_score=SEMANTIC_MIN_SIMILARITY)
+        return self._merge_scores(candidates, {page_id: score * SEMANTIC_WEIGHT for page_id, score in hits}, pages)
 
+    @staticmethod
+    def _merge_scores(
+        candidates: List[MatchCandidate],
+        scores: Dict[str, float],
+        pages: Sequence[NotionPagePreview],
+    ) -> List[MatchCandidate]:
+        """Raise candidates to ``scores`` (adding the missing pages), best first."""
+
+        if not scores:
+            return candidates
+        blended: List[MatchCandidate] = []
+        seen = set()
+        for candidate in candidates:
+            seen.add(candidate.page.id)
+            score = scores.get(candidate.page.id, 0.0)
+            if score > candidate.score:
+                candidate = MatchCandidate(page=candidate.page, score=score, matched_keywords=candidate.matched_keywords)
+            blended.append(candidate)
+        if len(seen) < len(pages):
+            for page in pages:
+                if page.id in scores and page.id not in seen:
+                    seen.add(page.id)
+                    blended.append(MatchCandidate(page=page, score=scores[page.id], matched_keywords=[]))
+        blended.sort(key=lambda item: item.score, reverse=True)
+        return blended
+
+    def _refine_scores(self, brief: str, pages: Sequence[NotionPagePreview], timeout: float) -> Dict[str, float]:
+        """BM25 scores of ``pages``; contents not cached yet are fetched concurrently.
+
+        Fetches still running after ``timeout`` seconds are left to finish in
+        the background (they fill the cache for the next call), queued ones are
+        cancelled; those pages get no content score.
+        """
 
-def _normalise_text(value: str) -> str:
-    value = _strip_accents(value.lower())
-    value = re.sub(r"[^\w\s]", " ", value)
-    value = re.sub(r"\s+", " ", value)
-    return value.strip()
+        fetch = getattr(self.fetcher, "fetch_page_full", None)
+        missing = [page for page in pages if not self.ranker.has(page.id, page.last_edited)] if fetch else []
+        if missing:
+            executor = _get_refine_executor()
+            futures = {
+                executor.submit(copy_context().run, fetch, page.id, domain=page.domain): page
+                for page in missing
+            }
+            done, pending = wait(futures, timeout=max(timeout, 0.0))
+            for future in pending:
+                future.cancel()
+            for future in done:
+                try:
+                    payload = future.result()
+                except Exception as e:
+                    LOGGER.debug("[Matcher] refine fetch failed | page=%s: %s", futures[future].id, e)
+                    continue
+                if isinstance(payload, NotionPageContent):
+                    self._index_content(futures[future], payload)
+            if pending:
+                LOGGER.info(
+                    "[Matcher] refine deadline (%.1fs): %d/%d page(s) kept their metadata score",
+                    timeout, len(pending), len(missing),
+                )
+        return dict(self.ranker.rank(brief, allowed={page.id for page in pages}))
+
+    def _sync_cached_contents(self, pages: Iterable[NotionPagePreview]) -> None:
+        """Index the full contents already in the memory/disk caches (no request).
+
+        Each page version is looked up once; later fetches reach the ranker
+        through ``_refine_scores``.
+        """
+
+        lookup = getattr(self.fetcher, "cached_page_full", None)
+        if lookup is None:
+            return
+        for page in pages:
+            if not self.ranker.needs_lookup(page.id, page.last_edited):
+                continue
+            payload = lookup(page.id, page.last_edited, page.domain)
+            if isinstance(payload, NotionPageContent):
+                self._index_content(page, payload)
+            else:
+                self.ranker.mark_absent(page.id, page.last_edited)
+
+    def _index_content(self, page: NotionPagePreview, payload: NotionPageContent) -> None:
+        text = " ".join([payload.title, " ".join(payload.tags), payload.content])
+        self.ranker.upsert(page.id, text, version=page.last_edited or payload.last_edited)
+
+    def _load_available_pages(self, domains: Optional[Sequence[str]]) -> List[NotionPagePreview]:
+        # Only the requested domains are listed; keep a deterministic domain order
+        data = dict(self.fetcher.iter_databases(domains=domains or None))
+        previews: List[NotionPagePreview] = []
+        for domain in self.fetcher.SANDBOX_DATABASES:
+            previews.extend(data.get(domain, []))
+        return previews
 
 
 __all__ = [
@@ -0,0 +1,160 @@
+"""Embedding providers for the semantic context index.
+
+A provider turns texts into L2-normalised float32 vectors (one row per text),
+so a dot product is a cosine similarity:
+
+- ``hashed`` : offline character n-gram hashing (default). No network, no
+  model download, deterministic across processes; it catches shared roots
+  and inflections ("cartographe" / "cartographie") rather than synonyms.
+- ``openai`` : ``langchain_openai.OpenAIEmbeddings`` (requires the package and
+  ``OPENAI_API_KEY``); any other LangChain ``Embeddings`` object can be wrapped
+  with ``LangChainEmbeddingProvider``.
+
+Configuration:
+- ``CONTEXT_EMBEDDINGS`` (``hashed`` | ``openai``)
+- ``CONTEXT_EMBEDDINGS_DIM`` (default 256) dimension of the hashed vectors
+- ``CONTEXT_EMBEDDINGS_MODEL`` (default ``text-embedding-3-small``)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.notion_content_ranker import tokenize
+
+LOGGER = logging.getLogger(__name__)
+
+
+def normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise each row in place (zero rows are left as is)."""
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class EmbeddingProvider(ABC):
+    """Maps texts to an ``(n, dimension)`` float32 array of unit vectors.
+
+    ``signature`` identifies the vector space: vectors persisted under another
+    signature are discarded instead of being compared.
+    """
+
+    name = "base"
+    dimension = 0
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{self.dimension}"
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return one unit vector per text, as an ``(len(texts), dimension)`` float32 array."""
+
+
+class HashedNgramEmbeddings(EmbeddingProvider):
+    """Signed feature hashing of words and their character n-grams.
+
+    Each distinct word is hashed once (``crc32``, stable across processes) and
+    its sparse vector memoised; a text vector is the sum of its word vectors
+    weighted by ``1 + log(tf)``.
+    """
+
+    name = "hashed"
+
+    def __init__(self, dimension: int = 256, ngram_sizes: Tuple[int, ...] = (3, 4), max_words: int = 200_000) -> None:
+        self.dimension = dimension
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.max_words = max_words
+        self._words: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}:{self.dimension}:{'-'.join(map(str, self.ngram_sizes))}"
+
+    def _word_features(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        cached = self._words.get(word)
+        if cached is not None:
+            return cached
+        padded = f"<{word}>"
+        grams = [word] + [padded[i : i + n] for n in self.ngram_sizes for i in range(len(padded) - n + 1)]
+        hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint32, count=len(grams))
+        indices = (hashes % self.dimension).astype(np.intp)
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        # The whole word weighs as much as all its n-grams together
+        signs[0] *= max(1, len(grams) - 1) ** 0.5
+        signs /= np.linalg.norm(signs)
+        if len(self._words) >= self.max_words:
+            self._words.clear()
+        self._words[word] = (indices, signs)
+        return indices, signs
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            if not counts:
+                continue
+            features = [self._word_features(word) for word in counts]
+            weights = np.repeat(
+                np.fromiter((1.0 + math.log(count) for count in counts.values()), dtype=np.float32, count=len(counts)),
+                [len(indices) for indices, _ in features],
+            )
+            np.add.at(
+                vectors[row],
+                np.concatenate([indices for indices, _ in features]),
+                np.concatenate([signs for _, signs in features]) * weights,
+            )
+        return normalise_rows(vectors)
+
+
+class LangChainEmbeddingProvider(EmbeddingProvider):
+    """Adapter for a LangChain ``Embeddings`` object (``embed_documents``)."""
+
+    def __init__(self, embeddings: Any, name: str, dimension: int = 0) -> None:
+        self.embeddings = embeddings
+        self.name = name
+        self.dimension = dimension
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        vectors = np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32)
+        self.dimension = vectors.shape[1]
+        return normalise_rows(vectors)
+
+
+def create_embedding_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """Build the provider selected by ``name`` or ``CONTEXT_EMBEDDINGS``; falls back to ``hashed``."""
+
+    name = (name or os.getenv("CONTEXT_EMBEDDINGS") or "hashed").lower()
+    if name == "openai":
+        model = os.getenv("CONTEXT_EMBEDDINGS_MODEL", "text-embedding-3-small")
+        try:
+            from langchain_openai import OpenAIEmbeddings
+
+            provider = LangChainEmbeddingProvider(OpenAIEmbeddings(model=model), name=f"openai-{model}")
+            provider.dimension = provider.embed(["dimension"]).shape[1]
+            return provider
+        except Exception as e:
+            LOGGER.warning("Embedding provider 'openai' unavailable, using hashed: %s", e)
+    elif name != "hashed":
+        LOGGER.warning("Unknown CONTEXT_EMBEDDINGS '%s', using hashed", name)
+    return HashedNgramEmbeddings(dimension=int(os.getenv("CONTEXT_EMBEDDINGS_DIM", "256")))
+
+
+__all__ = [
+    "EmbeddingProvider",
+    "HashedNgramEmbeddings",
+    "LangChainEmbeddingProvider",
+    "create_embedding_provider",
+    "normalise_rows",
+]
@@ -0,0 +1,217 @@
+"""
+Index partagé des noms d'entités pour le résolveur de relations
+
+Chaque ``NotionRelationResolver`` (un par export) repaginait les bases
+principales complètes pour n'en lire que les titres. ``SharedNameIndex`` garde
+``{nom normalisé: id}`` par base, partagé par tout le processus (namespace
+``names`` de ``context_cache``) et par les autres processus (tier disque
+``notion_disk_cache``, kind ``names``).
+
+Rafraîchissement incrémental, comme la synchronisation des listings du fetcher :
+- pendant ``NOTION_NAMES_REFRESH_SECONDS`` (300 s par défaut) après la dernière
+  vérification, l'index est servi sans aucun appel Notion ;
+- ensuite une requête filtrée sur ``last_edited_time`` (depuis la page la plus
+  récente connue, titre seul) ramène les pages modifiées ;
+- les pages supprimées ou archivées sont retirées par une réconciliation des
+  ids toutes les ``NOTION_SYNC_RECONCILE_SECONDS`` (6 h par défaut).
+Un listing complet n'a lieu qu'à la première construction.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config.context_cache import context_cache
+from config.notion_disk_cache import notion_disk_cache
+from config.single_flight import notion_single_flight
+
+LOGGER = logging.getLogger(__name__)
+
+ARTICLES = ("le ", "la ", "les ", "l'", "un ", "une ", "des ")
+
+
+def normalize_entity_name(name: str) -> str:
+    """Normalise un nom pour comparaison (minuscules, sans accents, articles)"""
+    # Retirer accents
+    name = unicodedata.normalize("NFD", name)
+    name = "".join(c for c in name if unicodedata.category(c) != "Mn")
+
+    # Minuscules
+    name = name.lower().strip()
+
+    # Retirer articles courants
+    for article in ARTICLES:
+        if name.startswith(article):
+            name = name[len(article):]
+
+    # Nettoyer espaces multiples
+    return " ".join(name.split())
+
+
+def record_title(record: Dict[str, Any]) -> str:
+    """Texte de la propriété titre d'une page (``Nom``, ``Name``...)"""
+    for prop_value in (record.get("properties") or {}).values():
+        if prop_value.get("type") == "title":
+            title_array = prop_value.get("title") or []
+            return title_array[0].get("plain_text", "").strip() if title_array else ""
+    return ""
+
+
+@dataclass
+class DomainNames:
+    """Noms d'une base : ``entities`` {nom normalisé: id}, ``metadata`` {id: {name, url}}"""
+
+    database_id: str
+    entities: Dict[str, str]
+    metadata: Dict[str, dict]
+    # État persisté : {"records": {id: (nom, url, last_edited)}, "high_water", "reconciled_at"}
+    state: Dict[str, Any] = field(repr=False)
+    checked_at: float = 0.0
+
+    @classmethod
+    def from_state(cls, database_id: str, state: Dict[str, Any]) -> "DomainNames":
+        entities: Dict[str, str] = {}
+        metadata: Dict[str, dict] = {}
+        for notion_id, (name, url, _) in state["records"].items():
+            entities[normalize_entity_name(name)] = notion_id
+            metadata[notion_id] = {"name": name, "url": url}
+        return cls(database_id, entities, metadata, state, checked_at=state.get("checked_at", 0.0))
+
+
+class SharedNameIndex:
+    """Noms des bases Notion, persistés et rafraîchis par ``last_edited_time``."""
+
+    def __init__(self, refresh_interval: Optional[float] = None, reconcile_interval: Optional[float] = None) -> None:
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("NOTION_NAMES_REFRESH_SECONDS", "300"))
+        if reconcile_interval is None:
+            reconcile_interval = float(os.getenv("NOTION_SYNC_RECONCILE_SECONDS", str(6 * 3600)))
+        self.refresh_interval = refresh_interval
+        self.reconcile_interval = reconcile_interval
+
+    def get(self, database_id: str, client_factory: Callable[[], Any], force_refresh: bool = False) -> DomainNames:
+        """
+        Noms de ``database_id`` ; ``client_factory`` n'est appelé que s'il faut interroger Notion
+
+        ``force_refresh`` ignore l'intervalle de rafraîchissement (requête
+        incrémentale, pas de listing complet).
+        """
+        if not force_refresh:
+            names = context_cache.get("names", database_id)
+            if names is not None and time.time() - names.checked_at < self.refresh_interval:
+                return names
+        # Les exports simultanés sur la même base partagent un rafraîchissement
+        return notion_single_flight.do(
+            ("names", database_id, force_refresh),
+            lambda: self._refresh(database_id, client_factory, force_refresh),
+        )
+
+    def invalidate(self, database_id: Optional[str] = None) -> None:
+        """Oublie l'index d'une base (ou de toutes) : le prochain accès relistera"""
+        if database_id is None:
+            context_cache.invalidate("names")
+            notion_disk_cache.invalidate("names")
+        else:
+            context_cache.invalidate("names", database_id)
+            notion_disk_cache.invalidate("names", database_id)
+
+    def _refresh(self, database_id: str, client_factory: Callable[[], Any], force_refresh: bool) -> DomainNames:
+        current = context_cache.get("names", database_id)
+        state = current.state if current is not None else notion_disk_cache.get("names", database_id)
+        now = time.time()
+        if state and not force_refresh and now - state.get("checked_at", 0.0) < self.refresh_interval:
+            # Un autre processus vient de vérifier : aucun appel
+            names = current or DomainNames.from_state(database_id, state)
+            names.checked_at = state["checked_at"]
+            context_cache.set("names", database_id, names)
+            return names
+
+        previous = state
+        try:
+            client = client_factory()
+            changed = False
+            if state and state.get("high_water"):
+                # Copie : une requête en échec ne laisse pas l'état servi à moitié fusionné
+                state = {**state, "records": dict(state["records"])}
+                since = state["high_water"]
+                delta = []
+                for record in client.iter_pages(
+                    database_id,
+                    filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}},
+                    sorts=[{"timestamp": "last_edited_time", "direction": "descending"}],
+                    filter_properties=["title"],
+                    page_size=100,
+                ):
+                    if (record.get("last_edited_time") or "") < since:
+                        break
+                    delta.append(record)
+                changed = self._merge(state, delta)
+                LOGGER.debug("[Names] delta | db=%s records=%s changed=%s", database_id, len(delta), changed)
+                if now - state.get("reconciled_at", 0.0) >= self.reconcile_interval:
+                    changed = self._reconcile(state, client, database_id) or changed
+            else:
+                state = {"records": {}, "high_water": "", "reconciled_at": now}
+                self._merge(state, client.iter_pages(database_id, filter_properties=["title"], page_size=100))
+                changed = True
+                LOGGER.info("[Names] full listing | db=%s names=%s", database_id, len(state["records"]))
+        except Exception as e:
+            if not previous:
+                raise
+            # Notion indisponible : l'index connu reste servi, checked_at inchangé (nouvel essai au prochain appel)
+            LOGGER.warning("[Names] refresh failed, serving the known index | db=%s: %s", database_id, e)
+            names = current or DomainNames.from_state(database_id, previous)
+            context_cache.set("names", database_id, names)
+            return names
+
+        state["checked_at"] = now
+        notion_disk_cache.set("names", database_id, state, state["high_water"])
+        # Sans changement, les mêmes dictionnaires restent servis (index n-grammes conservé)
+        names = current if current is not None and not changed else DomainNames.from_state(database_id, state)
+        names.state, names.checked_at = state, now
+        context_cache.set("names", database_id, names)
+        return names
+
+    @staticmethod
+    def _merge(state: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> bool:
+        merged: Dict[str, tuple] = state["records"]
+        changed = False
+        for record in records:
+            notion_id = record.get("id")
+            if not notion_id:
+                continue
+            name = record_title(record)
+            if record.get("archived") or record.get("in_trash") or not name:
+                changed = merged.pop(notion_id, None) is not None or changed
+                continue
+            edited = record.get("last_edited_time") or ""
+            entry = (name, record.get("url", ""), edited)
+            if merged.get(notion_id) != entry:
+                merged[notion_id] = entry
+                changed = True
+            state["high_water"] = max(state["high_water"], edited)
+        return changed
+
+    def _reconcile(self, state: Dict[str, Any], client: Any, database_id: str) -> bool:
+        try:
+            records = client.iter_pages(database_id, filter_properties=["title"], page_size=100)
+            live_ids = {record["id"] for record in records if record.get("id")}
+        except Exception as e:
+            LOGGER.warning("[Names] reconciliation failed | db=%s: %s", database_id, e)
+            return False
+        removed = [notion_id for notion_id in state["records"] if notion_id not in live_ids]
+        for notion_id in removed:
+            del state["records"][notion_id]
+        state["reconciled_at"] = time.time()
+        LOGGER.info("[Names] reconciliation | db=%s removed=%s", database_id, len(removed))
+        return bool(removed)
+
+
+# Partagé par tous les résolveurs du processus (un par export).
+shared_name_index = SharedNameIndex()
+
+__all__ = ["DomainNames", "SharedNameIndex", "normalize_entity_name", "record_title", "shared_name_index"]
@@ -3,20 +3,259 @@ Résolveur de relations Notion avec fuzzy matching
 
 Permet de :
 - Fetch les noms d'entités existantes dans Notion (léger)
-- Fuzzy matching pour correspondances approximatives
-- Cache en mémoire pour performances
+- Fuzzy matching pour correspondances approximatives, présélection par index
+  n-grammes (``NameNgramIndex``) et similarités mémoïsées
+- Index des noms partagé entre exports et processus, persisté et rafraîchi
+  par ``last_edited_time`` (``agents.notion_name_index``)
 - Architecture extensible pour auto-création future
 """
 
 import os
-import requests
-import unicodedata
-from typing import Dict, List, Optional, Tuple
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 from difflib import SequenceMatcher
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from agents.notion_context_fetcher import DirectNotionClient
+from agents.notion_name_index import normalize_entity_name, shared_name_index
 from config.notion_config import NotionConfig
 
 
+NGRAM_SIZE = 3
+# Colonnes des compteurs de caractères (ord % CHAR_BUCKETS) : les collisions
+# ne font qu'augmenter la borne, qui reste une borne supérieure valide.
+CHAR_BUCKETS = 64
+
+
+def _ngrams(value: str, size: int = NGRAM_SIZE) -> Set[str]:
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+def _char_counts(values: Sequence[str]) -> np.ndarray:
+    counts = np.zeros((len(values), CHAR_BUCKETS), dtype=np.uint16)
+    for row, value in enumerate(values):
+        for ch in value:
+            counts[row, ord(ch) % CHAR_BUCKETS] += 1
+    return counts
+
+
+class _RatioBound:
+    """
+    Borne supérieure de ``SequenceMatcher(None, query, value).ratio()``
+
+    Les blocs communs ne peuvent pas contenir plus de caractères que
+    l'intersection des multisets de caractères : ``2 * inter / (len_a + len_b)``
+    majore le ratio (même formule que difflib). Les valeurs sont triées par
+    longueur pour ne calculer la borne que sur la bande de longueurs compatible.
+    """
+
+    def __init__(self, values: Sequence[str]):
+        order = sorted(range(len(values)), key=lambda i: len(values[i]))
+        self._order = np.array(order, dtype=np.int64)
+        self._lengths = np.array([len(values[i]) for i in order], dtype=np.int64)
+        self._counts = _char_counts([values[i] for i in order])
+
+    def above(self, query: str, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices (dans ``values``) dont la borne atteint ``threshold``, et leurs bornes"""
+        size = len(query)
+        # 2 * min(la, lb) / (la + lb) >= threshold (bande élargie à l'entier)
+        low = int(size * threshold / (2 - threshold))
+        high = int(size * (2 - threshold) / threshold) + 1
+        start = int(np.searchsorted(self._lengths, low, side="left"))
+        stop = int(np.searchsorted(self._lengths, high, side="right"))
+        if start >= stop:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0, dtype=np.float64)
+        query_counts = _char_counts([query])[0]
+        inter = np.minimum(self._counts[start:stop], query_counts).sum(axis=1)
+        bounds = 2.0 * inter / (size + self._lengths[start:stop])
+        keep = bounds >= threshold
+        return self._order[start:stop][keep], bounds[keep]
+
+
+class NameNgramIndex:
+    """
+    Index des noms normalisés d'un domaine pour ``find_match``
+
+    Présélectionne les noms pouvant atteindre le seuil, règle par règle de
+    ``calculate_similarity`` :
+    - sous-chaîne : trigrammes (le nom contient la requête) ou sous-chaînes
+      de la requête (la requête contient le nom)
+    - mots communs : nombre de mots partagés avec la requête
+    - premier mot : borne puis ratio exact sur les premiers mots distincts
+    - ratio global : borne par compteurs de caractères (``_RatioBound``)
+
+    Seuls les noms dont la borne du ratio global dépasse le score partiel
+    passent par ``SequenceMatcher``, par borne décroissante. Aucun nom
+    atteignant le seuil n'est écarté : le résultat est celui du parcours complet.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = sorted(names)
+        self._position: Dict[str, int] = {name: position for position, name in enumerate(self.names)}
+        self._grams: Dict[str, List[int]] = {}
+        self._words: Dict[str, List[int]] = {}
+        self._first_words: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.names):
+            for gram in _ngrams(name):
+                self._grams.setdefault(gram, []).append(position)
+            words = name.split()
+            for word in set(words):
+                self._words.setdefault(word, []).append(position)
+            if words:
+                self._first_words.setdefault(words[0], []).append(position)
+        self._first_word_list = list(self._first_words)
+        self._name_bound = _RatioBound(self.names)
+        self._first_word_bound = _RatioBound(self._first_word_list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def shortlist(self, query: str, threshold: float) -> Tuple[Set[int], Dict[int, float]]:
+        """
+        Candidats pour ``query`` (longueur >= ``NGRAM_SIZE``)
+
+        Returns:
+            (positions dont le score partiel peut atteindre ``threshold``,
+            {position: borne du ratio global} pour les bornes >= ``threshold``)
+        """
+        size = len(query)
+        partial: Set[int] = set()
+
+        # Sous-chaîne : max(0.75, 2 * base) en préfixe, max(0.60, 1.5 * base) sinon
+        min_base = threshold / 2 if threshold > 0.75 else 0.0
+        max_length = size / min_base + 1 if min_base else float("inf")
+        rarest = min((self._grams.get(gram, ()) for gram in _ngrams(query)), key=len)
+        partial.update(p for p in rarest if len(self.names[p]) <= max_length and query in self.names[p])
+        for length in range(max(1, int(size * min_base)), size):
+            for start in range(size - length + 1):
+                position = self._position.get(query[start:start + length])
+                if position is not None:
+                    partial.add(position)
+
+        # Mots communs : len(communs) / max(len(mots1), len(mots2)) >= seuil
+        words = query.split()
+        distinct = set(words)
+        if distinct:
+            shared: Counter = Counter()
+            for word in distinct:
+                shared.update(self._words.get(word, ()))
+            partial.update(p for p, count in shared.items() if count / len(distinct) >= threshold)
+
+        # Premier mot à >= 0.80 : score 0.85
+        if words and threshold <= 0.85:
+            rows, _ = self._first_word_bound.above(words[0], 0.80)
+            for row in rows.tolist():
+                word = self._first_word_list[row]
+                if _word_similarity(words[0], word) >= 0.80:
+                    partial.update(self._first_words[word])
+
+        positions, bounds = self._name_bound.above(query, threshold)
+        return partial, dict(zip(positions.tolist(), bounds.tolist()))
+
+    def best(self, query: str, threshold: float) -> Tuple[Optional[str], float]:
+        """
+        Meilleur nom pour ``query`` (premier en ordre lexical à score égal)
+
+        Même résultat que le parcours complet dès que le score atteint
+        ``threshold`` ; parcours complet si la requête est trop courte.
+        """
+        if threshold <= 0 or len(query) < NGRAM_SIZE:
+            best_name, best_score = None, 0.0
+            for name in self.names:
+                score = _similarity(query, name)
+                if score > best_score:
+                    best_name, best_score = name, score
+            return best_name, best_score
+
+        partial, bounds = self.shortlist(query, threshold)
+        # (majorant, position, score exact connu)
+        candidates: List[Tuple[float, int, bool]] = []
+        for position in partial:
+            score = _partial_similarity(query, self.names[position])
+            bound = bounds.get(position)
+            if bound is None or bound <= score:
+                # Ratio global <= score partiel : score exact sans SequenceMatcher
+                if score >= threshold:
+                    candidates.append((score, position, True))
+            else:
+                candidates.append((bound, position, False))
+        candidates.extend((bound, position, False) for position, bound in bounds.items() if position not in partial)
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+
+        best_position, best_score = None, 0.0
+        for bound, position, exact in candidates:
+            # Majorants décroissants : aucun nom restant ne peut gagner
+            if bound < best_score or bound < threshold:
+                break
+            score = bound if exact else _similarity(query, self.names[position])
+            if score > best_score or (score == best_score and best_position is not None and position < best_position):
+                best_position, best_score = position, score
+        return (None if best_position is None else self.names[best_position]), best_score
+
+
+@lru_cache(maxsize=50_000)
+def _word_similarity(word1: str, word2: str) -> float:
+    return SequenceMatcher(None, word1, word2).ratio()
+
+
+def _partial_similarity(str1: str, str2: str) -> float:
+    """Score de ``calculate_similarity`` hors ratio global (sous-chaîne, mots)"""
+    # Partial matching : vérifier si l'un est dans l'autre
+    shorter, longer = (str1, str2) if len(str1) < len(str2) else (str2, str1)
+
+    if shorter in longer:
+        # Substring exacte : score élevé basé sur la proportion
+        base_ratio = len(shorter) / len(longer)
+
+        # Boost important si c'est au début (préfixe)
+        if longer.startswith(shorter):
+            # Préfixe exact : score minimum 0.75 (très bon match)
+            partial_ratio = max(0.75, base_ratio * 2)
+        else:
+            # Substring au milieu/fin : score minimum 0.60
+            partial_ratio = max(0.60, base_ratio * 1.5)
+    else:
+        # Pas de substring exacte : utiliser le ratio des mots communs
+        words1 = set(str1.split())
+        words2 = set(str2.split())
+        if words1 and words2:
+            common_words = words1.intersection(words2)
+            partial_ratio = len(common_words) / max(len(words1), len(words2))
+        else:
+            partial_ratio = 0.0
+
+    # Mots composés : si le 1er mot matche bien, boost le score
+    # Ex: "humain modifie" → "humains" (premier mot très similaire)
+    words1_list = str1.split()
+    words2_list = str2.split()
+    if words1_list and words2_list:
+        first_word_ratio = _word_similarity(words1_list[0], words2_list[0])
+        # Si le premier mot matche à > 80%, considérer comme bon match
+        if first_word_ratio >= 0.80:
+            partial_ratio = max(partial_ratio, 0.85)
+
+    return partial_ratio
+
+
+@lru_cache(maxsize=200_000)
+def _similarity(str1: str, str2: str) -> float:
+    """Implémentation mémoïsée de ``NotionRelationResolver.calculate_similarity``."""
+    # Ratio global classique, puis meilleur des scores partiels
+    global_ratio = SequenceMatcher(None, str1, str2).ratio()
+    return max(global_ratio, _partial_similarity(str1, str2))
+
+
+# Index n-grammes partagés par tous les resolvers : {domain: (entities, index)}
+_name_indexes: Dict[str, Tuple[Dict[str, str], NameNgramIndex]] = {}
+
+
 @dataclass
 class EntityMatch:
     """Résultat d'un match fuzzy"""
@@ -27,6 +266,43 @@ class EntityMatch:
     domain: str
 
 
+@dataclass
+class ResolutionReport:
+    """
+    Bilan de ``resolve_many``
+
+    - ``relations`` : {domaine: [(nom, EntityMatch ou None)]} dans l'ordre
+      demandé, dédupliqué sur l'ID Notion comme ``resolve_relations``
+    - ``matches`` : {domaine: {nom: EntityMatch ou None}} avant déduplication
+    - ``duplicates`` : {domaine: [noms dont l'ID est déjà résolu]}
+    - ``unavailable`` : domaines sans index (non configurés, vides ou en erreur)
+    - ``load_seconds`` : durée du chargement (parallèle) des index
+    """
+    relations: Dict[str, List[Tuple[str, Optional[EntityMatch]]]] = field(default_factory=dict)
+    matches: Dict[str, Dict[str, Optional[EntityMatch]]] = field(default_factory=dict)
+    duplicates: Dict[str, List[str]] = field(default_factory=dict)
+    unavailable: List[str] = field(default_factory=list)
+    load_seconds: float = 0.0
+
+    def find(self, domain: str, name: str) -> Optional[EntityMatch]:
+        """Match d'un nom demandé (même s'il a été dédupliqué)"""
+        return self.matches.get(domain, {}).get(name)
+
+    def resolved(self, domain: str) -> List[EntityMatch]:
+        return [match for _, match in self.relations.get(domain, []) if match]
+
+    def unresolved(self, domain: str) -> List[str]:
+        return [name for name, match in self.matches.get(domain, {}).items() if match is None]
+
+    @property
+    def resolved_count(self) -> int:
+        return sum(len(self.resolved(domain)) for domain in self.relations)
+
+    @property
+    def unresolved_count(self) -> int:
+        return sum(len(self.unresolved(domain)) for domain in self.relations)
+
+
 class NotionRelationResolver:
     """
     Résolveur intelligent de relations Notion
@@ -52,6 +328,7 @@ class NotionRelationResolver:
         # Configuration Notion (centralisée)
         self.notion_token = NotionConfig.NOTION_TOKEN or os.getenv("NOTION_TOKEN")
         self.notion_version = NotionConfig.API_VERSION
+        self._notion_client: Optional[DirectNotionClient] = None
         
         # Mapping domaines → Database IDs (PRINCIPALES pour relations)
         # Note: Les entités créées vont dans les sandbox,
@@ -67,32 +344,31 @@ class NotionRelationResolver:
             "communautés": "1886e4d21b4581dea4f4d01beb5e1be2",
         }
     
+    def _get_notion_client(self) -> DirectNotionClient:
+        """Client Notion direct (créé à la demande, réutilisé pour tous les domaines)"""
+        if self._notion_client is None:
+            self._notion_client = DirectNotionClient(headers={
+                "Authorization": f"Bearer {self.notion_token}",
+                "Notion-Version": self.notion_version,
+                "Content-Type": "application/json"
+            })
+        return self._notion_client
+    
     def normalize_name(self, name: str) -> str:
         """Normalise un nom pour comparaison (minuscules, sans accents, articles)"""
-        # Retirer accents
-        name = unicodedata.normalize('NFD', name)
-        name = ''.join(c for c in name if unicodedata.category(c) != 'Mn')
-        
-        # Minuscules
-        name = name.lower().strip()
-        
-        # Retirer articles courants
-        for article in ['le ', 'la ', 'les ', 'l\'', 'un ', 'une ', 'des ']:
-            if name.startswith(article):
-                name = name[len(article):]
-        
-        # Nettoyer espaces multiples
-        name = ' '.join(name.split())
-        
-        return name
+        return normalize_entity_name(name)
     
     def fetch_entity_names(self, domain: str, force_refresh: bool = False) -> Dict[str, str]:
         """
         Fetch les noms d'entités depuis Notion (léger, noms uniquement)
+
+        Servis par ``shared_name_index`` (partagé entre instances et processus,
+        rafraîchi par ``last_edited_time``) : sans modification dans Notion, un
+        nouveau resolver ne fait aucun listing.
         
         Args:
             domain: 'personnages', 'lieux', etc.
-            force_refresh: Force le re-fetch même si en cache
+            force_refresh: Vérifie tout de suite les pages modifiées dans Notion
         
         Returns:
             Dict {name_normalized: notion_id}
@@ -109,73 +385,18 @@ class NotionRelationResolver:
         # 2806e4d21b458012a744d8d6723c8be1 → 2806e4d2-1b45-8012-a744-d8d6723c8be1
         if "-" not in database_id and len(database_id) == 32:
             database_id = f"{database_id[:8]}-{database_id[8:12]}-{database_id[12:16]}-{database_id[16:20]}-{database_id[20:]}"
-        
-        entities = {}
-        metadata = {}
-        
+
         try:
-            # Fetch depuis Notion (Database Query API)
-            headers = {
-                "Authorization": f"Bearer {self.notion_token}",
-                "Notion-Version": self.notion_version,
-                "Content-Type": "application/json"
-            }
-            
-            # Query pour récupérer toutes les pages de la database
-            url = f"https://api.notion.com/v1/databases/{database_id}/query"
-            
-            has_more = True
-            start_cursor = None
-            
-            while has_more:
-                payload = {"page_size": 100}
-                if start_cursor:
-                    payload["start_cursor"] = start_cursor
-                
-                response = requests.post(url, headers=headers, json=payload)
-                
-                if response.status_code != 200:
-                    print(f"Error fetching from Notion: {response.status_code} - {response.text}")
-                    return {}
-                
-                data = response.json()
-                results = data.get("results", [])
-                has_more = data.get("has_more", False)
-                start_cursor = data.get("next_cursor")
-                
-                # Extraire les titres
-                for page in results:
-                    properties = page.get("properties", {})
-                    
-                    # Trouver la propriété title (peut s'appeler "Nom", "Name", etc.)
-                    title_prop = None
-                    for prop_name, prop_value in properties.items():
-                        if prop_value.get("type") == "title":
-                            title_prop = prop_value
-                            break
-                    
-                    if title_prop:
-                        title_array = title_prop.get("title", [])
-                        if title_array and len(title_array) > 0:
-                            name = title_array[0].get("plain_text", "").strip()
-                            if name:
-                                notion_id = page["id"]
-                                normalized = self.normalize_name(name)
-                                entities[normalized] = notion_id
-                                metadata[notion_id] = {
-                                    "name": name,
-                                    "url": page.get("url", "")
-                                }
-            
+            names = shared_name_index.get(database_id, self._get_notion_client, force_refresh=force_refresh)
         except Exception as e:
             print(f"Error in fetch_entity_names: {e}")
             return {}
         
         # Mise en cache
-        self.cache[domain] = entities
-        self.cache_metadata[domain] = metadata
+        self.cache[domain] = names.entities
+        self.cache_metadata[domain] = names.metadata
         
-        return entities
+        return names.entities
     
     def calculate_similarity(self, str1: str, str2: str) -> float:
         """
@@ -186,46 +407,18 @@ class NotionRelationResolver:
         - Partial ratio (pour substrings)
         - Début de chaîne (pour préfixes)
         - Mots composés (ex: "Humain modifié" → "Humains")
+
+        Résultats mémoïsés (les mêmes noms reviennent d'un export à l'autre).
         """
-        # 1. Ratio global classique
-        global_ratio = SequenceMatcher(None, str1, str2).ratio()
-        
-        # 2. Partial matching : vérifier si l'un est dans l'autre
-        shorter, longer = (str1, str2) if len(str1) < len(str2) else (str2, str1)
-        
-        if shorter in longer:
-            # Substring exacte : score élevé basé sur la proportion
-            base_ratio = len(shorter) / len(longer)
-            
-            # Boost important si c'est au début (préfixe)
-            if longer.startswith(shorter):
-                # Préfixe exact : score minimum 0.75 (très bon match)
-                partial_ratio = max(0.75, base_ratio * 2)
-            else:
-                # Substring au milieu/fin : score minimum 0.60
-                partial_ratio = max(0.60, base_ratio * 1.5)
-        else:
-            # Pas de substring exacte : utiliser le ratio des mots communs
-            words1 = set(str1.split())
-            words2 = set(str2.split())
-            if words1 and words2:
-                common_words = words1.intersection(words2)
-                partial_ratio = len(common_words) / max(len(words1), len(words2))
-            else:
-                partial_ratio = 0.0
-        
-        # 3. Mots composés : si le 1er mot matche bien, boost le score
-        # Ex: "humain modifie" → "humains" (premier mot très similaire)
-        words1_list = str1.split()
-        words2_list = str2.split()
-        if words1_list and words2_list:
-            first_word_ratio = SequenceMatcher(None, words1_list[0], words2_list[0]).ratio()
-            # Si le premier mot matche à > 80%, considérer comme bon match
-            if first_word_ratio >= 0.80:
-                partial_ratio = max(partial_ratio, 0.85)
-        
-        # 4. Prendre le meilleur score
-        return max(global_ratio, partial_ratio)
+        return _similarity(str1, str2)
+
+    def name_index(self, domain: str, entities: Dict[str, str]) -> NameNgramIndex:
+        """Index n-grammes de ``entities``, reconstruit quand le dictionnaire change"""
+        cached = _name_indexes.get(domain)
+        if cached is None or cached[0] is not entities:
+            cached = (entities, NameNgramIndex(entities))
+            _name_indexes[domain] = cached
+        return cached[1]
     
     def find_match(self, name: str, domain: str) -> Optional[EntityMatch]:
         """
@@ -259,16 +452,11 @@ class NotionRelationResolver:
                 domain=domain
             )
         
-        # Fuzzy matching
-        best_match = None
-        best_score = 0.0
-        
-        # Itérer de façon déterministe (ordre lexical)
-        for normalized_name, notion_id in sorted(entities.items(), key=lambda it: it[0]):
-            score = self.calculate_similarity(normalized_query, normalized_name)
-            if score > best_score:
-                best_score = score
-                best_match = (normalized_name, notion_id)
+        # Fuzzy matching sur les noms présélectionnés par l'index (ordre lexical
+        # à score égal, comme le parcours complet)
+        index = self.name_index(domain, entities)
+        matched_name, best_score = index.best(normalized_query, self.fuzzy_threshold)
+        best_match = None if matched_name is None else (matched_name, entities[matched_name])
         
         # Vérifier si le score dépasse le threshold
         if best_match and best_score >= self.fuzzy_threshold:
@@ -295,18 +483,71 @@ class NotionRelationResolver:
         Returns:
             Liste de (name, EntityMatch or None)
         """
+        return self._dedupe(names, [self.find_match(name, domain) for name in names])[0]
+
+    @staticmethod
+    def _dedupe(
+        names: Sequence[str], matches: Sequence[Optional[EntityMatch]]
+    ) -> Tuple[List[Tuple[str, Optional[EntityMatch]]], List[str]]:
+        """Déduplication des relations sur l'ID Notion : (relations, noms écartés)"""
         results: List[Tuple[str, Optional[EntityMatch]]] = []
+        duplicates: List[str] = []
         seen_ids: set[str] = set()
-        for name in names:
-            match = self.find_match(name, domain)
+        for name, match in zip(names, matches):
             if match and match.notion_id in seen_ids:
-                # Déduplication des relations sur l'ID Notion
                 results.append((name, None))
+                duplicates.append(name)
                 continue
             if match:
                 seen_ids.add(match.notion_id)
             results.append((name, match))
-        return results
+        return results, duplicates
+
+    def resolve_many(
+        self, requests: Mapping[str, Sequence[str]], max_workers: Optional[int] = None
+    ) -> ResolutionReport:
+        """
+        Résout en une passe les noms de plusieurs domaines
+
+        Les index de noms manquants sont chargés en parallèle (les latences de
+        listing se recouvrent au lieu de s'additionner), puis chaque nom est
+        résolu une seule fois, dédupliqué par domaine comme ``resolve_relations``.
+
+        Args:
+            requests: {domaine: [noms]}
+            max_workers: Chargements simultanés (défaut : un par domaine)
+        """
+        report = ResolutionReport()
+        domains = [domain for domain, names in requests.items() if names]
+        missing = [domain for domain in domains if domain not in self.cache]
+
+        start = time.perf_counter()
+        if len(missing) > 1:
+            with ThreadPoolExecutor(
+                max_workers=max_workers or len(missing), thread_name_prefix="notion-names"
+            ) as executor:
+                # Chaque chargement garde le contexte de l'appelant (priorité des requêtes)
+                futures = [executor.submit(copy_context().run, self.fetch_entity_names, domain) for domain in missing]
+                for future in futures:
+                    future.result()
+        elif missing:
+            self.fetch_entity_names(missing[0])
+        report.load_seconds = time.perf_counter() - start
+
+        for domain in domains:
+            names = list(requests[domain])
+            available = bool(self.cache.get(domain))
+            if not available:
+                report.unavailable.append(domain)
+            matches: Dict[str, Optional[EntityMatch]] = {}
+            for name in names:
+                if name not in matches:
+                    matches[name] = self.find_match(name, domain) if available else None
+            report.matches[domain] = matches
+            report.relations[domain], report.duplicates[domain] = self._dedupe(
+                names, [matches[name] for name in names]
+            )
+        return report
     
     def create_stub(self, name: str, domain: str) -> Optional[str]:
         """
@@ -5,9 +5,10 @@ Résout le problème des noms de propriétés vs IDs internes
 """
 
 import os
-import requests
 from typing import Dict, Optional
 
+from config.notion_transport import notion_transport
+
 
 class NotionSchemaHelper:
     """
@@ -48,7 +49,7 @@ class NotionSchemaHelper:
             }
             
             url = f"https://api.notion.com/v1/databases/{database_id}"
-            response = requests.get(url, headers=headers)
+            response = notion_transport.get(url, headers=headers)
             
             if response.status_code != 200:
                 print(f"Error fetching schema: {response.status_code} - {response.text}")
@@ -0,0 +1,283 @@
+"""Persistent vector index of the Notion context pages.
+
+Keyword matching (``ContextTokenIndex``, ``ContentRanker``) misses pages that
+describe the brief with other words. ``SemanticIndex`` keeps one embedding per
+page (preview text, or full content once cached) in a contiguous NumPy matrix
+and answers queries with a batched cosine top-k (one matrix product for all
+queries). Embeddings come from a pluggable ``EmbeddingProvider`` (offline
+hashed n-grams by default, see ``agents.notion_embeddings``).
+
+Vectors are recomputed only for pages whose version (``last_edited_time``)
+changed, in batches, and the matrix is saved atomically to an ``.npz`` file so
+that a restart or another worker does not re-embed the corpus. Saves are
+debounced on a background timer so that ``sync`` (called on the
+``suggest_context`` path) never rewrites the file itself.
+
+Configuration:
+- ``CONTEXT_VECTOR_INDEX`` (default ``true``) persists the index on disk
+- ``CONTEXT_VECTOR_INDEX_PATH`` (default ``.cache/context_vectors.npz`` at the repo root)
+- ``CONTEXT_VECTOR_INDEX_SAVE_DELAY`` (default ``5`` seconds) debounce of the saves
+  (``0`` saves synchronously)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+from pathlib import Path
+from threading import RLock, Timer
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.notion_embeddings import EmbeddingProvider, create_embedding_provider
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "context_vectors.npz"
+
+
+class SemanticIndex:
+    """Thread-safe ``page id -> unit vector`` matrix with versioned rows."""
+
+    def __init__(
+        self,
+        provider: Optional[EmbeddingProvider] = None,
+        path: Optional[os.PathLike[str] | str] = None,
+        persist: Optional[bool] = None,
+        save_delay: Optional[float] = None,
+    ) -> None:
+        self._provider = provider
+        self.path = Path(path or os.getenv("CONTEXT_VECTOR_INDEX_PATH") or DEFAULT_PATH)
+        if persist is None:
+            persist = os.getenv("CONTEXT_VECTOR_INDEX", "true").lower() in ("1", "true", "yes")
+        self.persist = persist
+        if save_delay is None:
+            save_delay = float(os.getenv("CONTEXT_VECTOR_INDEX_SAVE_DELAY", "5"))
+        self.save_delay = save_delay
+        self._lock = RLock()
+        self._ids: List[str] = []
+        self._versions: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._loaded = not persist
+        self._save_timer: Optional[Timer] = None
+        self._dirty = False
+        self.updates = 0
+        if persist:
+            atexit.register(self.flush)
+
+    @property
+    def provider(self) -> EmbeddingProvider:
+        # Built lazily: a remote provider may probe its API on creation
+        if self._provider is None:
+            self._provider = create_embedding_provider()
+        return self._provider
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def version(self, page_id: str) -> Optional[str]:
+        row = self._row_of.get(page_id)
+        return None if row is None else self._versions[row]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._loaded = True
+                    self.load()
+
+    def load(self) -> bool:
+        """Replace the rows by the saved index; False when missing or built by another provider."""
+
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                signature = str(data["signature"])
+                if signature != self.provider.signature:
+                    LOGGER.info("[Semantic] %s built with %s, re-embedding", self.path, signature)
+                    return False
+                ids = [str(page_id) for page_id in data["ids"]]
+                versions = [str(version) or None for version in data["versions"]]
+                vectors = np.array(data["vectors"], dtype=np.float32)
+        except FileNotFoundError:
+            return False
+        except (OSError, KeyError, ValueError) as e:
+            LOGGER.warning("[Semantic] Could not load %s: %s", self.path, e)
+            return False
+        with self._lock:
+            self._ids, self._versions = ids, versions
+            self._row_of = {page_id: row for row, page_id in enumerate(ids)}
+            self._vectors = vectors
+        return True
+
+    def save(self) -> None:
+        """Write the index atomically (temporary file + rename)."""
+
+        # Snapshot under the lock, write outside it: searches are not blocked by the disk
+        with self._lock:
+            if self._vectors is None:
+                return
+            ids = np.array(self._ids, dtype=str)
+            versions = np.array([version or "" for version in self._versions], dtype=str)
+            vectors = self._vectors[: len(self._ids)].copy()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(temporary, "wb") as handle:
+                np.savez(handle, signature=np.array(self.provider.signature), ids=ids, versions=versions, vectors=vectors)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            LOGGER.warning("[Semantic] Could not save %s: %s", self.path, e)
+
+    def _schedule_save(self) -> None:
+        """Save ``save_delay`` seconds after the first pending change (one save per burst)."""
+
+        if self.save_delay <= 0:
+            self.save()
+            return
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self) -> None:
+        """Write the pending changes now (called by the timer and at exit)."""
+
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+            dirty, self._dirty = self._dirty, False
+        if timer is not None:
+            timer.cancel()
+        if dirty:
+            self.save()
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def sync(
+        self,
+        pages: Iterable[Tuple[str, Optional[str]]],
+        text_for: Callable[[str], str],
+        batch_size: int = 256,
+    ) -> int:
+        """Embed the ``(page_id, version)`` pairs whose version changed.
+
+        ``text_for`` is only called for those pages; embeddings are computed
+        ``batch_size`` texts at a time. Returns the number of rows (re)computed.
+        """
+
+        self._ensure_loaded()
+        changed: Dict[str, Optional[str]] = {}
+        for page_id, version in pages:
+            row = self._row_of.get(page_id)
+            if row is None or self._versions[row] != version:
+                changed[page_id] = version
+        if not changed:
+            return 0
+        items = list(changed.items())
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            vectors = self.provider.embed([text_for(page_id) for page_id, _ in batch])
+            with self._lock:
+                for (page_id, version), vector in zip(batch, vectors):
+                    self._put(page_id, version, vector)
+        self.updates += len(items)
+        if self.persist:
+            self._schedule_save()
+        return len(items)
+
+    def _put(self, page_id: str, version: Optional[str], vector: np.ndarray) -> None:
+        row = self._row_of.get(page_id)
+        if row is None:
+            row = len(self._ids)
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((max(64, row * 2), vector.shape[0]), dtype=np.float32)
+            elif row >= self._vectors.shape[0]:
+                # Geometric growth keeps appends amortised O(1)
+                grown = np.zeros((self._vectors.shape[0] * 2, self._vectors.shape[1]), dtype=np.float32)
+                grown[:row] = self._vectors[:row]
+                self._vectors = grown
+            self._ids.append(page_id)
+            self._versions.append(version)
+            self._row_of[page_id] = row
+        else:
+            self._versions[row] = version
+        self._vectors[row] = vector
+
+    def remove(self, page_ids: Iterable[str]) -> None:
+        """Drop rows (the last row is moved into each freed slot)."""
+
+        with self._lock:
+            for page_id in page_ids:
+                row = self._row_of.pop(page_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._ids[row], self._versions[row] = moved, self._versions[last]
+                    self._vectors[row] = self._vectors[last]
+                    self._row_of[moved] = row
+                self._ids.pop()
+                self._versions.pop()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        allowed: Optional[Collection[str]] = None,
+        min_score: Optional[float] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """Cosine top-k for each query, computed as one ``(queries x pages)`` product."""
+
+        self._ensure_loaded()
+        if not queries:
+            return []
+        query_vectors = self.provider.embed(list(queries))
+        with self._lock:
+            size = len(self._ids)
+            if size == 0 or top_k <= 0:
+                return [[] for _ in queries]
+            scores = query_vectors @ self._vectors[:size].T
+            if allowed is not None:
+                mask = np.zeros(size, dtype=bool)
+                rows = [self._row_of[page_id] for page_id in allowed if page_id in self._row_of]
+                mask[rows] = True
+                scores[:, ~mask] = -np.inf
+            ids = list(self._ids)
+
+        k = min(top_k, size)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results: List[List[Tuple[str, float]]] = []
+        for row_scores, rows in zip(scores, top):
+            rows = rows[np.argsort(-row_scores[rows], kind="stable")]
+            hits = []
+            for row in rows:
+                score = float(row_scores[row])
+                if score == -np.inf or (min_score is not None and score < min_score):
+                    break
+                hits.append((ids[row], score))
+            results.append(hits)
+        return results
+
+    def search(self, query: str, **kwargs) -> List[Tuple[str, float]]:
+        return self.search_many([query], **kwargs)[0]
+
+
+# Shared by every matcher of the process, like ``context_token_index``.
+semantic_index = SemanticIndex()
+
+__all__ = ["SemanticIndex", "semantic_index"]
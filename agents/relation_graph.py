@@ -3,8 +3,10 @@
 Module pour gérer et visualiser le graphe de relations entre entités Alteir
 """
 import sys
+from array import array
+from collections import Counter, deque
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, Iterable, List, Set, Tuple, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -92,19 +94,48 @@ class Relation:
             weight=self.weight
         )
 
+# Codes compacts des types de relations (index dans le stockage des arêtes)
+RELATION_TYPES: List[RelationType] = list(RelationType)
+RELATION_TYPE_CODES: Dict[RelationType, int] = {rel_type: code for code, rel_type in enumerate(RELATION_TYPES)}
+
+
 class RelationGraph:
-    """Graphe de relations entre entités"""
+    """
+    Graphe de relations entre entités
+
+    Les entités reçoivent un id entier (``_node_ids`` / ``_node_keys``) et chaque
+    arête est stockée sous forme compacte dans des tableaux parallèles
+    (``_edge_source``, ``_edge_target``, ``_edge_type``) : l'arête ``i`` correspond
+    à ``relations[i]``. Les index sortants, entrants et par type, tenus à jour par
+    ``add_relation``, rendent les requêtes de voisinage et de degré O(degré).
+    """
     
     def __init__(self):
         self.entities: Dict[str, Entity] = {}
         self.relations: List[Relation] = []
         self._adjacency: Dict[str, Set[str]] = {}
+        # Ids entiers des entités
+        self._node_ids: Dict[str, int] = {}
+        self._node_keys: List[str] = []
+        # Stockage compact des arêtes (ids entiers, code de type)
+        self._edge_source = array("i")
+        self._edge_target = array("i")
+        self._edge_type = array("B")
+        # Index : id entier -> indices d'arêtes ; code de type -> indices d'arêtes
+        self._out_edges: List[List[int]] = []
+        self._in_edges: List[List[int]] = []
+        self._edges_by_type: List[List[int]] = [[] for _ in RELATION_TYPES]
     
     def add_entity(self, entity: Entity):
         """Ajoute une entité au graphe"""
         self.entities[entity.id] = entity
         if entity.id not in self._adjacency:
             self._adjacency[entity.id] = set()
+        if entity.id not in self._node_ids:
+            self._node_ids[entity.id] = len(self._node_keys)
+            self._node_keys.append(entity.id)
+            self._out_edges.append([])
+            self._in_edges.append([])
     
     def add_relation(self, relation: Relation):
         """Ajoute une relation au graphe"""
@@ -117,7 +148,17 @@ class RelationGraph:
             return
         
         # Ajouter la relation
+        edge = len(self.relations)
+        source = self._node_ids[relation.source_id]
+        target = self._node_ids[relation.target_id]
+        type_code = RELATION_TYPE_CODES[relation.type]
         self.relations.append(relation)
+        self._edge_source.append(source)
+        self._edge_target.append(target)
+        self._edge_type.append(type_code)
+        self._out_edges[source].append(edge)
+        self._in_edges[target].append(edge)
+        self._edges_by_type[type_code].append(edge)
         self._adjacency[relation.source_id].add(relation.target_id)
         
         # Si bidirectionnelle, ajouter la relation inverse
@@ -128,13 +169,17 @@ class RelationGraph:
         """Récupère une entité par son ID"""
         return self.entities.get(entity_id)
     
+    def _edges(self, index: List[List[int]], entity_id: str) -> List[int]:
+        node = self._node_ids.get(entity_id)
+        return index[node] if node is not None else []
+    
     def get_relations_from(self, entity_id: str) -> List[Relation]:
         """Récupère toutes les relations partant d'une entité"""
-        return [r for r in self.relations if r.source_id == entity_id]
+        return [self.relations[edge] for edge in self._edges(self._out_edges, entity_id)]
     
     def get_relations_to(self, entity_id: str) -> List[Relation]:
         """Récupère toutes les relations arrivant à une entité"""
-        return [r for r in self.relations if r.target_id == entity_id]
+        return [self.relations[edge] for edge in self._edges(self._in_edges, entity_id)]
     
     def get_all_relations(self, entity_id: str) -> List[Relation]:
         """Récupère toutes les relations d'une entité (sortantes et entrantes)"""
@@ -144,19 +189,24 @@ class RelationGraph:
         """Alias pour get_all_relations (utilisé par le visualizer)"""
         return self.get_all_relations(entity_id)
     
+    def out_degree(self, entity_id: str) -> int:
+        """Nombre de relations partant d'une entité"""
+        return len(self._edges(self._out_edges, entity_id))
+    
+    def in_degree(self, entity_id: str) -> int:
+        """Nombre de relations arrivant à une entité"""
+        return len(self._edges(self._in_edges, entity_id))
+    
+    def degree(self, entity_id: str) -> int:
+        """Nombre total de relations d'une entité (= len(get_all_relations))"""
+        return self.out_degree(entity_id) + self.in_degree(entity_id)
+    
     def get_neighbors(self, entity_id: str) -> Set[Entity]:
         """Récupère tous les voisins directs d'une entité"""
-        neighbors = set()
-        for relation in self.get_all_relations(entity_id):
-            if relation.source_id == entity_id:
-                neighbor_entity = self.get_entity(relation.target_id)
-                if neighbor_entity:
-                    neighbors.add(neighbor_entity)
-            else:
-                neighbor_entity = self.get_entity(relation.source_id)
-                if neighbor_entity:
-                    neighbors.add(neighbor_entity)
-        return neighbors
+        keys = self._node_keys
+        neighbor_ids = {keys[self._edge_target[edge]] for edge in self._edges(self._out_edges, entity_id)}
+        neighbor_ids.update(keys[self._edge_source[edge]] for edge in self._edges(self._in_edges, entity_id))
+        return {self.entities[neighbor_id] for neighbor_id in neighbor_ids}
     
     def get_entities_by_type(self, entity_type: EntityType) -> List[Entity]:
         """Récupère toutes les entités d'un type donné"""
@@ -164,32 +214,94 @@ class RelationGraph:
     
     def get_relations_by_type(self, relation_type: RelationType) -> List[Relation]:
         """Récupère toutes les relations d'un type donné"""
-        return [r for r in self.relations if r.type == relation_type]
+        return [self.relations[edge] for edge in self._edges_by_type[RELATION_TYPE_CODES[relation_type]]]
     
-    def get_subgraph(self, entity_ids: List[str], depth: int = 1) -> 'RelationGraph':
-        """Extrait un sous-graphe centré sur des entités avec une profondeur donnée"""
+    def get_subgraph(
+        self,
+        entity_ids: Iterable[str],
+        depth: int = 1,
+        direction: str = "out",
+        relation_types: Optional[Iterable[RelationType]] = None,
+        max_nodes: Optional[int] = None,
+    ) -> 'RelationGraph':
+        """
+        Extrait un sous-graphe centré sur des entités avec une profondeur donnée
+
+        Parcours en largeur depuis ``entity_ids`` jusqu'à ``depth`` sauts, en
+        suivant les arêtes sortantes (``"out"``), entrantes (``"in"``) ou les deux
+        (``"both"``), limité aux ``relation_types`` s'ils sont fournis. Avec
+        ``max_nodes``, le parcours s'arrête dès que ce nombre d'entités est atteint
+        (les plus proches sont gardées). Le sous-graphe contient toutes les
+        relations (des types retenus) entre les entités atteintes et partage les
+        objets ``Entity`` / ``Relation`` du graphe complet.
+        """
+        if direction not in ("out", "in", "both"):
+            raise ValueError(f"direction must be 'out', 'in' or 'both', got {direction!r}")
+        allowed = None if relation_types is None else {RELATION_TYPE_CODES[t] for t in relation_types}
+        nodes = self._reachable(entity_ids, depth, direction, allowed, max_nodes)
+
         subgraph = RelationGraph()
-        visited = set()
-        queue = [(eid, 0) for eid in entity_ids]
-        
+        for node in nodes:
+            subgraph.add_entity(self.entities[self._node_keys[node]])
+        included = set(nodes)
+        edges = [
+            edge
+            for node in nodes
+            for edge in self._out_edges[node]
+            if self._edge_target[edge] in included and (allowed is None or self._edge_type[edge] in allowed)
+        ]
+        # Ordre d'insertion du graphe complet
+        for edge in sorted(edges):
+            subgraph.add_relation(self.relations[edge])
+        return subgraph
+    
+    def _reachable(
+        self,
+        entity_ids: Iterable[str],
+        depth: int,
+        direction: str,
+        allowed: Optional[Set[int]],
+        max_nodes: Optional[int],
+    ) -> List[int]:
+        """Ids entiers atteints par BFS, dans l'ordre de découverte"""
+        budget = len(self._node_keys) if max_nodes is None else max_nodes
+        steps = []
+        if direction in ("out", "both"):
+            steps.append((self._out_edges, self._edge_target))
+        if direction in ("in", "both"):
+            steps.append((self._in_edges, self._edge_source))
+        edge_type = self._edge_type
+
+        seen: Set[int] = set()
+        order: List[int] = []
+        queue: deque = deque()
+        for entity_id in entity_ids:
+            node = self._node_ids.get(entity_id)
+            if node is None or node in seen:
+                continue
+            if len(order) >= budget:
+                return order
+            seen.add(node)
+            order.append(node)
+            queue.append((node, 0))
+
         while queue:
-            current_id, current_depth = queue.pop(0)
-            
-            if current_id in visited or current_depth > depth:
+            node, node_depth = queue.popleft()
+            if node_depth >= depth:
                 continue
-            
-            visited.add(current_id)
-            entity = self.get_entity(current_id)
-            if entity:
-                subgraph.add_entity(entity)
-                
-                # Ajouter les relations et voisins
-                for relation in self.get_relations_from(current_id):
-                    subgraph.add_relation(relation)
-                    if current_depth < depth:
-                        queue.append((relation.target.id, current_depth + 1))
-        
-        return subgraph
+            for index, ends in steps:
+                for edge in index[node]:
+                    if allowed is not None and edge_type[edge] not in allowed:
+                        continue
+                    neighbor = ends[edge]
+                    if neighbor in seen:
+                        continue
+                    if len(order) >= budget:
+                        return order
+                    seen.add(neighbor)
+                    order.append(neighbor)
+                    queue.append((neighbor, node_depth + 1))
+        return order
     
     def to_networkx(self):
         """Convertit le graphe en graphe NetworkX"""
@@ -221,14 +333,12 @@ class RelationGraph:
         return G
     
     def stats(self) -> Dict[str, any]:
-        """Retourne des statistiques sur le graphe"""
-        entity_type_counts = {}
-        for entity_type in EntityType:
-            entity_type_counts[entity_type.value] = len(self.get_entities_by_type(entity_type))
-        
-        relation_type_counts = {}
-        for relation_type in RelationType:
-            relation_type_counts[relation_type.value] = len(self.get_relations_by_type(relation_type))
+        """Retourne des statistiques sur le graphe (un seul passage sur les entités)"""
+        entity_counts = Counter(entity.type for entity in self.entities.values())
+        entity_type_counts = {entity_type.value: entity_counts[entity_type] for entity_type in EntityType}
+        relation_type_counts = {
+            relation_type.value: len(edges) for relation_type, edges in zip(RELATION_TYPES, self._edges_by_type)
+        }
         
         return {
             "total_entities": len(self.entities),
@@ -238,7 +348,6 @@ class RelationGraph:
             "avg_connections_per_entity": len(self.relations) / len(self.entities) if self.entities else 0
         }
 
-
 def extract_relations_from_notion_entity(entity_data: Dict) -> List[Tuple[str, str, RelationType]]:
     """
     Extrait les relations depuis les données Notion d'une entité
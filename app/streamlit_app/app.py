@@ -36,6 +36,28 @@ ABOUT_MARKDOWN = """
 """
 
 
+def _start_cache_warm_up() -> None:
+    """Précharge le cache Notion en arrière-plan (une fois par processus)."""
+    import os
+
+    from config.notion_config import NotionConfig
+
+    enabled = os.getenv("NOTION_WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    is_pytest = any("PYTEST_CURRENT_TEST" in k for k in os.environ.keys())
+    if not enabled or is_pytest or not NotionConfig.validate_token():
+        return
+    try:
+        from agents.notion_cache_warmup import start_background_warm_up, warmup_status
+
+        start_background_warm_up()
+        status = warmup_status()
+        with st.sidebar:
+            st.caption(("✅ " if status.finished else "🔄 ") + status.describe())
+    except Exception:
+        # Le préchauffage est une optimisation: ne jamais bloquer l'UI
+        pass
+
+
 def run_app() -> None:
     """Entry point for the Streamlit UI."""
     import os
@@ -55,6 +77,7 @@ def run_app() -> None:
         st.warning("⚠️ **ANTHROPIC_API_KEY manquante ou invalide** dans `.env`. Les modèles Claude ne fonctionneront pas.")
 
     selected_model, model_info, domain = render_sidebar()
+    _start_cache_warm_up()
 
     # Global banner: show only if it matches current domain to avoid cross-domain noise
     try:
@@ -15,6 +15,7 @@ from agents.notion_context_fetcher import (
     NotionPagePreview,
 )
 from agents.notion_context_matcher import MatchSuggestion, NotionContextMatcher
+from config.context_cache import Freshness
 
 # Domains exposed to the user in the selector
 CONTEXT_DOMAINS = ["personnages", "lieux", "communautes", "especes", "objets"]
@@ -89,14 +90,14 @@ def _render_suggestions(brief: str, domain_key: str, matcher: NotionContextMatch
             targets = DOMAIN_SUGGESTION_TARGETS.get(domain_key, CONTEXT_DOMAINS)
             try:
                 with st.spinner("Génération des suggestions..."):
-                    # Ultra-rapide: suggestions basées uniquement sur les titres/métadonnées
-                    # Réutilise les aperçus déjà préchargés au lancement (aucun refetch)
+                    # Réutilise les aperçus déjà préchargés au lancement (aucun refetch de listing).
+                    # Le contenu complet affine les scores : les fiches en cache sont classées
+                    # sans requête, les autres sont chargées en parallèle dans la limite du délai.
                     available = [p for d in targets for p in previews_by_domain.get(d, [])]
                     suggestions = matcher.suggest_context(
                         brief,
                         max_fiches=9,
                         domains=targets,
-                        use_full_content=False,
                         available_pages=available,
                     )
                 selection["suggestions"] = suggestions
@@ -161,64 +162,66 @@ def _render_suggestions(brief: str, domain_key: str, matcher: NotionContextMatch
                 if suggestion.matched_keywords:
                     keywords = ", ".join(suggestion.matched_keywords)
                     st.caption(f"Correspondances : {keywords}")
+                if not suggestion.refined:
+                    st.caption("Score calculé sur les métadonnées uniquement (contenu complet indisponible)")
 
 
-def _render_manual_selection(previews_by_domain: Dict[str, List[NotionPagePreview]]) -> None:
+def _create_manual_tabs() -> Dict[str, Any]:
     st.subheader("🗂️ Sélection manuelle")
     tabs = st.tabs([domain.capitalize() for domain in CONTEXT_DOMAINS])
+    return dict(zip(CONTEXT_DOMAINS, tabs))
 
-    for tab, domain in zip(tabs, CONTEXT_DOMAINS):
-        with tab:
-            pages = previews_by_domain.get(domain, [])
-            # Tri alphabétique insensible à la casse sur le titre
+
+def _render_domain_tab(domain: str, pages: List[NotionPagePreview]) -> None:
+    # Tri alphabétique insensible à la casse sur le titre
+    try:
+        pages = sorted(pages, key=lambda p: (p.title or "").lower())
+    except Exception:
+        pass
+    if not pages:
+        st.caption("Aucune fiche disponible dans ce domaine.")
+        return
+
+    # Dynamic search simple (filtrage côté Python)
+    search = st.text_input(
+        "Recherche",
+        key=f"context_search_{domain}",
+        placeholder="Nom ou mot-clé",
+    )
+    def _match(p: NotionPagePreview, q: str) -> bool:
+        if not q:
+            return True
+        ql = q.lower()
+        return (ql in (p.title or '').lower()) or (ql in (p.summary or '').lower())
+
+    filtered = [page for page in pages if _match(page, search)]
+
+    cols = st.columns(4)
+    for idx, page in enumerate(filtered[:80]):
+        with cols[idx % 4]:
+            checked = page.id in st.session_state.context_selection["selected_ids"]
+            checkbox_key = f"manual_{domain}_{page.id}"
+            checkbox = st.checkbox(
+                f"{page.title}",
+                value=checked,
+                key=checkbox_key,
+                help=page.summary or "Sans aperçu",
+            )
+            # Record mapping for force-commit later
             try:
-                pages = sorted(pages, key=lambda p: (p.title or "").lower())
+                st.session_state._context_checkbox_index[checkbox_key] = {
+                    "id": page.id,
+                    "title": page.title,
+                    "domain": page.domain,
+                    "summary": page.summary,
+                    # Retirer l'estimation de tokens des fiches
+                    "token_estimate": 0,
+                    "last_edited": page.last_edited,
+                    "tags": getattr(page, "tags", []) or [],
+                }
             except Exception:
                 pass
-            if not pages:
-                st.caption("Aucune fiche disponible dans ce domaine.")
-                continue
-
-            # Dynamic search simple (filtrage côté Python)
-            search = st.text_input(
-                "Recherche",
-                key=f"context_search_{domain}",
-                placeholder="Nom ou mot-clé",
-            )
-            def _match(p: NotionPagePreview, q: str) -> bool:
-                if not q:
-                    return True
-                ql = q.lower()
-                return (ql in (p.title or '').lower()) or (ql in (p.summary or '').lower())
-
-            filtered = [page for page in pages if _match(page, search)]
-
-            cols = st.columns(4)
-            for idx, page in enumerate(filtered[:80]):
-                with cols[idx % 4]:
-                    checked = page.id in st.session_state.context_selection["selected_ids"]
-                    checkbox_key = f"manual_{domain}_{page.id}"
-                    checkbox = st.checkbox(
-                        f"{page.title}",
-                        value=checked,
-                        key=checkbox_key,
-                        help=page.summary or "Sans aperçu",
-                    )
-                    # Record mapping for force-commit later
-                    try:
-                        st.session_state._context_checkbox_index[checkbox_key] = {
-                            "id": page.id,
-                            "title": page.title,
-                            "domain": page.domain,
-                            "summary": page.summary,
-                            # Retirer l'estimation de tokens des fiches
-                            "token_estimate": 0,
-                            "last_edited": page.last_edited,
-                            "tags": getattr(page, "tags", []) or [],
-                        }
-                    except Exception:
-                        pass
-                    _toggle_selection(page, checkbox)
+            _toggle_selection(page, checkbox)
 
 
 def _render_selected_summary(fetcher: NotionContextFetcher) -> Dict[str, Any]:
@@ -293,34 +296,59 @@ def render_context_selector(domain: str, brief: str) -> Dict[str, Any]:
     fetcher = _get_fetcher()
     matcher = _get_matcher(fetcher)
 
-    # Récupération des fiches (utilise le cache interne du fetcher)
+    # Les suggestions ont besoin de tous les domaines: on réserve leur place
+    # au-dessus des onglets et on les rend une fois le chargement terminé.
+    suggestions_slot = st.container()
+    tabs = _create_manual_tabs()
+
+    # Récupération des fiches (utilise le cache interne du fetcher); chaque
+    # onglet est rendu dès que son domaine arrive, sans attendre le plus lent.
     progress_bar = st.progress(10)
     status_text = st.empty()
+    previews_by_domain: Dict[str, List[NotionPagePreview]] = {}
     try:
         status_text.text("🔄 Préchargement des fiches depuis le bac à sable…")
-        previews_by_domain = fetcher.fetch_all_databases(force_refresh=False, lightweight=True)
+        for loaded_domain, pages in fetcher.iter_databases(force_refresh=False, lightweight=True):
+            previews_by_domain[loaded_domain] = pages
+            if loaded_domain in tabs:
+                with tabs[loaded_domain]:
+                    _render_domain_tab(loaded_domain, pages)
+            done = sum(1 for d in CONTEXT_DOMAINS if d in previews_by_domain)
+            progress_bar.progress(10 + int(90 * done / len(CONTEXT_DOMAINS)))
+            status_text.text(f"🔄 {loaded_domain.capitalize()} chargé ({len(pages)} fiche(s))…")
         total_pages = sum(len(pages) for pages in previews_by_domain.values())
         progress_bar.progress(100)
         status_text.text("")
         st.info(f"✓ {total_pages} fiche(s) préchargée(s) pour la sélection")
+        # Listings expirés servis depuis le cache pendant leur actualisation
+        refreshing = [
+            name for name, state in fetcher.listing_freshness().items()
+            if state in (Freshness.STALE, Freshness.REFRESHING)
+        ]
+        if refreshing:
+            st.caption(f"🔄 Actualisation en arrière-plan : {', '.join(refreshing)}…")
     except NotionClientUnavailable:
         status_text.text("")
         progress_bar.progress(0)
-        previews_by_domain = {d: [] for d in CONTEXT_DOMAINS}
         st.warning("Connexion Notion indisponible (mode hors ligne)")
     except HTTPError as e:
         status_text.text("")
         progress_bar.progress(0)
-        previews_by_domain = {d: [] for d in CONTEXT_DOMAINS}
         st.error(f"❌ Erreur API Notion: {e}")
     except Exception as e:  # pragma: no cover - robustesse UI
         status_text.text("")
         progress_bar.progress(0)
-        previews_by_domain = {d: [] for d in CONTEXT_DOMAINS}
         st.error(f"❌ Erreur lors de la récupération des fiches: {e}")
 
-    _render_suggestions(brief, domain_key, matcher, previews_by_domain)
-    _render_manual_selection(previews_by_domain)
+    # Domaines non reçus (non configurés ou en erreur): onglet vide
+    for missing in CONTEXT_DOMAINS:
+        if missing not in previews_by_domain:
+            previews_by_domain[missing] = []
+            with tabs[missing]:
+                _render_domain_tab(missing, [])
+
+    with suggestions_slot:
+        _render_suggestions(brief, domain_key, matcher, previews_by_domain)
     summary = _render_selected_summary(fetcher)
 
     return summary
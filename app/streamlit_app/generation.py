@@ -205,22 +205,21 @@ def _build_context_payload(context_summary: Optional[Dict[str, Any]]) -> Optiona
     st.info(f"📚 Chargement de {len(selected_ids)} fiche(s) Notion pour le contexte...")
 
     fetcher = NotionContextFetcher()
-    full_pages = []
     preview_map = {item.get("id"): item for item in context_summary.get("previews", [])}
+    domain_hints = {page_id: preview_map.get(page_id, {}).get("domain") for page_id in selected_ids}
 
-    for page_id in selected_ids:
-        preview = preview_map.get(page_id, {})
-        domain_hint = preview.get("domain")
-        try:
-            full_page = fetcher.fetch_page_full(page_id, domain=domain_hint)
-            full_pages.append(full_page)
-            st.caption(f"  ✓ {full_page.title} ({full_page.domain})")
-        except NotionClientUnavailable:
+    # Chargement concurrent; les résultats reviennent dans l'ordre de la sélection
+    results = fetcher.fetch_pages_full(selected_ids, domains=domain_hints)
+    full_pages = []
+    for result in results:
+        if isinstance(result.error, NotionClientUnavailable):
             st.warning("⚠️ Impossible de charger une fiche Notion sélectionnée (mode hors ligne).")
             return None
-        except Exception as e:
-            st.warning(f"⚠️ Erreur lors du chargement de la fiche {page_id}: {e}")
+        if result.error is not None:
+            st.warning(f"⚠️ Erreur lors du chargement de la fiche {result.page_id}: {result.error}")
             continue
+        full_pages.append(result.page)
+        st.caption(f"  ✓ {result.page.title} ({result.page.domain})")
 
     if not full_pages:
         st.warning("⚠️ Aucune fiche n'a pu être chargée. Génération sans contexte.")
@@ -291,14 +290,18 @@ def generate_content(
         creativity=creativity,
     )
 
-    context_payload = _build_context_payload(context_summary)
+    # The Vision page is loaded in the background while the selected pages are fetched
+    from concurrent.futures import ThreadPoolExecutor
+    from config.notion_config import NotionConfig
+
+    vision_fetcher = NotionContextFetcher()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="notion-vision") as executor:
+        vision_future = executor.submit(vision_fetcher.fetch_page_full, NotionConfig.VISION_PAGE_ID, "vision")
+        context_payload = _build_context_payload(context_summary)
     # Inject Vision page as primary context
     try:
-        from config.notion_config import NotionConfig
-        from agents.notion_context_fetcher import NotionContextFetcher
-        vision_id = NotionConfig.VISION_PAGE_ID
-        fetcher = NotionContextFetcher()
-        vision_page = fetcher.fetch_page_full(vision_id, domain="vision")
+        fetcher = vision_fetcher
+        vision_page = vision_future.result()
         # Convert to plain dict to ensure JSON-serializable context
         vision_page_dict = {
             "id": vision_page.id,
@@ -37,7 +37,7 @@ def render_graph_tab():
         if graph.entities:
             most_connected = max(
                 graph.entities.keys(),
-                key=lambda eid: len(graph.get_all_relations(eid)),
+                key=graph.degree,
             )
             entity = graph.get_entity(most_connected)
             st.metric("Hub principal", entity.name if entity else "N/A")
@@ -6,12 +6,54 @@ import os
 import re
 from pathlib import Path
 
-import requests
 import streamlit as st
 
 from .cache import list_output_files, load_result_file
+from agents.notion_block_writer import PartialPageError, create_page_with_blocks, markdown_to_blocks, rich_text
+from agents.notion_relation_resolver import NotionRelationResolver, ResolutionReport
 from config.notion_config import NotionConfig
 
+# Champs relationnels exportés par domaine : (propriété Notion, domaine ciblé, plusieurs noms ?)
+RELATION_FIELDS = {
+    "personnages": [
+        ("Espèce", "especes", False),
+        ("Communautés", "communautes", True),
+        ("Alliés", "personnages", True),
+        ("Ennemis", "personnages", True),
+    ],
+    "lieux": [
+        ("Secteurs reliés", "lieux", True),
+        ("Figures associées", "personnages", True),
+        ("Organisations impliquées", "communautes", True),
+    ],
+    "especes": [("Aire de répartition", "lieux", True)],
+    "communautes": [("Lieux d'influence", "lieux", True)],
+}
+
+
+def relation_names(raw: str, multiple: bool = True) -> list[str]:
+    """Noms d'un champ relationnel (séparés par ``,`` ou ``;`` ; le premier seul si ``multiple`` est faux)"""
+    names = [name.strip() for name in re.split(r"[,;]\s*", raw) if name.strip()]
+    return names if multiple else names[:1]
+
+
+def field_relations(report: ResolutionReport, domain: str, names: list[str]) -> tuple[list[dict], list[str]]:
+    """Relations d'un champ (résolues, non trouvées), dédupliquées sur l'ID Notion comme ``resolve_relations``"""
+    matches = [report.find(domain, name) for name in names]
+    relations, _ = NotionRelationResolver._dedupe(names, matches)
+    resolved = [
+        {
+            "id": match.notion_id,
+            "original": name,
+            "matched": match.matched_name,
+            "confidence": match.confidence,
+        }
+        for name, match in relations
+        if match
+    ]
+    unresolved = [name for name, match in zip(names, matches) if match is None]
+    return resolved, unresolved
+
 
 def export_to_notion(result, container: st.delta_generator.DeltaGenerator | None = None):
     """Exporte le résultat vers Notion (BAC À SABLE) et affiche un feedback.
@@ -187,7 +229,7 @@ def export_to_notion(result, container: st.delta_generator.DeltaGenerator | None
 
                 if reponse := extract_field("Réponse au problème moral", content):
                     notion_properties["Réponse au problème moral"] = {
-                        "rich_text": [{"text": {"content": reponse[:2000]}}]
+                        "rich_text": rich_text(reponse)
                     }
 
             elif domain == "lieux":
@@ -229,324 +271,32 @@ def export_to_notion(result, container: st.delta_generator.DeltaGenerator | None
                     if vals:
                         notion_properties["Méthodes"] = {"multi_select": [{"name": v} for v in vals]}
 
-            from agents.notion_relation_resolver import NotionRelationResolver
-
             resolver = NotionRelationResolver(fuzzy_threshold=0.80)
             relation_stats = {"resolved": 0, "unresolved": 0, "details": []}
 
-            if domain == "personnages":
-                if espece_raw := extract_field("Espèce", content):
-                    espece_name = espece_raw.split(",")[0].split(";")[0].strip()
-
-                    match = resolver.find_match(espece_name, "especes")
-                    if match:
-                        notion_properties["Espèce"] = {
-                            "relation": [{"id": match.notion_id.replace("-", "")}]
-                        }
-                        relation_stats["resolved"] += 1
-                        relation_stats["details"].append(
-                            {
-                                "field": "Espèce",
-                                "resolved": [
-                                    {
-                                        "id": match.notion_id,
-                                        "original": espece_name,
-                                        "matched": match.matched_name,
-                                        "confidence": match.confidence,
-                                    }
-                                ],
-                                "unresolved": [],
-                            }
-                        )
-                    else:
-                        relation_stats["unresolved"] += 1
-                        relation_stats["details"].append(
-                            {
-                                "field": "Espèce",
-                                "resolved": [],
-                                "unresolved": [espece_name],
-                            }
-                        )
-
-                if communautes_raw := extract_field("Communautés", content):
-                    communautes_names = re.split(r"[,;]\s*", communautes_raw)
-                    communautes_names = [n.strip() for n in communautes_names if n.strip()]
-
-                    communautes_resolved = []
-                    communautes_unresolved = []
-
-                    for comm_name in communautes_names:
-                        match = resolver.find_match(comm_name, "communautes")
-                        if match:
-                            communautes_resolved.append(
-                                {
-                                    "id": match.notion_id,
-                                    "original": comm_name,
-                                    "matched": match.matched_name,
-                                    "confidence": match.confidence,
-                                }
-                            )
-                        else:
-                            communautes_unresolved.append(comm_name)
-
-                    if communautes_resolved:
-                        notion_properties["Communautés"] = {
-                            "relation": [
-                                {"id": cr["id"].replace("-", "")} for cr in communautes_resolved
-                            ]
-                        }
-                        relation_stats["resolved"] += len(communautes_resolved)
-
-                    relation_stats["unresolved"] += len(communautes_unresolved)
-                    if communautes_resolved or communautes_unresolved:
-                        relation_stats["details"].append(
-                            {
-                                "field": "Communautés",
-                                "resolved": communautes_resolved,
-                                "unresolved": communautes_unresolved,
-                            }
-                        )
-
-                if allies_raw := extract_field("Alliés", content):
-                    allies_names = re.split(r"[,;]\s*", allies_raw)
-                    allies_names = [n.strip() for n in allies_names if n.strip()]
-
-                    allies_resolved = []
-                    allies_unresolved = []
-
-                    for ally_name in allies_names:
-                        match = resolver.find_match(ally_name, "personnages")
-                        if match:
-                            allies_resolved.append(
-                                {
-                                    "id": match.notion_id,
-                                    "original": ally_name,
-                                    "matched": match.matched_name,
-                                    "confidence": match.confidence,
-                                }
-                            )
-                        else:
-                            allies_unresolved.append(ally_name)
-
-                    if allies_resolved:
-                        notion_properties["Alliés"] = {
-                            "relation": [
-                                {"id": ar["id"].replace("-", "")} for ar in allies_resolved
-                            ]
-                        }
-                        relation_stats["resolved"] += len(allies_resolved)
-
-                    relation_stats["unresolved"] += len(allies_unresolved)
-                    if allies_resolved or allies_unresolved:
-                        relation_stats["details"].append(
-                            {
-                                "field": "Alliés",
-                                "resolved": allies_resolved,
-                                "unresolved": allies_unresolved,
-                            }
-                        )
-
-                if ennemis_raw := extract_field("Ennemis", content):
-                    ennemis_names = re.split(r"[,;]\s*", ennemis_raw)
-                    ennemis_names = [n.strip() for n in ennemis_names if n.strip()]
-
-                    ennemis_resolved = []
-                    ennemis_unresolved = []
-
-                    for ennemi_name in ennemis_names:
-                        match = resolver.find_match(ennemi_name, "personnages")
-                        if match:
-                            ennemis_resolved.append(
-                                {
-                                    "id": match.notion_id,
-                                    "original": ennemi_name,
-                                    "matched": match.matched_name,
-                                    "confidence": match.confidence,
-                                }
-                            )
-                        else:
-                            ennemis_unresolved.append(ennemi_name)
-
-                    if ennemis_resolved:
-                        notion_properties["Ennemis"] = {
-                            "relation": [
-                                {"id": er["id"].replace("-", "")} for er in ennemis_resolved
-                            ]
-                        }
-                        relation_stats["resolved"] += len(ennemis_resolved)
-
-                    relation_stats["unresolved"] += len(ennemis_unresolved)
-                    if ennemis_resolved or ennemis_unresolved:
-                        relation_stats["details"].append(
-                            {
-                                "field": "Ennemis",
-                                "resolved": ennemis_resolved,
-                                "unresolved": ennemis_unresolved,
-                            }
-                        )
-
-            elif domain == "lieux":
-                if secteurs_raw := extract_field("Secteurs reliés", content):
-                    secteurs_names = re.split(r"[,;]\s*", secteurs_raw)
-                    secteurs_names = [n.strip() for n in secteurs_names if n.strip()]
-
-                    from agents.notion_relation_resolver import NotionRelationResolver
-                    resolver = NotionRelationResolver(fuzzy_threshold=0.80)
-                    secteurs_resolved = []
-                    secteurs_unresolved = []
-
-                    for secteur_name in secteurs_names:
-                        match = resolver.find_match(secteur_name, "lieux")
-                        if match:
-                            secteurs_resolved.append(
-                                {
-                                    "id": match.notion_id,
-                                    "original": secteur_name,
-                                    "matched": match.matched_name,
-                                    "confidence": match.confidence,
-                                }
-                            )
-                        else:
-                            secteurs_unresolved.append(secteur_name)
-
-                    if secteurs_resolved:
-                        notion_properties["Secteurs reliés"] = {
-                            "relation": [
-                                {"id": sr["id"].replace("-", "")} for sr in secteurs_resolved
-                            ]
-                        }
-                        relation_stats["resolved"] += len(secteurs_resolved)
-
-                    relation_stats["unresolved"] += len(secteurs_unresolved)
-                    if secteurs_resolved or secteurs_unresolved:
-                        relation_stats["details"].append(
-                            {
-                                "field": "Secteurs reliés",
-                                "resolved": secteurs_resolved,
-                                "unresolved": secteurs_unresolved,
-                            }
-                        )
-
-                if figures_raw := extract_field("Figures associées", content):
-                    figures_names = re.split(r"[,;]\s*", figures_raw)
-                    figures_names = [n.strip() for n in figures_names if n.strip()]
-
-                    from agents.notion_relation_resolver import NotionRelationResolver
-                    resolver = NotionRelationResolver(fuzzy_threshold=0.80)
-                    figures_resolved = []
-                    figures_unresolved = []
-
-                    for figure_name in figures_names:
-                        match = resolver.find_match(figure_name, "personnages")
-                        if match:
-                            figures_resolved.append(
-                                {
-                                    "id": match.notion_id,
-                                    "original": figure_name,
-                                    "matched": match.matched_name,
-                                    "confidence": match.confidence,
-                                }
-                            )
-                        else:
-                            figures_unresolved.append(figure_name)
-
-                    if figures_resolved:
-                        notion_properties["Figures associées"] = {
-                            "relation": [
-                                {"id": fr["id"].replace("-", "")} for fr in figures_resolved
-                            ]
-                        }
-                        relation_stats["resolved"] += len(figures_resolved)
-
-                    relation_stats["unresolved"] += len(figures_unresolved)
-                    if figures_resolved or figures_unresolved:
-                        relation_stats["details"].append(
-                            {
-                                "field": "Figures associées",
-                                "resolved": figures_resolved,
-                                "unresolved": figures_unresolved,
-                            }
-                        )
-
-                if organisations_raw := extract_field("Organisations impliquées", content):
-                    organisations_names = re.split(r"[,;]\s*", organisations_raw)
-                    organisations_names = [n.strip() for n in organisations_names if n.strip()]
-
-                    from agents.notion_relation_resolver import NotionRelationResolver
-                    resolver = NotionRelationResolver(fuzzy_threshold=0.80)
-                    organisations_resolved = []
-                    organisations_unresolved = []
-
-                    for organisation_name in organisations_names:
-                        match = resolver.find_match(organisation_name, "communautes")
-                        if match:
-                            organisations_resolved.append(
-                                {
-                                    "id": match.notion_id,
-                                    "original": organisation_name,
-                                    "matched": match.matched_name,
-                                    "confidence": match.confidence,
-                                }
-                            )
-                        else:
-                            organisations_unresolved.append(organisation_name)
-
-                    if organisations_resolved:
-                        notion_properties["Organisations impliquées"] = {
-                            "relation": [
-                                {"id": or_["id"].replace("-", "")} for or_ in organisations_resolved
-                            ]
-                        }
-                        relation_stats["resolved"] += len(organisations_resolved)
-
-                    relation_stats["unresolved"] += len(organisations_unresolved)
-                    if organisations_resolved or organisations_unresolved:
-                        relation_stats["details"].append(
-                            {
-                                "field": "Organisations impliquées",
-                                "resolved": organisations_resolved,
-                                "unresolved": organisations_unresolved,
-                            }
-                        )
-
-            elif domain == "especes":
-                # Relations (facultatives MVP)
-                if lieux_raw := extract_field("Aire de répartition", content):
-                    names = [n.strip() for n in re.split(r"[,;]\s*", lieux_raw) if n.strip()]
-                    if names:
-                        from agents.notion_relation_resolver import NotionRelationResolver
-                        resolver = NotionRelationResolver(fuzzy_threshold=0.80)
-                        resolved = []
-                        unresolved = []
-                        for nm in names:
-                            match = resolver.find_match(nm, "lieux")
-                            if match:
-                                resolved.append({"id": match.notion_id, "original": nm, "matched": match.matched_name, "confidence": match.confidence})
-                            else:
-                                unresolved.append(nm)
-                        if resolved:
-                            notion_properties["Aire de répartition"] = {"relation": [{"id": r["id"].replace("-", "")} for r in resolved]}
-                        if resolved or unresolved:
-                            relation_stats["details"].append({"field": "Aire de répartition", "resolved": resolved, "unresolved": unresolved})
-            elif domain == "communautes":
-                # Relations (facultatives MVP)
-                if lieux_raw := extract_field("Lieux d'influence", content):
-                    names = [n.strip() for n in re.split(r"[,;]\s*", lieux_raw) if n.strip()]
-                    if names:
-                        from agents.notion_relation_resolver import NotionRelationResolver
-                        resolver = NotionRelationResolver(fuzzy_threshold=0.80)
-                        resolved = []
-                        unresolved = []
-                        for nm in names:
-                            match = resolver.find_match(nm, "lieux")
-                            if match:
-                                resolved.append({"id": match.notion_id, "original": nm, "matched": match.matched_name, "confidence": match.confidence})
-                            else:
-                                unresolved.append(nm)
-                        if resolved:
-                            notion_properties["Lieux d'influence"] = {"relation": [{"id": r["id"].replace("-", "")} for r in resolved]}
-                        if resolved or unresolved:
-                            relation_stats["details"].append({"field": "Lieux d'influence", "resolved": resolved, "unresolved": unresolved})
+            # Tous les champs relationnels résolus en une passe : les index de noms
+            # des domaines visés se chargent en parallèle
+            relation_fields = []
+            relation_requests: dict[str, list[str]] = {}
+            for field_name, target_domain, multiple in RELATION_FIELDS.get(domain, []):
+                if raw := extract_field(field_name, content):
+                    names = relation_names(raw, multiple)
+                    relation_fields.append((field_name, target_domain, names))
+                    relation_requests.setdefault(target_domain, []).extend(names)
+            relations = resolver.resolve_many(relation_requests)
+
+            for field_name, target_domain, names in relation_fields:
+                resolved, unresolved = field_relations(relations, target_domain, names)
+                if resolved:
+                    notion_properties[field_name] = {
+                        "relation": [{"id": r["id"].replace("-", "")} for r in resolved]
+                    }
+                relation_stats["resolved"] += len(resolved)
+                relation_stats["unresolved"] += len(unresolved)
+                if resolved or unresolved:
+                    relation_stats["details"].append(
+                        {"field": field_name, "resolved": resolved, "unresolved": unresolved}
+                    )
 
             # Headers depuis la configuration centralisée
             headers = NotionConfig.get_headers()
@@ -589,6 +339,9 @@ def export_to_notion(result, container: st.delta_generator.DeltaGenerator | None
                 "properties": notion_properties_final,
             }
 
+            # Toute la fiche, découpée en lots de 100 blocs (aucun contenu tronqué)
+            blocks = markdown_to_blocks(content)
+
             # Dry-run: ne pas écrire en mode DRY_RUN
             if NotionConfig.DRY_RUN:
                 logger.warning("⚠️ MODE DRY-RUN : aucune page créée")
@@ -597,69 +350,19 @@ def export_to_notion(result, container: st.delta_generator.DeltaGenerator | None
             else:
                 logger.info("  📡 Envoi requête POST à Notion API...")
                 logger.info(f"  - Payload properties: {list(notion_properties.keys())}")
-                response = requests.post(
-                    "https://api.notion.com/v1/pages",
-                    headers=headers,
-                    json=payload,
-                    timeout=30,
-                )
-                logger.info(f"  - Status code: {response.status_code}")
-                response.raise_for_status()
-                page_id = response.json()["id"]
-                page_url = response.json().get("url", "https://www.notion.so")
-                logger.info(f"  ✓ Page créée: {page_id}")
-                logger.info(f"  ✓ URL: {page_url}")
+                logger.info(f"  - Blocs de contenu: {len(blocks)}")
 
-            blocks = []
-            for line in content.split("\n"):
-                if line.startswith("# "):
-                    blocks.append(
-                        {
-                            "heading_1": {
-                                "rich_text": [{"text": {"content": line[2:].strip()[:2000]}}]
-                            }
-                        }
-                    )
-                elif line.startswith("## "):
-                    blocks.append(
-                        {
-                            "heading_2": {
-                                "rich_text": [{"text": {"content": line[3:].strip()[:2000]}}]
-                            }
-                        }
-                    )
-                elif line.startswith("### "):
-                    blocks.append(
-                        {
-                            "heading_3": {
-                                "rich_text": [{"text": {"content": line[4:].strip()[:2000]}}]
-                            }
-                        }
-                    )
-                elif line.startswith("- "):
-                    blocks.append(
-                        {
-                            "bulleted_list_item": {
-                                "rich_text": [{"text": {"content": line[2:].strip()[:2000]}}]
-                            }
-                        }
-                    )
-                else:
-                    blocks.append(
-                        {
-                            "paragraph": {
-                                "rich_text": [{"text": {"content": line[:2000]}}]
-                            }
-                        }
-                    )
+                def _report_progress(sent: int, total: int) -> None:
+                    try:
+                        status_area.info(f"📤 Export vers Notion en cours… {sent}/{total} blocs")
+                    except Exception:
+                        pass
 
-            if blocks and not NotionConfig.DRY_RUN:
-                requests.patch(
-                    f"https://api.notion.com/v1/blocks/{page_id}/children",
-                    headers=headers,
-                    json={"children": blocks[:100]},
-                    timeout=30,
-                )
+                page = create_page_with_blocks(payload, blocks, headers, on_progress=_report_progress)
+                page_id = page["id"]
+                page_url = page.get("url", "https://www.notion.so")
+                logger.info(f"  ✓ Page créée: {page_id}")
+                logger.info(f"  ✓ URL: {page_url}")
 
             relations_summary = ""
             if relation_stats["resolved"] > 0 or relation_stats["unresolved"] > 0:
@@ -778,6 +481,21 @@ def export_to_notion(result, container: st.delta_generator.DeltaGenerator | None
                 "relations": relation_stats,
             }
 
+    except PartialPageError as exc:  # pragma: no cover - network path
+        # La page existe déjà : la signaler plutôt que d'inviter à recréer une copie
+        logger.error(f"❌ Export partiel: {exc}", exc_info=True)
+        container.error(
+            f"❌ Export interrompu : la page a été créée mais seuls {exc.blocks_written}/{exc.total_blocks} "
+            f"blocs ont été écrits. Complétez ou supprimez [la page partielle]({exc.page_url}) "
+            f"(ID `{exc.page_id}`) avant de relancer l'export."
+        )
+        return {
+            "success": False,
+            "error": str(exc),
+            "partial": True,
+            "page_id": exc.page_id,
+            "page_url": exc.page_url,
+        }
     except Exception as exc:  # pragma: no cover - network path
         logger.error(f"❌ Erreur export: {exc}", exc_info=True)
         container.error(f"❌ Erreur lors de l'export : {exc}")
@@ -848,10 +566,11 @@ def show_results():
                 st.session_state._export_results[selected_file] = result_export
             else:
                 # Keep at least an error marker to avoid silent disappear
-                st.session_state._export_results[selected_file] = {
-                    "success": False,
-                    "error": (result_export or {}).get("error") if isinstance(result_export, dict) else "unknown",
-                }
+                st.session_state._export_results[selected_file] = (
+                    result_export
+                    if isinstance(result_export, dict)
+                    else {"success": False, "error": "unknown"}
+                )
 
     with col_download:
         json_path = Path("outputs") / f"{selected_file}.json"
@@ -879,6 +598,8 @@ def show_results():
         )
     elif persisted and isinstance(persisted, dict) and not persisted.get("success"):
         st.error(f"❌ Échec export: {persisted.get('error','inconnu')}")
+        if persisted.get("partial") and persisted.get("page_url"):
+            st.warning(f"⚠️ Une page partielle existe déjà dans Notion : [ouvrir]({persisted['page_url']})")
 
     # Extra safety: when a selection is present but no visible message, render a lightweight hint
     if selected_file and persisted is None:
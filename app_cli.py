@@ -341,6 +341,11 @@ def main():
             input("\nAppuyez sur Entree pour continuer...")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "warm-up":
+        # python app_cli.py warm-up [--max-recent N] : préchauffe le cache Notion
+        from agents.notion_cache_warmup import main as warm_up_main
+
+        sys.exit(warm_up_main(sys.argv[2:]))
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,60 @@
+"""Benchmark: SequenceMatcher refinement vs BM25 over cached full contents.
+
+For synthetic pages with ~400-word bodies, measures:
+- ``seqmatch``: ``score_relevance`` on a refine pool of 45 pages (former refine step)
+- ``index``: ``ContentRanker.upsert`` of every page + first compile
+- ``rank``: BM25 scoring of the whole corpus for one brief
+
+Usage:
+    python -m benchmarks.bench_content_ranker [--sizes 500 5000 20000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.notion_content_ranker import ContentRanker
+from agents.notion_context_matcher import NotionContextMatcher
+from benchmarks.bench_context_matcher import BRIEF, SYLLABLES, WORDS, _best_of
+
+REFINE_POOL = 45
+
+
+def synthetic_contents(count: int, words_per_page: int = 400, seed: int = 11, vocabulary: int = 5000):
+    rng = random.Random(seed)
+    words = WORDS + ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(vocabulary)]
+    return {f"page-{index}": " ".join(rng.choice(words) for _ in range(words_per_page)) for index in range(count)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5_000, 20_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>7} {'seqmatch':>10} {'index':>9} {'rank':>9} {'hits':>7}")
+    for size in args.sizes:
+        contents = synthetic_contents(size)
+        pool = list(contents.values())[:REFINE_POOL]
+        seqmatch = _best_of(1, lambda: [NotionContextMatcher.score_relevance(BRIEF, text) for text in pool])
+
+        ranker = ContentRanker()
+        start = time.perf_counter()
+        for page_id, text in contents.items():
+            ranker.upsert(page_id, text, version="v1")
+        ranker.rank(BRIEF)
+        build = time.perf_counter() - start
+
+        rank = _best_of(args.repeat, lambda: ranker.rank(BRIEF))
+        hits = len(ranker.rank(BRIEF))
+        print(f"{size:>7} {seqmatch * 1000:>8.1f}ms {build * 1000:>7.1f}ms {rank * 1000:>7.2f}ms {hits:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark: linear preview scoring vs the inverted token index.
+
+Builds synthetic corpora of 1k, 10k and 50k previews and measures, for a
+brief typed in the context selector:
+- ``linear``: ``fuzzy_match_pages`` over every page + sort (former behaviour)
+- ``build``: first ``ContextTokenIndex.sync`` (once per listing)
+- ``sync``: re-sync of the unchanged listing (every rerun)
+- ``query``: ``search`` over the matching postings only
+
+Usage:
+    python -m benchmarks.bench_context_matcher [--sizes 1000 10000 50000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.notion_context_fetcher import NotionPagePreview
+from agents.notion_context_index import ContextTokenIndex, _normalise_text
+from agents.notion_context_matcher import NotionContextMatcher
+
+SYLLABLES = ["al", "teir", "ly", "san", "dre", "mi", "relle", "or", "vane", "jast", "cor", "val", "nix", "tha", "bor", "quel"]
+WORDS = [
+    "cartographe", "leviathan", "petrifie", "maree", "abysse", "guilde", "archive", "saline", "veilleur",
+    "confrerie", "ombre", "marchand", "relique", "cite", "foret", "temple", "serment", "dette", "exil",
+    "mecanique", "brume", "tyran", "sanctuaire", "rituel", "memoire", "chant", "faille", "corail", "ancre",
+]
+DOMAINS = ["personnages", "lieux", "communautes", "especes", "objets"]
+BRIEF = "Une cartographe exilée cherche le Léviathan pétrifié dans les abysses avec la confrérie des veilleurs"
+
+
+def synthetic_previews(count: int, seed: int = 7, vocabulary: int = 3000) -> List[NotionPagePreview]:
+    """Deterministic previews with invented names and a vocabulary-based summary.
+
+    ``WORDS`` (shared with the brief) are mixed with ``vocabulary`` invented
+    words so that only part of the corpus matches, as in the real bases.
+    """
+
+    rng = random.Random(seed)
+    words = WORDS + ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(vocabulary)]
+    previews = []
+    for index in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        summary = " ".join(rng.choice(words) for _ in range(12))
+        previews.append(
+            NotionPagePreview(
+                id=f"page-{index}",
+                title=f"{name} {rng.choice(words).capitalize()}",
+                domain=DOMAINS[index % len(DOMAINS)],
+                summary=summary,
+                tags=[rng.choice(words) for _ in range(3)],
+                last_edited="2025-10-01T10:00:00.000Z",
+                token_estimate=120,
+            )
+        )
+    return previews
+
+
+def _best_of(repeat: int, fn: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    keywords = NotionContextMatcher.extract_keywords(BRIEF)
+    brief_tokens = set(_normalise_text(BRIEF).split())
+    print(f"brief keywords={len(keywords)}")
+    print(f"{'pages':>7} {'linear':>9} {'build':>9} {'sync':>9} {'query':>9} {'scored':>7} {'speedup':>8}")
+    for size in args.sizes:
+        pages = synthetic_previews(size)
+
+        def linear():
+            candidates = NotionContextMatcher.fuzzy_match_pages(keywords, pages)
+            candidates.sort(key=lambda c: c.score, reverse=True)
+            return candidates
+
+        index = ContextTokenIndex()
+        start = time.perf_counter()
+        positions = index.sync(pages)
+        build = time.perf_counter() - start
+
+        linear_time = _best_of(args.repeat, linear)
+        sync_time = _best_of(args.repeat, lambda: index.sync(pages))
+        query_time = _best_of(args.repeat, lambda: index.search(keywords, brief_tokens, allowed=positions))
+        scored = len(index.search(keywords, brief_tokens, allowed=positions))
+        print(
+            f"{size:>7} {linear_time * 1000:>7.1f}ms {build * 1000:>7.1f}ms {sync_time * 1000:>7.1f}ms "
+            f"{query_time * 1000:>7.1f}ms {scored:>7} {linear_time / (sync_time + query_time):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
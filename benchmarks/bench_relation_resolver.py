@@ -0,0 +1,129 @@
+"""Benchmark: relation resolution, indexed shortlist vs linear scan.
+
+Resolves ``--queries`` names (exact, typos, prefixes, isolated words, unknown)
+against a synthetic domain of ``--entities`` names and measures:
+- ``build``: ``NameNgramIndex`` construction
+- ``linear``: former ``find_match`` (similarity with every name, cold cache),
+  timed on ``--linear-queries`` names and extrapolated to ``--queries``
+- ``indexed``: ``find_match`` through the index, cold then memoised cache
+Results of both paths are compared on the timed sample.
+
+Usage:
+    python -m benchmarks.bench_relation_resolver [--entities 10000] [--queries 1000] [--linear-queries 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents import notion_relation_resolver
+from agents.notion_relation_resolver import NameNgramIndex, NotionRelationResolver
+
+ONSETS = ["b", "c", "d", "g", "k", "l", "m", "n", "p", "r", "s", "t", "v", "z", "br", "dr", "gr", "tr", "th", "qu", "st"]
+VOWELS = ["a", "e", "i", "o", "u", "ou", "ai", "ei", "au", "y", "ie"]
+CODAS = ["", "", "", "n", "r", "l", "s", "nd", "rk", "x", "m"]
+PATTERNS = ["{0}", "{0} {1}", "{0}", "guilde des {0}", "cite de {0}", "ordre du {0}", "{0} le {1}", "temple de {0}"]
+
+
+def synthetic_names(count: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+
+    def word() -> str:
+        return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS) for _ in range(rng.randint(1, 3)))
+
+    names = set()
+    while len(names) < count:
+        names.add(rng.choice(PATTERNS).format(word(), word()))
+    return sorted(names)
+
+
+def synthetic_queries(names: List[str], count: int, seed: int = 2) -> List[str]:
+    rng = random.Random(seed)
+    queries = []
+    for index in range(count):
+        name = rng.choice(names)
+        kind = index % 5
+        if kind == 0:
+            position = rng.randrange(len(name))
+            queries.append(name[:position] + rng.choice("aeioux") + name[position + 1:])
+        elif kind == 1:
+            queries.append(name[: len(name) // 2 + 1])
+        elif kind == 2:
+            queries.append(name.split()[-1])
+        elif kind == 3:
+            queries.append(name + "s")
+        else:
+            queries.append("".join(rng.choice("bcdfgklmnprstv") for _ in range(rng.randint(4, 12))))
+    return queries
+
+
+def linear_match(resolver: NotionRelationResolver, query: str):
+    """``find_match`` before the index: score every name in lexical order."""
+    normalized = resolver.normalize_name(query)
+    entities = resolver.cache["bench"]
+    if normalized in entities:
+        return entities[normalized], 1.0
+    best, best_score = None, 0.0
+    for name, notion_id in sorted(entities.items()):
+        score = resolver.calculate_similarity(normalized, name)
+        if score > best_score:
+            best, best_score = notion_id, score
+    return (best, best_score) if best and best_score >= resolver.fuzzy_threshold else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--linear-queries", type=int, default=100)
+    parser.add_argument("--threshold", type=float, default=0.80)
+    args = parser.parse_args()
+
+    names = synthetic_names(args.entities)
+    queries = synthetic_queries(names, args.queries)
+    resolver = NotionRelationResolver(fuzzy_threshold=args.threshold)
+    entities = {name: f"id-{position}" for position, name in enumerate(names)}
+    resolver.cache["bench"] = entities
+    resolver.cache_metadata["bench"] = {notion_id: {"name": name, "url": ""} for name, notion_id in entities.items()}
+
+    start = time.perf_counter()
+    index = NameNgramIndex(names)
+    build = time.perf_counter() - start
+    notion_relation_resolver._name_indexes["bench"] = (entities, index)
+
+    sample = queries[: args.linear_queries]
+    notion_relation_resolver._similarity.cache_clear()
+    start = time.perf_counter()
+    expected = [linear_match(resolver, query) for query in sample]
+    linear = (time.perf_counter() - start) / len(sample) * len(queries)
+
+    notion_relation_resolver._similarity.cache_clear()
+    start = time.perf_counter()
+    matches = [resolver.find_match(query, "bench") for query in queries]
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for query in queries:
+        resolver.find_match(query, "bench")
+    warm = time.perf_counter() - start
+
+    got = [(match.notion_id, match.confidence) if match else None for match in matches[: len(sample)]]
+    mismatches = sum(1 for left, right in zip(got, expected) if left != right)
+    resolved = sum(1 for match in matches if match)
+    print(f"entities={len(names)} queries={len(queries)} threshold={args.threshold} resolved={resolved}")
+    print(f"{'build':>10} {'linear*':>10} {'indexed':>10} {'memoised':>10} {'speedup':>8} {'mismatch':>9}")
+    print(
+        f"{build * 1000:>8.1f}ms {linear:>9.2f}s {cold:>9.3f}s {warm:>9.3f}s "
+        f"{linear / cold:>7.0f}x {mismatches:>5}/{len(sample)}"
+    )
+    print(f"* linear extrapolated from {len(sample)} queries")
+
+
+if __name__ == "__main__":
+    main()
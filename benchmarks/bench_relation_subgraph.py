@@ -0,0 +1,112 @@
+"""Benchmark: RelationGraph.get_subgraph, deque BFS vs former list-queue BFS.
+
+Builds a synthetic graph of ``--entities`` entities and ``--edges`` relations
+(a few hub factions/places receive most edges) and extracts ego views
+of the biggest hub:
+- ``legacy``: former algorithm (``queue.pop(0)``, relation list scanned per
+  visited entity, outgoing edges only; ``target_id`` read fixed so it runs)
+- ``bfs``: ``get_subgraph`` for each direction / depth / budget combination
+
+Usage:
+    python -m benchmarks.bench_relation_subgraph [--entities 10000] [--edges 50000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.relation_graph import Entity, EntityType, Relation, RelationGraph, RelationType
+
+
+def synthetic_graph(entities: int, edges: int, hubs: int = 20, seed: int = 1) -> RelationGraph:
+    rng = random.Random(seed)
+    graph = RelationGraph()
+    types = list(EntityType)
+    for index in range(entities):
+        graph.add_entity(Entity(id=f"e{index}", name=f"Entité {index}", type=types[index % len(types)]))
+    relation_types = list(RelationType)
+    for _ in range(edges):
+        source = rng.randrange(entities)
+        # 40 % des relations pointent vers un hub (faction, grande ville)
+        target = rng.randrange(hubs) if rng.random() < 0.4 else rng.randrange(entities)
+        graph.add_relation(Relation(source_id=f"e{source}", target_id=f"e{target}", type=rng.choice(relation_types)))
+    return graph
+
+
+def legacy_subgraph(graph: RelationGraph, entity_ids: List[str], depth: int) -> RelationGraph:
+    """``get_subgraph`` before the adjacency indexes and the deque BFS."""
+    subgraph = RelationGraph()
+    visited = set()
+    queue = [(eid, 0) for eid in entity_ids]
+    while queue:
+        current_id, current_depth = queue.pop(0)
+        if current_id in visited or current_depth > depth:
+            continue
+        visited.add(current_id)
+        entity = graph.get_entity(current_id)
+        if entity:
+            subgraph.entities[entity.id] = entity
+            for relation in [r for r in graph.relations if r.source_id == current_id]:
+                if current_depth < depth:
+                    queue.append((relation.target_id, current_depth + 1))
+    return subgraph
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=10_000)
+    parser.add_argument("--edges", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = synthetic_graph(args.entities, args.edges)
+    build = time.perf_counter() - start
+    hub = max(graph.entities, key=graph.degree)
+    start = time.perf_counter()
+    graph.stats()
+    stats = time.perf_counter() - start
+    print(
+        f"entities={len(graph.entities)} edges={len(graph.relations)} build={build:.2f}s "
+        f"stats={stats * 1000:.1f}ms hub={hub} in={graph.in_degree(hub)} out={graph.out_degree(hub)}"
+    )
+
+    print(f"{'variant':<30} {'time':>10} {'nodes':>7} {'edges':>7}")
+    legacy, legacy_view = timed(lambda: legacy_subgraph(graph, [hub], 2), 1)
+    print(f"{'legacy out depth=2':<30} {legacy * 1000:>8.1f}ms {len(legacy_view.entities):>7} {'-':>7}")
+    cases = [
+        ("out", 2, None),
+        ("in", 1, None),
+        ("both", 1, None),
+        ("both", 2, None),
+        ("both", 3, None),
+        ("both", 3, 500),
+    ]
+    for direction, depth, max_nodes in cases:
+        elapsed, view = timed(
+            lambda: graph.get_subgraph([hub], depth=depth, direction=direction, max_nodes=max_nodes), args.repeat
+        )
+        label = f"bfs {direction} depth={depth}" + (f" max={max_nodes}" if max_nodes else "")
+        print(f"{label:<30} {elapsed * 1000:>8.1f}ms {len(view.entities):>7} {len(view.relations):>7}")
+        if (direction, depth, max_nodes) == ("out", 2, None):
+            assert set(view.entities) == set(legacy_view.entities)
+
+
+if __name__ == "__main__":
+    main()
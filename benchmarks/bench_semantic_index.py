@@ -0,0 +1,63 @@
+"""Benchmark: semantic index build, incremental sync and batched top-k.
+
+For 1k, 10k and 50k synthetic previews, measures:
+- ``embed``: first sync (hashed n-gram embeddings of every page)
+- ``resync``: sync after 1% of the pages were edited
+- ``load``: reload of the persisted ``.npz`` (what a restart pays instead of ``embed``)
+- ``single``/``batched``: 16 queries one by one vs one ``search_many`` call
+
+Usage:
+    python -m benchmarks.bench_semantic_index [--sizes 1000 10000 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agents.notion_embeddings import HashedNgramEmbeddings
+from agents.notion_semantic_index import SemanticIndex
+from benchmarks.bench_context_matcher import BRIEF, WORDS, synthetic_previews
+
+QUERIES = [BRIEF] + [f"{WORDS[i]} {WORDS[-i - 1]} {WORDS[i * 2 % len(WORDS)]}" for i in range(15)]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'pages':>7} {'embed':>9} {'resync':>9} {'load':>9} {'single':>9} {'batched':>9}")
+    for size in args.sizes:
+        pages = {page.id: page for page in synthetic_previews(size)}
+        texts = {page_id: f"{page.title} {page.summary} {' '.join(page.tags)}" for page_id, page in pages.items()}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "vectors.npz"
+            index = SemanticIndex(provider=HashedNgramEmbeddings(), path=path, persist=True)
+            embed, _ = _timed(lambda: index.sync(((page_id, "v1") for page_id in pages), texts.__getitem__))
+            edited = [(page_id, "v2" if position % 100 == 0 else "v1") for position, page_id in enumerate(pages)]
+            resync, _ = _timed(lambda: index.sync(edited, texts.__getitem__))
+            load, _ = _timed(SemanticIndex(provider=HashedNgramEmbeddings(), path=path).load)
+
+            single, _ = _timed(lambda: [index.search(query, top_k=args.top_k) for query in QUERIES])
+            batched, _ = _timed(lambda: index.search_many(QUERIES, top_k=args.top_k))
+        print(
+            f"{size:>7} {embed * 1000:>7.0f}ms {resync * 1000:>7.0f}ms {load * 1000:>7.1f}ms "
+            f"{single * 1000:>7.1f}ms {batched * 1000:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
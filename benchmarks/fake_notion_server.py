@@ -0,0 +1,119 @@
+"""Local fake Notion API used by the benchmarks.
+
+Serves ``GET /v1/blocks/{id}/children`` (with ``page_size``/``start_cursor``
+pagination) from an in-memory block tree and adds a fixed latency to every
+response so that round-trip costs are visible on localhost.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+def build_block_tree(depth: int, fanout: int, root_id: str = "page-root") -> Dict[str, List[Dict[str, Any]]]:
+    """Return ``{parent_id: [blocks]}`` for a synthetic tree.
+
+    Every block above ``depth`` is a toggle with ``fanout`` children; leaves
+    are paragraphs.
+    """
+
+    tree: Dict[str, List[Dict[str, Any]]] = {}
+    frontier = [root_id]
+    for level in range(depth):
+        next_frontier: List[str] = []
+        for parent_id in frontier:
+            children = []
+            for idx in range(fanout):
+                block_id = f"{parent_id}.{idx}"
+                has_children = level < depth - 1
+                block_type = "toggle" if has_children else "paragraph"
+                children.append(
+                    {
+                        "object": "block",
+                        "id": block_id,
+                        "type": block_type,
+                        "has_children": has_children,
+                        block_type: {"rich_text": [{"plain_text": f"Bloc {block_id}"}]},
+                    }
+                )
+                if has_children:
+                    next_frontier.append(block_id)
+            tree[parent_id] = children
+        frontier = next_frontier
+    return tree
+
+
+class FakeNotionServer:
+    """Threaded HTTP server exposing a block tree like the Notion API."""
+
+    def __init__(self, tree: Dict[str, List[Dict[str, Any]]], latency: float = 0.02) -> None:
+        self.tree = tree
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeNotionServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _children_page(self, block_id: str, start: int, size: int) -> Tuple[int, Dict[str, Any]]:
+        if block_id not in self.tree:
+            return 404, {"object": "error", "status": 404, "code": "object_not_found"}
+        children = self.tree[block_id]
+        chunk = children[start : start + size]
+        end = start + len(chunk)
+        has_more = end < len(children)
+        return 200, {
+            "object": "list",
+            "results": chunk,
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None,
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                with server._lock:
+                    server.request_count += 1
+                time.sleep(server.latency)
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")
+                if len(parts) == 4 and parts[:2] == ["v1", "blocks"] and parts[3] == "children":
+                    query = parse_qs(parsed.query)
+                    size = int(query.get("page_size", ["100"])[0])
+                    start = int(query.get("start_cursor", ["0"])[0])
+                    status, body = server._children_page(parts[2], start, size)
+                else:
+                    status, body = 404, {"object": "error", "status": 404}
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                return
+
+        return Handler
@@ -0,0 +1,428 @@
+"""Shared storage tiers for ``ContextCache``.
+
+``ContextCache`` always keeps a per-process LRU in memory. A backend adds a
+second tier behind it, so that several Streamlit workers or the LangGraph
+server running next to the UI share one warm Notion cache instead of each
+keeping a cold copy:
+
+- ``memory`` : no shared tier (default): the in-process LRU of
+  ``ContextCache`` is the memory tier, so ``create_cache_backend`` returns
+  None and values are never pickled
+- ``sqlite`` : SQLite file in WAL mode, safe across threads and processes
+- ``mmap``   : fixed-size memory-mapped append log guarded by a file lock;
+  reads copy bytes straight from the mapping without any query parsing
+
+Values are stored as pickles (protocol 5): the C pickler serialises the
+dataclass payloads (``NotionPagePreview``, ``NotionPageContent``) an order of
+magnitude faster than a JSON round-trip. Values are only pickled when a
+shared tier is configured; the blob length then doubles as the size used for
+the byte limits.
+
+Configuration:
+- ``CONTEXT_CACHE_BACKEND`` (``memory`` | ``sqlite`` | ``mmap``)
+- ``CONTEXT_CACHE_PATH`` (default ``.cache/context_cache.sqlite3`` or ``.cache/context_cache.mmap``)
+- ``CONTEXT_CACHE_MMAP_MB`` (default 64) size of the mapped file
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+
+def serialize(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize(blob: bytes) -> Any:
+    return pickle.loads(blob)
+
+
+class CacheBackend(ABC):
+    """Storage tier shared by every ``ContextCache`` pointing at it.
+
+    Values are opaque serialised blobs with an absolute ``expires_at``
+    timestamp; freshness and staleness are decided by the cache. Failures are
+    logged and treated as misses, never raised to the caller.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def load(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        """Return ``(blob, expires_at)`` or None."""
+
+    def store(self, namespace: str, key: str, blob: bytes, expires_at: float) -> None:
+        self.store_many(namespace, [(key, blob, expires_at)])
+
+    @abstractmethod
+    def store_many(self, namespace: str, items: Iterable[Tuple[str, bytes, float]]) -> None:
+        """Write several ``(key, blob, expires_at)`` entries of ``namespace`` at once."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: Optional[str] = None) -> None:
+        """Remove one key, or the whole namespace when ``key`` is None."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+    def purge_expired(self, namespace: str, before: float) -> int:
+        """Drop entries of ``namespace`` whose ``expires_at`` is before ``before``."""
+
+        return 0
+
+    def close(self) -> None:
+        return None
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS context_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite tier (WAL mode, one connection per thread)."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Optional[os.PathLike[str] | str] = None) -> None:
+        self.path = Path(path or CACHE_DIR / "context_cache.sqlite3")
+        self._local = threading.local()
+        self.enabled = True
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.enabled:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute(_SQLITE_SCHEMA)
+        except sqlite3.Error as e:
+            LOGGER.warning("Context cache backend disabled (%s): %s", self.path, e)
+            self.enabled = False
+            return None
+        self._local.conn = conn
+        return conn
+
+    def load(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM context_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        except sqlite3.Error as e:
+            LOGGER.debug("Context cache read failed (%s/%s): %s", namespace, key, e)
+            return None
+        return (bytes(row[0]), row[1]) if row else None
+
+    def store_many(self, namespace: str, items: Iterable[Tuple[str, bytes, float]]) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        rows = [(namespace, key, sqlite3.Binary(blob), expires_at) for key, blob, expires_at in items]
+        try:
+            # One transaction for the whole batch (a listing stores thousands of records)
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO context_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            LOGGER.debug("Context cache write failed (%s): %s", namespace, e)
+
+    def delete(self, namespace: str, key: Optional[str] = None) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            if key is None:
+                conn.execute("DELETE FROM context_entries WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute("DELETE FROM context_entries WHERE namespace = ? AND key = ?", (namespace, key))
+        except sqlite3.Error as e:
+            LOGGER.debug("Context cache delete failed (%s/%s): %s", namespace, key, e)
+
+    def clear(self) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("DELETE FROM context_entries")
+        except sqlite3.Error as e:
+            LOGGER.debug("Context cache clear failed: %s", e)
+
+    def purge_expired(self, namespace: str, before: float) -> int:
+        conn = self._connection()
+        if conn is None:
+            return 0
+        try:
+            cursor = conn.execute(
+                "DELETE FROM context_entries WHERE namespace = ? AND expires_at <= ?",
+                (namespace, before),
+            )
+        except sqlite3.Error:
+            return 0
+        return cursor.rowcount
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _FileLock:
+    """Exclusive inter-process lock on a side file (flock, or msvcrt on Windows)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._handle = None
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        with self._thread_lock:
+            if self._handle is None:
+                self._handle = open(self.path, "a+b")
+            fd = self._handle.fileno()
+            if os.name == "nt":  # pragma: no cover - Windows only
+                import msvcrt
+
+                self._handle.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    self._handle.seek(0)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        with self._thread_lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+_MAGIC = b"ALTCTX01"
+_HEADER = struct.Struct("<8sQQ")      # magic, generation, end offset
+_HEADER_SIZE = 64
+_RECORD = struct.Struct("<IHHd")      # total length, namespace length, key length, expires_at
+_TOMBSTONE = -1.0                     # one key removed
+_NAMESPACE_TOMBSTONE = -2.0           # whole namespace removed
+
+
+class MmapCacheBackend(CacheBackend):
+    """Append log in a fixed-size memory-mapped file shared by every process.
+
+    Each process keeps an index ``(namespace, key) -> value offset`` and
+    scans the records appended by others since its last look. Deletions
+    append tombstones; when the file is full, live entries are compacted in
+    place and the header generation is bumped so other processes rebuild
+    their index. All access happens under an exclusive file lock.
+    """
+
+    name = "mmap"
+
+    def __init__(self, path: Optional[os.PathLike[str] | str] = None, size: Optional[int] = None) -> None:
+        self.path = Path(path or CACHE_DIR / "context_cache.mmap")
+        self.size = int(size or float(os.getenv("CONTEXT_CACHE_MMAP_MB", "64")) * 1024 * 1024)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file_lock = _FileLock(self.path.with_name(self.path.name + ".lock"))
+        with self._file_lock.hold():
+            with open(self.path, "a+b") as handle:
+                if os.path.getsize(self.path) < self.size:
+                    handle.truncate(self.size)
+            self._file = open(self.path, "r+b")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            self.size = len(self._map)
+            magic, _, _ = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC:
+                _HEADER.pack_into(self._map, 0, _MAGIC, 1, _HEADER_SIZE)
+        self._index: Dict[Tuple[str, str], Tuple[int, int, float]] = {}
+        self._generation = -1
+        self._scanned = _HEADER_SIZE
+
+    # ------------------------------------------------------------------
+    # Log maintenance (callers hold the file lock)
+    # ------------------------------------------------------------------
+
+    def _sync(self) -> None:
+        _, generation, end = _HEADER.unpack_from(self._map, 0)
+        if generation != self._generation:
+            self._index.clear()
+            self._generation = generation
+            self._scanned = _HEADER_SIZE
+        offset = self._scanned
+        while offset < end:
+            total, ns_len, key_len, expires_at = _RECORD.unpack_from(self._map, offset)
+            start = offset + _RECORD.size
+            namespace = self._map[start : start + ns_len].decode("utf-8")
+            key = self._map[start + ns_len : start + ns_len + key_len].decode("utf-8")
+            value_start = start + ns_len + key_len
+            if expires_at == _NAMESPACE_TOMBSTONE:
+                for item in [item for item in self._index if item[0] == namespace]:
+                    del self._index[item]
+            elif expires_at == _TOMBSTONE:
+                self._index.pop((namespace, key), None)
+            else:
+                self._index[(namespace, key)] = (value_start, offset + total - value_start, expires_at)
+            offset += total
+        self._scanned = end
+
+    def _append(self, records: List[Tuple[str, str, bytes, float]]) -> None:
+        encoded = [
+            (namespace.encode("utf-8"), key.encode("utf-8"), blob, expires_at)
+            for namespace, key, blob, expires_at in records
+        ]
+        needed = sum(_RECORD.size + len(ns) + len(k) + len(blob) for ns, k, blob, _ in encoded)
+        _, generation, end = _HEADER.unpack_from(self._map, 0)
+        if end + needed > self.size:
+            self._compact()
+            _, generation, end = _HEADER.unpack_from(self._map, 0)
+            if end + needed > self.size:
+                LOGGER.debug("Context cache mmap full: %s bytes not stored", needed)
+                return
+        offset = end
+        for ns, k, blob, expires_at in encoded:
+            total = _RECORD.size + len(ns) + len(k) + len(blob)
+            _RECORD.pack_into(self._map, offset, total, len(ns), len(k), expires_at)
+            start = offset + _RECORD.size
+            self._map[start : start + len(ns)] = ns
+            self._map[start + len(ns) : start + len(ns) + len(k)] = k
+            self._map[start + len(ns) + len(k) : offset + total] = blob
+            offset += total
+        _HEADER.pack_into(self._map, 0, _MAGIC, generation, offset)
+        self._sync()
+
+    def _compact(self, keep: Optional[Any] = None) -> None:
+        """Rewrite live entries from the start of the log; ``keep(ns, key, expires_at)`` filters them."""
+
+        now = time.time()
+        live = [
+            (namespace, key, bytes(self._map[start : start + length]), expires_at)
+            for (namespace, key), (start, length, expires_at) in self._index.items()
+            if (keep(namespace, key, expires_at) if keep else expires_at > now)
+        ]
+        _, generation, _ = _HEADER.unpack_from(self._map, 0)
+        _HEADER.pack_into(self._map, 0, _MAGIC, generation + 1, _HEADER_SIZE)
+        self._sync()
+        if live:
+            self._append(live)
+
+    # ------------------------------------------------------------------
+    # Backend API
+    # ------------------------------------------------------------------
+
+    def load(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        with self._file_lock.hold():
+            self._sync()
+            found = self._index.get((namespace, key))
+            if found is None:
+                return None
+            start, length, expires_at = found
+            return bytes(self._map[start : start + length]), expires_at
+
+    def store_many(self, namespace: str, items: Iterable[Tuple[str, bytes, float]]) -> None:
+        records = [(namespace, key, blob, expires_at) for key, blob, expires_at in items]
+        if not records:
+            return
+        with self._file_lock.hold():
+            self._sync()
+            self._append(records)
+
+    def delete(self, namespace: str, key: Optional[str] = None) -> None:
+        with self._file_lock.hold():
+            self._sync()
+            if key is None:
+                self._append([(namespace, "", b"", _NAMESPACE_TOMBSTONE)])
+            elif (namespace, key) in self._index:
+                self._append([(namespace, key, b"", _TOMBSTONE)])
+
+    def clear(self) -> None:
+        with self._file_lock.hold():
+            _, generation, _ = _HEADER.unpack_from(self._map, 0)
+            _HEADER.pack_into(self._map, 0, _MAGIC, generation + 1, _HEADER_SIZE)
+            self._sync()
+
+    def purge_expired(self, namespace: str, before: float) -> int:
+        with self._file_lock.hold():
+            self._sync()
+            expired = sum(
+                1 for (ns, _), (_, _, expires_at) in self._index.items() if ns == namespace and expires_at <= before
+            )
+            if expired:
+                self._compact(lambda ns, _key, expires_at: ns != namespace or expires_at > before)
+            return expired
+
+    def close(self) -> None:
+        with self._file_lock.hold():
+            self._map.close()
+            self._file.close()
+        self._file_lock.close()
+
+
+def create_cache_backend(name: Optional[str] = None, path: Optional[os.PathLike[str] | str] = None) -> Optional[CacheBackend]:
+    """Build the backend selected by ``name`` or ``CONTEXT_CACHE_BACKEND``; None (``memory``) means no shared tier."""
+
+    name = (name or os.getenv("CONTEXT_CACHE_BACKEND") or "memory").lower()
+    path = path or os.getenv("CONTEXT_CACHE_PATH") or None
+    try:
+        if name == "sqlite":
+            return SQLiteCacheBackend(path)
+        if name == "mmap":
+            return MmapCacheBackend(path)
+    except (OSError, ValueError) as e:
+        LOGGER.warning("Context cache backend '%s' unavailable, using memory: %s", name, e)
+        return None
+    if name != "memory":
+        LOGGER.warning("Unknown CONTEXT_CACHE_BACKEND '%s', using memory", name)
+    return None
+
+
+__all__ = [
+    "CacheBackend",
+    "MmapCacheBackend",
+    "SQLiteCacheBackend",
+    "create_cache_backend",
+    "deserialize",
+    "serialize",
+]
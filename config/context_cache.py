@@ -3,10 +3,60 @@
 
 from __future__ import annotations
 
+import logging
+import os
+import sys
+import threading
 import time
-from dataclasses import dataclass
-from threading import RLock
-from typing import Any, Dict, Optional
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from enum import Enum
+from itertools import islice
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+
+from config.cache_backends import CacheBackend, create_cache_backend, deserialize, serialize
+
+LOGGER = logging.getLogger(__name__)
+
+
+_OBJECT_OVERHEAD = 56  # header of a small CPython object, in bytes
+_SIZE_SAMPLE = 32       # items measured per container; larger ones are extrapolated
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """Rough memory footprint of ``value`` in bytes, without serialising it.
+
+    Text and bytes count their length, objects a fixed overhead plus their
+    attributes; containers measure their first ``_SIZE_SAMPLE`` items and
+    extrapolate, so sizing a listing or a full page stays cheap.
+    """
+
+    if isinstance(value, (str, bytes, bytearray)):
+        return _OBJECT_OVERHEAD + len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return 32
+    if _depth >= 8:
+        return _OBJECT_OVERHEAD
+    if isinstance(value, Mapping):
+        count = len(value)
+        measured = sum(
+            approximate_size(key, _depth + 1) + approximate_size(item, _depth + 1)
+            for key, item in islice(value.items(), _SIZE_SAMPLE)
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        measured = sum(approximate_size(item, _depth + 1) for item in islice(value, _SIZE_SAMPLE))
+    else:
+        attributes = getattr(value, "__dict__", None)
+        if attributes is None:
+            return sys.getsizeof(value)
+        # Attribute names are interned and shared by every instance
+        return 2 * _OBJECT_OVERHEAD + sum(approximate_size(item, _depth + 1) for item in attributes.values())
+    sampled = min(count, _SIZE_SAMPLE)
+    return _OBJECT_OVERHEAD + 8 * count + (measured * count // sampled if sampled else 0)
 
 
 @dataclass
@@ -15,6 +65,7 @@ class CacheEntry:
 
     value: Any
     expires_at: float
+    size: int = 0
 
     def is_expired(self) -> bool:
         """Return True when the entry should be discarded."""
@@ -22,46 +73,217 @@ class CacheEntry:
         return time.time() >= self.expires_at
 
 
+class Freshness(str, Enum):
+    """State of a cached value as seen by ``ContextCache.lookup``."""
+
+    FRESH = "fresh"
+    STALE = "stale"            # expired but still within the namespace max staleness
+    REFRESHING = "refreshing"  # stale, and a background refresh is running
+    MISSING = "missing"
+
+
+@dataclass
+class NamespaceLimits:
+    """Capacity of a namespace; ``None`` disables the corresponding bound."""
+
+    max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+@dataclass
+class NamespaceStats:
+    """Counters of a namespace, exposed through ``ContextCache.stats``."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    backend_hits: int = 0
+    stale_hits: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
 class ContextCache:
     """Small in-memory cache tailored for Notion context artefacts.
 
-    The cache keeps three logical namespaces:
+    The cache keeps five logical namespaces:
     - ``list``    : full listings of database pages (refreshed every hour)
+    - ``record``  : raw page records seen in those listings, by page id
     - ``preview`` : lightweight previews for individual pages
     - ``full``    : full page payloads used when injecting context in prompts
+    - ``names``   : relation resolver name indexes, by database id
 
     Expiration timestamps are handled per namespace but can be overridden
     when setting values (useful during tests).
+
+    Each namespace has its own lock, so a slow writer in one namespace never
+    blocks readers of another. Concurrent misses on the same key are coalesced
+    by the callers (``config.single_flight``), not by the cache.
+
+    Every namespace is bounded by an entry count and an approximate byte size
+    (see ``set_namespace_limits``); the least recently used entries are
+    evicted first. With ``sweep_interval`` set, a daemon thread also drops
+    expired entries that nobody reads anymore.
+
+    ``list`` and ``preview`` support stale-while-revalidate: once expired, an
+    entry is still returned by ``lookup`` (flagged ``STALE``) until its max
+    staleness runs out, so callers can serve it and ``refresh_in_background``.
+    ``get`` keeps plain TTL semantics.
+
+    An optional ``backend`` (see ``config.cache_backends``) adds a tier shared
+    with other processes: writes go to both tiers, and a local miss (or a
+    locally expired entry) is looked up in the backend before giving up.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, sweep_interval: Optional[float] = None, backend: Optional[CacheBackend] = None) -> None:
+        self.backend = backend
         self._ttls: Dict[str, float] = {
             "list": 60 * 60,       # 1 hour
+            "record": 60 * 60,     # same lifetime as the listing they come from
             "preview": 15 * 60,    # 15 minutes
             "full": 15 * 60,       # 15 minutes
+            "names": 60 * 60,      # 1 hour
         }
-        self._stores: Dict[str, Dict[str, CacheEntry]] = {
-            name: {} for name in self._ttls
+        # How long past its TTL an entry may still be served while it is refreshed
+        self._max_stale: Dict[str, float] = {
+            "list": 6 * 60 * 60,   # 6 hours
+            "record": 0,
+            "preview": 60 * 60,    # 1 hour
+            "full": 0,
+            "names": 0,
         }
-        self._lock = RLock()
+        mb = 1024 * 1024
+        self._limits: Dict[str, NamespaceLimits] = {
+            "list": NamespaceLimits(max_entries=64, max_bytes=64 * mb),
+            "record": NamespaceLimits(max_entries=20_000, max_bytes=64 * mb),
+            "preview": NamespaceLimits(max_entries=5_000, max_bytes=32 * mb),
+            "full": NamespaceLimits(max_entries=500, max_bytes=128 * mb),
+            "names": NamespaceLimits(max_entries=32, max_bytes=64 * mb),
+        }
+        # Insertion order doubles as recency order: hits move to the end
+        self._stores: Dict[str, "OrderedDict[str, CacheEntry]"] = {
+            name: OrderedDict() for name in self._ttls
+        }
+        self._stats: Dict[str, NamespaceStats] = {name: NamespaceStats() for name in self._ttls}
+        self._locks: Dict[str, RLock] = {name: RLock() for name in self._ttls}
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._refresh_guard = Lock()
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        if sweep_interval:
+            self.start_sweeper(sweep_interval)
 
-    def _get_store(self, namespace: str) -> Dict[str, CacheEntry]:
+    def _get_store(self, namespace: str) -> "OrderedDict[str, CacheEntry]":
         if namespace not in self._stores:
             raise KeyError(f"Unknown cache namespace: {namespace}")
         return self._stores[namespace]
 
-    def get(self, namespace: str, key: str) -> Optional[Any]:
-        """Retrieve a value from the cache if it exists and is fresh."""
+    def _lock(self, namespace: str) -> RLock:
+        if namespace not in self._locks:
+            raise KeyError(f"Unknown cache namespace: {namespace}")
+        return self._locks[namespace]
 
-        with self._lock:
+    def _drop(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        entry = self._stores[namespace].pop(key, None)
+        if entry is not None:
+            stats = self._stats[namespace]
+            stats.entries -= 1
+            stats.bytes -= entry.size
+        return entry
+
+    def _lookup(
+        self,
+        namespace: str,
+        key: str,
+        count: bool = True,
+        allow_stale: bool = False,
+    ) -> Tuple[Optional[Any], Freshness]:
+        with self._lock(namespace):
             store = self._get_store(namespace)
+            stats = self._stats[namespace]
             entry = store.get(key)
-            if not entry:
+            if self.backend is not None and (entry is None or entry.is_expired()):
+                # Another process may hold a (fresher) copy
+                entry = self._load_from_backend(namespace, key) or entry
+            freshness = Freshness.FRESH
+            if entry is not None and entry.is_expired():
+                if time.time() >= entry.expires_at + self._max_stale[namespace]:
+                    self._drop(namespace, key)
+                    stats.expirations += 1
+                    entry = None
+                elif allow_stale:
+                    freshness = Freshness.REFRESHING if self._is_refreshing(namespace, key) else Freshness.STALE
+                else:
+                    # Kept for stale readers; plain lookups see a miss
+                    entry = None
+            if entry is None:
+                if count:
+                    stats.misses += 1
+                return None, Freshness.MISSING
+            store.move_to_end(key)
+            if count:
+                if freshness is Freshness.FRESH:
+                    stats.hits += 1
+                else:
+                    stats.stale_hits += 1
+            return entry.value, freshness
+
+    def _load_from_backend(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        try:
+            found = self.backend.load(namespace, key)
+            if found is None:
                 return None
-            if entry.is_expired():
-                del store[key]
+            blob, expires_at = found
+            if time.time() >= expires_at + self._max_stale[namespace]:
                 return None
-            return entry.value
+            current = self._stores[namespace].get(key)
+            if current is not None and current.expires_at >= expires_at:
+                return None
+            entry = CacheEntry(value=deserialize(blob), expires_at=expires_at, size=len(blob))
+        except Exception as e:
+            LOGGER.debug("Context cache backend read failed (%s/%s): %s", namespace, key, e)
+            return None
+        self._insert(namespace, key, entry)
+        self._stats[namespace].backend_hits += 1
+        return entry
+
+    def _insert(self, namespace: str, key: str, entry: CacheEntry) -> None:
+        self._drop(namespace, key)
+        self._stores[namespace][key] = entry
+        stats = self._stats[namespace]
+        stats.entries += 1
+        stats.bytes += entry.size
+        self._evict(namespace)
+
+    def _evict(self, namespace: str) -> None:
+        limits = self._limits[namespace]
+        store = self._stores[namespace]
+        stats = self._stats[namespace]
+        while store and (
+            (limits.max_entries is not None and stats.entries > limits.max_entries)
+            or (limits.max_bytes is not None and stats.bytes > limits.max_bytes)
+        ):
+            self._drop(namespace, next(iter(store)))
+            stats.evictions += 1
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Retrieve a value from the cache if it exists and is fresh."""
+
+        return self._lookup(namespace, key)[0]
+
+    def lookup(self, namespace: str, key: str) -> Tuple[Optional[Any], Freshness]:
+        """Return ``(value, freshness)``; expired values are returned while within max staleness."""
+
+        return self._lookup(namespace, key, allow_stale=True)
+
+    def freshness(self, namespace: str, key: str) -> Freshness:
+        """Freshness of ``key`` without touching the hit/miss counters."""
+
+        return self._lookup(namespace, key, count=False, allow_stale=True)[1]
 
     def set(
         self,
@@ -72,37 +294,216 @@ class ContextCache:
     ) -> Any:
         """Insert a value in the cache and return it."""
 
-        with self._lock:
-            store = self._get_store(namespace)
-            duration = ttl if ttl is not None else self._ttls[namespace]
-            store[key] = CacheEntry(value=value, expires_at=time.time() + duration)
-            return value
+        self.set_many(namespace, {key: value}, ttl)
+        return value
+
+    def set_many(self, namespace: str, items: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        """Insert several values at once (one backend write for the whole batch).
+
+        Values are only serialised for the shared backend; the byte accounting
+        of the local tier uses ``approximate_size`` (or the blob length when a
+        blob exists anyway).
+        """
+
+        blobs: Dict[str, Optional[bytes]] = {}
+        if self.backend is not None:
+            for key, value in items.items():
+                try:
+                    blobs[key] = serialize(value)
+                except Exception:
+                    blobs[key] = None  # not serialisable: kept in this process only
+        with self._lock(namespace):
+            self._get_store(namespace)
+            expires_at = time.time() + (ttl if ttl is not None else self._ttls[namespace])
+            for key, value in items.items():
+                blob = blobs.get(key)
+                size = len(blob) if blob is not None else approximate_size(value)
+                self._insert(namespace, key, CacheEntry(value=value, expires_at=expires_at, size=size))
+        if self.backend is not None:
+            shared = [(key, blob, expires_at) for key, blob in blobs.items() if blob is not None]
+            try:
+                self.backend.store_many(namespace, shared)
+            except Exception as e:
+                LOGGER.debug("Context cache backend write failed (%s): %s", namespace, e)
 
     def invalidate(self, namespace: str, key: Optional[str] = None) -> None:
         """Remove either a single key or the whole namespace."""
 
-        with self._lock:
+        with self._lock(namespace):
             store = self._get_store(namespace)
             if key is None:
                 store.clear()
+                self._stats[namespace].entries = 0
+                self._stats[namespace].bytes = 0
             else:
-                store.pop(key, None)
+                self._drop(namespace, key)
+            if self.backend is not None:
+                self.backend.delete(namespace, key)
 
     def clear(self) -> None:
-        """Reset the entire cache."""
+        """Reset the entire cache (counters and shared backend included)."""
 
-        with self._lock:
-            for store in self._stores.values():
+        for namespace, store in self._stores.items():
+            with self._lock(namespace):
                 store.clear()
+                self._stats[namespace] = NamespaceStats()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def set_backend(self, backend: Optional[CacheBackend]) -> None:
+        """Switch the shared tier (None keeps the cache process-local)."""
+
+        previous, self.backend = self.backend, backend
+        if previous is not None and previous is not backend:
+            previous.close()
 
     def set_namespace_ttl(self, namespace: str, ttl: float) -> None:
         """Override the default TTL for a namespace (used in tests)."""
 
-        with self._lock:
+        with self._lock(namespace):
             self._ttls[namespace] = ttl
 
+    def set_namespace_max_stale(self, namespace: str, max_stale: float) -> None:
+        """Set how long past its TTL an entry may be served by ``lookup`` (0 disables)."""
+
+        with self._lock(namespace):
+            self._max_stale[namespace] = max_stale
+
+    def set_namespace_limits(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """Bound a namespace by entry count and/or approximate bytes, evicting LRU entries."""
+
+        with self._lock(namespace):
+            self._limits[namespace] = NamespaceLimits(max_entries=max_entries, max_bytes=max_bytes)
+            self._evict(namespace)
+
+    # ------------------------------------------------------------------
+    # Background revalidation
+    # ------------------------------------------------------------------
+
+    def _is_refreshing(self, namespace: str, key: str) -> bool:
+        with self._refresh_guard:
+            return (namespace, key) in self._refreshing
+
+    def refresh_in_background(self, namespace: str, key: str, refresh: Callable[[], None]) -> bool:
+        """Run ``refresh`` in a worker thread unless one is already running for this key.
+
+        ``refresh`` stores the new value itself (the fetcher loaders already
+        cache what they load), so each refresh writes the entry once. On
+        failure the stale value stays in place. Returns True if scheduled.
+        """
+
+        with self._refresh_guard:
+            if (namespace, key) in self._refreshing:
+                return False
+            self._refreshing.add((namespace, key))
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="context-cache-refresh")
+            executor = self._refresh_executor
+
+        def _run() -> None:
+            try:
+                refresh()
+                with self._lock(namespace):
+                    self._stats[namespace].refreshes += 1
+            except Exception as e:
+                LOGGER.warning("Background refresh failed | %s:%s: %s", namespace, key, e)
+                with self._lock(namespace):
+                    self._stats[namespace].refresh_errors += 1
+            finally:
+                with self._refresh_guard:
+                    self._refreshing.discard((namespace, key))
+
+        executor.submit(_run)
+        return True
+
+    def wait_for_refreshes(self, timeout: float = 10.0) -> bool:
+        """Block until no background refresh is running (used in tests and warm-up)."""
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._refresh_guard:
+                if not self._refreshing:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    # ------------------------------------------------------------------
+    # Expiry sweep and statistics
+    # ------------------------------------------------------------------
+
+    def sweep(self) -> int:
+        """Drop every entry past its TTL and max staleness; return how many were removed."""
+
+        removed = 0
+        now = time.time()
+        for namespace, store in self._stores.items():
+            with self._lock(namespace):
+                horizon = now - self._max_stale[namespace]
+                expired = [key for key, entry in store.items() if horizon >= entry.expires_at]
+                for key in expired:
+                    self._drop(namespace, key)
+                self._stats[namespace].expirations += len(expired)
+                removed += len(expired)
+            if self.backend is not None:
+                try:
+                    self.backend.purge_expired(namespace, horizon)
+                except Exception as e:
+                    LOGGER.debug("Context cache backend purge failed (%s): %s", namespace, e)
+        return removed
+
+    def start_sweeper(self, interval: float) -> None:
+        """Run ``sweep`` every ``interval`` seconds in a daemon thread."""
+
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+        # The thread only holds a weak reference so the cache can still be collected
+        cache_ref = weakref.ref(self)
+        stop = self._stop_sweeper
+
+        def _run() -> None:
+            while not stop.wait(interval):
+                cache = cache_ref()
+                if cache is None:
+                    return
+                cache.sweep()
+                del cache
+
+        self._sweeper = threading.Thread(target=_run, name="context-cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop_sweeper.set()
+        self._sweeper = None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss/eviction/expiration counters and current size per namespace."""
+
+        result: Dict[str, Dict[str, int]] = {}
+        for namespace in self._stores:
+            with self._lock(namespace):
+                result[namespace] = asdict(self._stats[namespace])
+        return result
+
 
 # Global cache instance used across the application.
-context_cache = ContextCache()
+# The shared tier comes from CONTEXT_CACHE_BACKEND (memory, sqlite or mmap).
+context_cache = ContextCache(
+    sweep_interval=float(os.getenv("CONTEXT_CACHE_SWEEP_SECONDS", "60")),
+    backend=create_cache_backend(),
+)
 
-__all__ = ["CacheEntry", "ContextCache", "context_cache"]
+__all__ = [
+    "CacheEntry",
+    "ContextCache",
+    "Freshness",
+    "NamespaceLimits",
+    "NamespaceStats",
+    "approximate_size",
+    "context_cache",
+]
@@ -0,0 +1,199 @@
+"""Persistent, multi-process tier for Notion artefacts.
+
+``ContextCache`` lives in memory and is lost on every Streamlit restart or
+new worker process. This SQLite-backed tier (WAL mode, safe for concurrent
+readers and writers across processes) keeps previews, full page payloads and
+rendered block trees on disk.
+
+Entries are versioned with the page ``last_edited_time``: a lookup only hits
+when the stored version matches what Notion currently reports, so a page is
+refetched exactly when it changed.
+
+Configuration:
+- ``NOTION_DISK_CACHE`` (default ``true``) enables the tier
+- ``NOTION_DISK_CACHE_PATH`` (default ``.cache/notion_cache.sqlite3`` at the repo root)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "notion_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+)
+"""
+
+
+class NotionDiskCache:
+    """SQLite key/value store keyed by ``(kind, key)`` and versioned.
+
+    ``kind`` separates artefacts (``preview``, ``full``, ``blocks``...); one row
+    is kept per page so a new version replaces the previous one.
+    """
+
+    def __init__(self, path: Optional[os.PathLike[str] | str] = None, enabled: Optional[bool] = None) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.path = Path(path or os.getenv("NOTION_DISK_CACHE_PATH") or DEFAULT_PATH)
+        if enabled is None:
+            enabled = os.getenv("NOTION_DISK_CACHE", "true").lower() in ("1", "true", "yes")
+        self.enabled = enabled
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def reconfigure(self, path: Optional[os.PathLike[str] | str] = None, enabled: Optional[bool] = None) -> None:
+        """Switch to another file and/or toggle the tier (used in tests)."""
+
+        with self._lock:
+            if path is not None:
+                self.path = Path(path)
+            if enabled is not None:
+                self.enabled = enabled
+            # Connections are per thread: bump the generation so each thread reopens
+            self._generation += 1
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.enabled:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "generation", None) == self._generation:
+            return conn
+        if conn is not None:
+            conn.close()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute(_SCHEMA)
+        except sqlite3.Error as e:
+            LOGGER.warning("Notion disk cache disabled (%s): %s", self.path, e)
+            self.enabled = False
+            return None
+        self._local.conn = conn
+        self._local.generation = self._generation
+        return conn
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, kind: str, key: str, version: Optional[str] = None) -> Optional[Any]:
+        """Return the stored value, or None when missing or ``version`` differs.
+
+        ``version=None`` returns whatever is stored regardless of version.
+        """
+
+        conn = self._connection()
+        if conn is None or not key:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT version, value FROM entries WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+        except sqlite3.Error as e:
+            LOGGER.debug("Notion disk cache read failed (%s/%s): %s", kind, key, e)
+            return None
+        if row is None:
+            return None
+        stored_version, blob = row
+        if version is not None and stored_version != version:
+            return None
+        try:
+            return pickle.loads(blob)
+        except Exception as e:  # pragma: no cover - corrupted or incompatible entry
+            LOGGER.debug("Notion disk cache entry unreadable (%s/%s): %s", kind, key, e)
+            return None
+
+    def version(self, kind: str, key: str) -> Optional[str]:
+        """Return the stored version for ``(kind, key)`` without loading the value."""
+
+        conn = self._connection()
+        if conn is None or not key:
+            return None
+        try:
+            row = conn.execute("SELECT version FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def set(self, kind: str, key: str, value: Any, version: Optional[str] = None) -> Any:
+        """Store ``value`` for ``(kind, key)`` at ``version`` and return it."""
+
+        conn = self._connection()
+        if conn is None or not key:
+            return value
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, version, value, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, version or "", sqlite3.Binary(blob), time.time()),
+            )
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            LOGGER.debug("Notion disk cache write failed (%s/%s): %s", kind, key, e)
+        return value
+
+    def invalidate(self, kind: str, key: Optional[str] = None) -> None:
+        """Remove either a single key or every entry of a kind."""
+
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            if key is None:
+                conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
+            else:
+                conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+        except sqlite3.Error as e:
+            LOGGER.debug("Notion disk cache delete failed (%s/%s): %s", kind, key, e)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            LOGGER.debug("Notion disk cache clear failed: %s", e)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of entries per kind."""
+
+        conn = self._connection()
+        if conn is None:
+            return {}
+        try:
+            rows = conn.execute("SELECT kind, COUNT(*) FROM entries GROUP BY kind").fetchall()
+        except sqlite3.Error:
+            return {}
+        return {kind: count for kind, count in rows}
+
+
+# Global disk tier shared by every fetcher of the process (and by other processes on the host).
+notion_disk_cache = NotionDiskCache()
+
+__all__ = ["NotionDiskCache", "notion_disk_cache"]
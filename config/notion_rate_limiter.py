@@ -0,0 +1,294 @@
+"""Process-wide rate limiter shared by every Notion caller.
+
+Notion allows an average of ~3 requests per second per integration and
+answers ``429`` with a ``Retry-After`` header beyond that. All HTTP code
+paths (context fetcher, async client, relation resolver, schema helper,
+export) acquire a token here before sending a request, so concurrent
+Streamlit sessions share one budget instead of each sleeping blindly.
+
+Features:
+- token bucket with burst capacity (``NOTION_RATE_LIMIT`` / ``NOTION_RATE_BURST``)
+- adaptive slowdown: a 429 pauses every caller for ``Retry-After`` and halves
+  the rate, successful responses restore it progressively
+- priorities: interactive context loads are served before background syncs
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from threading import Condition
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class RequestPriority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+_current_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "notion_request_priority", default=RequestPriority.INTERACTIVE
+)
+
+
+def current_priority() -> RequestPriority:
+    """Return the priority applied to Notion calls made from this context."""
+
+    return _current_priority.get()
+
+
+@contextmanager
+def notion_priority(priority: RequestPriority) -> Iterator[None]:
+    """Run the enclosed Notion calls with the given priority.
+
+    Example: ``with notion_priority(RequestPriority.BACKGROUND): fetcher.fetch_all_databases()``
+    """
+
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a token could not be acquired before the timeout."""
+
+
+@dataclass
+class RateLimiterStats:
+    """Counters exposed for monitoring."""
+
+    acquired: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0
+
+
+class NotionRateLimiter:
+    """Thread-safe token bucket with priorities and adaptive slowdown."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        min_rate: float = 0.5,
+        recovery_step: float = 0.1,
+    ) -> None:
+        self.base_rate = float(rate if rate is not None else os.getenv("NOTION_RATE_LIMIT", "3"))
+        self.burst = int(burst if burst is not None else os.getenv("NOTION_RATE_BURST", "6"))
+        self.min_rate = min(min_rate, self.base_rate)
+        self.recovery_step = recovery_step
+        self.rate = self.base_rate
+        self.stats = RateLimiterStats()
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._cond = Condition()
+
+    # ------------------------------------------------------------------
+    # Acquisition
+    # ------------------------------------------------------------------
+
+    def acquire(self, priority: Optional[RequestPriority] = None, timeout: Optional[float] = None) -> float:
+        """Block until a token is available; return the time spent waiting."""
+
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        with self._cond:
+            try:
+                while True:
+                    wait = self._try_take(ticket)
+                    if wait <= 0:
+                        return self._record_wait(started)
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitTimeout("Notion rate limiter: no token before timeout")
+                        wait = min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                self._discard(ticket)
+                raise
+
+    async def acquire_async(self, priority: Optional[RequestPriority] = None) -> float:
+        """Coroutine variant of :meth:`acquire` (never blocks the event loop)."""
+
+        ticket = self._enqueue(priority)
+        started = time.monotonic()
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(ticket)
+                    if wait <= 0:
+                        return self._record_wait(started)
+                # Re-check often enough to notice higher-priority hand-offs
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:
+            with self._cond:
+                self._discard(ticket)
+            raise
+
+    def send(
+        self,
+        request_fn: Callable[[], Any],
+        priority: Optional[RequestPriority] = None,
+        max_retries: int = 3,
+    ) -> Any:
+        """Acquire a token, call ``request_fn`` and retry it while Notion answers 429.
+
+        Used by the modules issuing plain ``requests`` calls, e.g.
+        ``notion_rate_limiter.send(lambda: requests.get(url, headers=headers))``.
+        """
+
+        attempt = 0
+        while True:
+            self.acquire(priority)
+            response = request_fn()
+            if not self.observe(response) or attempt >= max_retries:
+                return response
+            attempt += 1
+
+    # ------------------------------------------------------------------
+    # Feedback from responses
+    # ------------------------------------------------------------------
+
+    def report_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Pause every caller after a 429 and halve the sustained rate."""
+
+        delay = retry_after if retry_after is not None and retry_after >= 0 else 1.0 / max(self.rate, self.min_rate)
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._tokens = 0.0
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.stats.throttled += 1
+            self._cond.notify_all()
+
+    def report_success(self) -> None:
+        """Restore the sustained rate progressively after a throttling episode."""
+
+        if self.rate >= self.base_rate:
+            return
+        with self._cond:
+            self._refill(time.monotonic())
+            self.rate = min(self.base_rate, self.rate + self.base_rate * self.recovery_step)
+
+    def observe(self, response: Any) -> bool:
+        """Feed an HTTP response (``requests`` or ``httpx``) back; True when throttled."""
+
+        status = getattr(response, "status_code", None)
+        if not isinstance(status, int):
+            return False
+        if status == 429:
+            self.report_throttled(parse_retry_after(getattr(response, "headers", None)))
+            return True
+        if status < 500:
+            self.report_success()
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current state (rate, tokens, waiters, counters)."""
+
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "rate": self.rate,
+                "base_rate": self.base_rate,
+                "burst": self.burst,
+                "tokens": self._tokens,
+                "waiting": len(self._waiters),
+                "blocked_for": max(0.0, self._blocked_until - time.monotonic()),
+                "acquired": self.stats.acquired,
+                "throttled": self.stats.throttled,
+                "total_wait": self.stats.total_wait,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers (call with the condition held unless stated otherwise)
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, priority: Optional[RequestPriority]) -> Tuple[int, int]:
+        resolved = priority if priority is not None else current_priority()
+        ticket = (int(resolved), next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _discard(self, ticket: Tuple[int, int]) -> None:
+        try:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+        except ValueError:
+            pass
+        self._cond.notify_all()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def _try_take(self, ticket: Tuple[int, int]) -> float:
+        """Take a token for ``ticket`` if it is first in line; else return the wait."""
+
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if not self._waiters or self._waiters[0] != ticket:
+            # Someone with a higher priority (or older ticket) goes first
+            return 0.05 if self._tokens < 1 else 0.005
+        if self._tokens >= 1:
+            self._tokens -= 1
+            heapq.heappop(self._waiters)
+            self._cond.notify_all()
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _record_wait(self, started: float) -> float:
+        waited = time.monotonic() - started
+        self.stats.acquired += 1
+        self.stats.total_wait += waited
+        return waited
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Return the ``Retry-After`` delay in seconds, when present and numeric."""
+
+    if not headers:
+        return None
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# Global limiter shared by every Notion code path in the process.
+notion_rate_limiter = NotionRateLimiter()
+
+__all__ = [
+    "NotionRateLimiter",
+    "RateLimitTimeout",
+    "RateLimiterStats",
+    "RequestPriority",
+    "current_priority",
+    "notion_priority",
+    "notion_rate_limiter",
+    "parse_retry_after",
+]
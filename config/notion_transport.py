@@ -0,0 +1,205 @@
+"""Shared pooled HTTP transport for every synchronous Notion call.
+
+The fetcher, the relation resolver, the schema helper and the export all talk
+to the same host. Going through one ``requests.Session`` lets them reuse
+keep-alive connections (no TLS handshake per call) and share the same
+timeouts, 5xx retry policy (idempotent requests only), rate limiter and metrics.
+
+Configuration:
+- ``NOTION_REQUEST_TIMEOUT`` (default 20s) when the caller passes no ``timeout``
+- ``NOTION_POOL_SIZE`` (default 16) connections kept alive per host
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from config.notion_rate_limiter import NotionRateLimiter, RequestPriority, notion_rate_limiter
+
+LOGGER = logging.getLogger(__name__)
+
+NOTION_API_URL = "https://api.notion.com/v1"
+
+# Replaying these after a timeout or a 5xx cannot duplicate a write
+IDEMPOTENT_METHODS = frozenset({"GET", "DELETE"})
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+
+@dataclass
+class TransportMetrics:
+    """Counters exposed for monitoring and tests."""
+
+    requests: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    by_status: Dict[int, int] = field(default_factory=dict)
+
+
+class NotionTransport:
+    """Pooled ``requests`` session with timeouts, retries, rate limiting and metrics."""
+
+    def __init__(
+        self,
+        base_url: str = NOTION_API_URL,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        rate_limiter: Optional[NotionRateLimiter] = None,
+        max_throttle_retries: int = 3,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = float(timeout or os.getenv("NOTION_REQUEST_TIMEOUT", "20"))
+        self.pool_size = int(pool_size or os.getenv("NOTION_POOL_SIZE", "16"))
+        self.rate_limiter = rate_limiter or notion_rate_limiter
+        self.max_throttle_retries = max_throttle_retries
+        self.max_server_retries = 3
+        self.backoff_factor = 0.8
+        self.metrics = TransportMetrics()
+        self._metrics_lock = threading.Lock()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled session, created on first use."""
+
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        # Connection failures (request never sent) are retried for every method;
+        # read timeouts and 5xx only for idempotent ones: Notion may already have
+        # applied a POST /pages or PATCH /blocks, and replaying it would duplicate
+        # the page or its blocks. 429 is left to the rate limiter so that every
+        # caller slows down, not just this one.
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=3,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=SERVER_ERROR_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        LOGGER.info("NotionTransport initialised | timeout=%ss pool=%s", self.timeout, self.pool_size)
+        return session
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        priority: Optional[RequestPriority] = None,
+        rate_limiter: Optional[NotionRateLimiter] = None,
+        idempotent: bool = False,
+        **kwargs: Any,
+    ):
+        """Send a request through the rate limiter; relative URLs target the Notion API.
+
+        ``idempotent=True`` marks a read-only POST (database query) so that read
+        timeouts and 5xx are retried like a GET; other writes are sent once.
+        """
+
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}/{url.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = rate_limiter or self.rate_limiter
+        send = self._send_retrying if idempotent and method.upper() not in IDEMPOTENT_METHODS else self._send
+        return limiter.send(
+            lambda: send(method, url, **kwargs),
+            priority=priority,
+            max_retries=self.max_throttle_retries,
+        )
+
+    def get(self, url: str, **kwargs: Any):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any):
+        return self.request("PATCH", url, **kwargs)
+
+    def _send_retrying(self, method: str, url: str, **kwargs: Any):
+        # Connection failures are already retried by urllib3 (any method)
+        from requests.exceptions import ReadTimeout
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, url, **kwargs)
+                if response.status_code not in SERVER_ERROR_STATUSES or attempt >= self.max_server_retries:
+                    return response
+            except ReadTimeout:
+                if attempt >= self.max_server_retries:
+                    raise
+            attempt += 1
+            LOGGER.debug("[Notion] %s %s retry %s", method, url, attempt)
+            time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+
+    def _send(self, method: str, url: str, **kwargs: Any):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception:
+            with self._metrics_lock:
+                self.metrics.requests += 1
+                self.metrics.errors += 1
+                self.metrics.total_latency += time.perf_counter() - start
+            raise
+        status = getattr(response, "status_code", None)
+        with self._metrics_lock:
+            self.metrics.requests += 1
+            self.metrics.total_latency += time.perf_counter() - start
+            if isinstance(status, int):
+                self.metrics.by_status[status] = self.metrics.by_status.get(status, 0) + 1
+                if status >= 400:
+                    self.metrics.errors += 1
+        return response
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the metrics (plus average latency)."""
+
+        with self._metrics_lock:
+            count = self.metrics.requests
+            return {
+                "requests": count,
+                "errors": self.metrics.errors,
+                "avg_latency": self.metrics.total_latency / count if count else 0.0,
+                "by_status": dict(self.metrics.by_status),
+            }
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+# Global transport shared by the fetcher, resolver, schema helper and export.
+notion_transport = NotionTransport()
+
+__all__ = ["IDEMPOTENT_METHODS", "NOTION_API_URL", "NotionTransport", "TransportMetrics", "notion_transport"]
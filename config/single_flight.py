@@ -0,0 +1,64 @@
+"""Single-flight coalescing of identical concurrent calls.
+
+When several Streamlit sessions (or the matcher and the generation step) ask
+for the same Notion page or listing at the same moment, they all miss the
+cache together. ``SingleFlight.do(key, fn)`` lets the first caller run ``fn``
+while the others wait for its result (or its exception) instead of issuing
+the same HTTP calls.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, or the result of the identical call already in flight."""
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+
+        with self._lock:
+            return len(self._calls)
+
+
+# Shared by every NotionContextFetcher of the process (one per Streamlit session).
+notion_single_flight = SingleFlight()
+
+__all__ = ["SingleFlight", "notion_single_flight"]
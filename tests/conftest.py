@@ -6,11 +6,14 @@ Fixtures communes:
 - sandbox_databases: IDs des bases sandbox
 - test_llm: LLM configuré pour tests
 - cleanup_notion_pages: Cleanup automatique des pages créées
+- isolated_notion_disk_cache / clear_context_cache: caches Notion isolés par test (autouse)
+- in_memory_semantic_index: index vectoriel partagé non persisté (autouse)
+- FakeResponse: réponse HTTP minimale pour les faux transports
 """
 import os
 import pytest
 import requests
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
 # Charger .env
@@ -227,3 +230,52 @@ def sample_brief_lieu():
     """Brief simple pour tests lieux"""
     return "Marché souterrain, taille: site, catégorie: lieu, atmosphère sombre"
 
+
+
+@pytest.fixture(autouse=True)
+def isolated_notion_disk_cache(tmp_path):
+    """Cache disque Notion isolé par test (évite de lire/écrire .cache/ du dépôt)"""
+    from config.notion_disk_cache import notion_disk_cache
+
+    previous = (notion_disk_cache.path, notion_disk_cache.enabled)
+    notion_disk_cache.reconfigure(path=tmp_path / "notion_cache.sqlite3", enabled=True)
+    yield notion_disk_cache
+    notion_disk_cache.reconfigure(path=previous[0], enabled=previous[1])
+
+
+@pytest.fixture(autouse=True)
+def clear_context_cache():
+    """Cache mémoire partagé (``context_cache``) vidé avant et après chaque test"""
+    from config.context_cache import context_cache
+
+    context_cache.clear()
+    yield context_cache
+    context_cache.wait_for_refreshes()
+    context_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def in_memory_semantic_index(monkeypatch):
+    """Index vectoriel partagé remplacé par un index non persisté (n'écrit pas .cache/ du dépôt)"""
+    from agents import notion_context_matcher, notion_semantic_index
+
+    index = notion_semantic_index.SemanticIndex(persist=False)
+    monkeypatch.setattr(notion_semantic_index, "semantic_index", index)
+    monkeypatch.setattr(notion_context_matcher, "semantic_index", index)
+    yield index
+
+
+class FakeResponse:
+    """Réponse HTTP minimale (``status_code``, ``headers``, ``json()``, ``raise_for_status()``)"""
+
+    def __init__(self, payload: Optional[Dict[str, Any]] = None, status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        self._payload = payload if payload is not None else {}
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
@@ -117,6 +117,9 @@ def test_auto_suggested_context_is_passed_to_generation(at, monkeypatch):
             title = "Tombeau des lueurs dissidentes" if page_id == "fake_page_1" else "Cité labiales"
             dom = domain or "lieux"
             return _FakePage(page_id, title, dom)
+        def fetch_pages_full(self, page_ids, domains=None):
+            from agents.notion_context_fetcher import PageFetchResult
+            return [PageFetchResult(pid, page=self.fetch_page_full(pid, (domains or {}).get(pid))) for pid in page_ids]
         def format_context_for_llm(self, pages):
             return "\n".join(getattr(p, "title", "") for p in pages)
     monkeypatch.setattr(gen, "NotionContextFetcher", _FakeFetcher)
@@ -0,0 +1,123 @@
+"""Tests unitaires pour les backends partagés de ContextCache (SQLite, mmap)."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from agents.notion_context_fetcher import NotionPagePreview
+from config.cache_backends import (
+    CacheBackend,
+    MmapCacheBackend,
+    SQLiteCacheBackend,
+    create_cache_backend,
+)
+from config.context_cache import ContextCache, Freshness
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _preview(title: str) -> NotionPagePreview:
+    return NotionPagePreview(
+        id="p1",
+        title=title,
+        domain="personnages",
+        summary="Cartographe",
+        tags=["personnage"],
+        token_estimate=12,
+        last_edited="2025-10-01T10:00:00.000Z",
+    )
+
+
+@pytest.fixture(params=["sqlite", "mmap"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        instance = SQLiteCacheBackend(tmp_path / "cache.sqlite3")
+    else:
+        instance = MmapCacheBackend(tmp_path / "cache.mmap", size=256 * 1024)
+    yield instance
+    instance.close()
+
+
+def test_caches_sharing_a_backend_see_each_other(backend):
+    writer, reader = ContextCache(backend=backend), ContextCache(backend=backend)
+
+    writer.set("preview", "p1", _preview("Lysandre"))
+    writer.set_many("record", {"p1": {"id": "p1"}, "p2": {"id": "p2"}})
+
+    assert reader.get("preview", "p1") == _preview("Lysandre")
+    assert reader.get("record", "p2") == {"id": "p2"}
+    assert reader.stats()["preview"]["backend_hits"] == 1
+
+    writer.invalidate("record", "p2")
+    assert ContextCache(backend=backend).get("record", "p2") is None
+    writer.invalidate("record")
+    assert ContextCache(backend=backend).get("record", "p1") is None
+
+
+def test_locally_expired_entry_picks_up_fresher_shared_copy(backend):
+    first, second = ContextCache(backend=backend), ContextCache(backend=backend)
+    first.set("list", "k", "old", ttl=0)
+    assert second.lookup("list", "k") == ("old", Freshness.STALE)
+
+    first.set("list", "k", "new")
+    assert second.lookup("list", "k") == ("new", Freshness.FRESH)
+
+
+def test_clear_and_purge_reach_the_backend(backend):
+    cache = ContextCache(backend=backend)
+    cache.set("full", "old", "value", ttl=0)
+    cache.set("full", "fresh", "value")
+    cache.sweep()
+    assert backend.load("full", "old") is None
+    assert backend.load("full", "fresh") is not None
+
+    cache.clear()
+    assert backend.load("full", "fresh") is None
+
+
+def test_mmap_log_compacts_when_full(tmp_path):
+    backend = MmapCacheBackend(tmp_path / "cache.mmap", size=16 * 1024)
+    try:
+        for index in range(200):
+            backend.store("full", "same-key", bytes([index % 256]) * 512, time.time() + 60)
+        assert backend.load("full", "same-key")[0] == bytes([199]) * 512
+    finally:
+        backend.close()
+
+
+@pytest.mark.parametrize("name", ["sqlite", "mmap"])
+def test_backend_is_shared_across_processes(name, tmp_path):
+    path = tmp_path / f"shared.{name}"
+    script = (
+        "import sys\n"
+        "from config.cache_backends import create_cache_backend\n"
+        "from config.context_cache import ContextCache\n"
+        "cache = ContextCache(backend=create_cache_backend(sys.argv[1], sys.argv[2]))\n"
+        "cache.set('list', 'personnages:db', ['Lysandre', 'Mirelle'])\n"
+    )
+    subprocess.run([sys.executable, "-c", script, name, str(path)], cwd=REPO_ROOT, check=True, timeout=60)
+
+    backend = create_cache_backend(name, path)
+    try:
+        assert ContextCache(backend=backend).get("list", "personnages:db") == ["Lysandre", "Mirelle"]
+    finally:
+        backend.close()
+
+
+def test_memory_selection_keeps_cache_process_local():
+    assert create_cache_backend("memory") is None
+    assert ContextCache(backend=create_cache_backend("memory")).backend is None
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class LoadOnly(CacheBackend):
+        def load(self, namespace, key):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
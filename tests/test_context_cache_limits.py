@@ -0,0 +1,114 @@
+"""Tests unitaires pour les limites LRU, le balayage et les compteurs de ContextCache."""
+
+from __future__ import annotations
+
+import pickle
+import time
+
+from config.context_cache import ContextCache, Freshness, approximate_size
+
+
+def test_entry_limit_evicts_least_recently_used():
+    cache = ContextCache()
+    cache.set_namespace_limits("full", max_entries=2)
+    cache.set("full", "a", 1)
+    cache.set("full", "b", 2)
+    assert cache.get("full", "a") == 1  # "b" becomes the LRU entry
+
+    cache.set("full", "c", 3)
+
+    assert cache.get("full", "b") is None
+    assert cache.get("full", "a") == 1
+    assert cache.get("full", "c") == 3
+    stats = cache.stats()["full"]
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+
+
+def test_byte_limit_bounds_namespace_size():
+    cache = ContextCache()
+    payload = "x" * 1000
+    cache.set_namespace_limits("preview", max_bytes=approximate_size(payload) * 3)
+
+    for index in range(10):
+        cache.set("preview", str(index), payload)
+
+    stats = cache.stats()["preview"]
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= approximate_size(payload) * 3
+    assert stats["evictions"] == 7
+    assert [cache.get("preview", str(index)) is not None for index in (6, 7, 8, 9)] == [False, True, True, True]
+
+
+def test_overwrite_and_invalidate_keep_sizes_consistent():
+    cache = ContextCache()
+    cache.set("list", "k", "x" * 100)
+    cache.set("list", "k", "y")
+    assert cache.stats()["list"]["bytes"] == approximate_size("y")
+
+    cache.invalidate("list", "k")
+    assert cache.stats()["list"]["entries"] == 0
+    assert cache.stats()["list"]["bytes"] == 0
+
+
+def test_hits_and_misses_are_counted_once_per_lookup():
+    cache = ContextCache()
+
+    assert cache.get("record", "p1") is None
+    cache.set("record", "p1", "value")
+    assert cache.get("record", "p1") == "value"
+    assert cache.freshness("record", "p1") is Freshness.FRESH
+
+    stats = cache.stats()["record"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_sweep_removes_expired_entries_without_reads():
+    cache = ContextCache()
+    cache.set("full", "old", "value", ttl=0)
+    cache.set("full", "fresh", "value")
+
+    assert cache.sweep() == 1
+    stats = cache.stats()["full"]
+    assert (stats["entries"], stats["expirations"]) == (1, 1)
+
+
+def test_background_sweeper_runs_periodically():
+    cache = ContextCache(sweep_interval=0.01)
+    try:
+        cache.set("full", "old", "value", ttl=0)
+        deadline = time.time() + 2
+        while cache.stats()["full"]["entries"] and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.stats()["full"]["entries"] == 0
+    finally:
+        cache.stop_sweeper()
+
+
+def test_local_sets_do_not_serialise_and_estimates_track_pickled_size(monkeypatch):
+    from agents.notion_context_fetcher import NotionPagePreview
+    from config import context_cache as context_cache_module
+
+    def forbidden(value):
+        raise AssertionError("no serialisation without a shared backend")
+
+    monkeypatch.setattr(context_cache_module, "serialize", forbidden)
+    listing = [
+        NotionPagePreview(
+            id=f"page-{index}",
+            title=f"Entité {index}",
+            domain="lieux",
+            summary=f"Résumé {index} " * 20,
+            tags=["lieu", "sandbox"],
+            last_edited="2025-10-01T10:00:00.000Z",
+            token_estimate=120,
+        )
+        for index in range(500)
+    ]
+    cache = ContextCache()
+    cache.set("list", "lieux:db", listing)
+    cache.set("full", "page-1", {"content": "x" * 200_000})
+
+    stats = cache.stats()
+    pickled = len(pickle.dumps(listing, protocol=pickle.HIGHEST_PROTOCOL))
+    assert 0.5 < stats["list"]["bytes"] / pickled < 3
+    assert 200_000 < stats["full"]["bytes"] < 201_000
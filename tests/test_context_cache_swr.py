@@ -0,0 +1,101 @@
+"""Tests unitaires pour le stale-while-revalidate des listings et aperçus Notion."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.notion_context_fetcher import NotionContextFetcher
+from config.context_cache import ContextCache, Freshness, context_cache
+from config.notion_rate_limiter import RequestPriority, current_priority
+
+
+@pytest.fixture(autouse=True)
+def sandbox_databases(monkeypatch):
+    monkeypatch.setattr(NotionContextFetcher, "SANDBOX_DATABASES", {"personnages": "db-perso", "lieux": None})
+    yield
+    # Les rafraîchissements en arrière-plan voient encore les bases patchées
+    context_cache.wait_for_refreshes()
+
+
+def test_lookup_serves_stale_value_until_max_staleness():
+    cache = ContextCache()
+    cache.set("list", "k", "old", ttl=0)
+
+    assert cache.get("list", "k") is None
+    assert cache.lookup("list", "k") == ("old", Freshness.STALE)
+
+    cache.set_namespace_max_stale("list", 0)
+    assert cache.lookup("list", "k") == (None, Freshness.MISSING)
+
+
+def test_refresh_in_background_runs_once_per_key_and_keeps_stale_on_error():
+    cache = ContextCache()
+    cache.set("preview", "k", "old", ttl=0)
+    release = threading.Event()
+
+    def slow_refresh() -> None:
+        release.wait(2)
+        cache.set("preview", "k", "new")
+
+    assert cache.refresh_in_background("preview", "k", slow_refresh)
+    assert not cache.refresh_in_background("preview", "k", slow_refresh)
+    assert cache.freshness("preview", "k") is Freshness.REFRESHING
+    release.set()
+    assert cache.wait_for_refreshes()
+    assert cache.lookup("preview", "k") == ("new", Freshness.FRESH)
+
+    cache.set("preview", "k", "old", ttl=0)
+    cache.refresh_in_background("preview", "k", lambda: 1 / 0)
+    assert cache.wait_for_refreshes()
+    assert cache.lookup("preview", "k") == ("old", Freshness.STALE)
+    assert cache.stats()["preview"]["refresh_errors"] == 1
+
+
+class ListingClient:
+    def __init__(self) -> None:
+        self.title = "Lysandre"
+        self.calls: List[RequestPriority] = []
+        self.release = threading.Event()
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        self.calls.append(current_priority())
+        if len(self.calls) > 1:
+            self.release.wait(2)
+        return [
+            {
+                "id": "p1",
+                "last_edited_time": "2025-10-01T10:00:00.000Z",
+                "properties": {"Nom": {"type": "title", "title": [{"plain_text": self.title}]}},
+            }
+        ]
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:  # pragma: no cover - unused
+        return {}
+
+    def retrieve_page_content(self, page_id: str) -> str:  # pragma: no cover - unused
+        return ""
+
+
+def test_expired_listing_is_served_immediately_and_refreshed_in_background():
+    client = ListingClient()
+    fetcher = NotionContextFetcher(client=client, incremental_sync=False)
+    fetcher.fetch_all_databases()
+    context_cache.set("list", "personnages:db-perso", context_cache.get("list", "personnages:db-perso"), ttl=0)
+    client.title = "Lysandre la Cartographe"
+
+    start = time.monotonic()
+    stale = fetcher.fetch_all_databases()
+    assert time.monotonic() - start < 0.5
+    assert [preview.title for preview in stale["personnages"]] == ["Lysandre"]
+    assert fetcher.listing_freshness() == {"personnages": Freshness.REFRESHING}
+
+    client.release.set()
+    assert context_cache.wait_for_refreshes()
+    fresh = fetcher.fetch_all_databases()
+    assert [preview.title for preview in fresh["personnages"]] == ["Lysandre la Cartographe"]
+    assert client.calls == [RequestPriority.INTERACTIVE, RequestPriority.BACKGROUND]
+    assert fetcher.listing_freshness() == {"personnages": Freshness.FRESH}
@@ -0,0 +1,105 @@
+"""Tests for the concurrent, deadline-bounded refine step of ``suggest_context``."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from agents.notion_content_ranker import ContentRanker
+from agents.notion_context_fetcher import NotionPageContent, NotionPagePreview
+from agents.notion_context_index import ContextTokenIndex
+from agents.notion_context_matcher import NotionContextMatcher
+from agents.notion_semantic_index import SemanticIndex
+
+BRIEF = "Les cartographes du port"
+
+
+def _preview(page_id: str) -> NotionPagePreview:
+    return NotionPagePreview(
+        id=page_id, title=f"Fiche {page_id}", domain="lieux", summary="cartographes",
+        tags=[], last_edited="v1", token_estimate=10,
+    )
+
+
+class SlowFetcher:
+    """``fetch_page_full`` sleeps ``delay``; pages in ``blocked`` wait for ``release``."""
+
+    def __init__(self, delay: float = 0.0, blocked: Optional[set] = None) -> None:
+        self.delay = delay
+        self.blocked = blocked or set()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls: List[str] = []
+
+    def fetch_page_full(self, page_id: str, domain: Optional[str] = None) -> NotionPageContent:
+        with self.lock:
+            self.calls.append(page_id)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if page_id in self.blocked:
+                self.release.wait(5)
+            time.sleep(self.delay)
+            return NotionPageContent(
+                id=page_id, title=f"Fiche {page_id}", domain="lieux", summary="cartographes", tags=[],
+                last_edited="v1", token_estimate=10, content="Les cartographes du port de Salin", properties={},
+            )
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _matcher(fetcher: SlowFetcher) -> NotionContextMatcher:
+    return NotionContextMatcher(
+        fetcher=fetcher, index=ContextTokenIndex(), ranker=ContentRanker(), semantic=SemanticIndex(persist=False)
+    )
+
+
+def test_refine_pool_is_fetched_concurrently(monkeypatch):
+    monkeypatch.setenv("NOTION_PAGE_CONCURRENCY", "4")
+    fetcher = SlowFetcher(delay=0.2)
+    pages = [_preview(f"p{i}") for i in range(4)]
+
+    start = time.perf_counter()
+    suggestions = _matcher(fetcher).suggest_context(BRIEF, max_fiches=4, available_pages=pages, refine_timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert sorted(fetcher.calls) == [page.id for page in pages]
+    assert fetcher.max_active > 1
+    assert elapsed < 0.2 * len(pages)
+    assert all(suggestion.refined for suggestion in suggestions)
+
+
+def test_slow_page_keeps_its_metadata_score_at_the_deadline():
+    fetcher = SlowFetcher(blocked={"slow"})
+    pages = [_preview("fast"), _preview("slow")]
+    matcher = _matcher(fetcher)
+    metadata_only = {
+        s.page.id: s.score
+        for s in matcher.suggest_context(BRIEF, max_fiches=2, available_pages=pages, use_full_content=False)
+    }
+
+    start = time.perf_counter()
+    suggestions = matcher.suggest_context(BRIEF, max_fiches=2, available_pages=pages, refine_timeout=0.3)
+    elapsed = time.perf_counter() - start
+    fetcher.release.set()
+
+    by_id: Dict[str, object] = {s.page.id: s for s in suggestions}
+    assert elapsed < 2.0
+    assert set(by_id) == {"fast", "slow"}
+    assert by_id["fast"].refined and not by_id["slow"].refined
+    assert by_id["slow"].score == metadata_only["slow"]
+    assert by_id["fast"].score >= metadata_only["fast"]
+
+
+def test_suggestions_without_full_content_are_not_marked_refined():
+    fetcher = SlowFetcher()
+    suggestions = _matcher(fetcher).suggest_context(
+        BRIEF, max_fiches=2, available_pages=[_preview("p1")], use_full_content=False
+    )
+
+    assert fetcher.calls == []
+    assert [s.refined for s in suggestions] == [False]
@@ -12,6 +12,7 @@ from agents.notion_context_fetcher import (
     NotionContextFetcher,
     NotionPageContent,
     NotionPagePreview,
+    PageFetchResult,
 )
 from agents.notion_context_matcher import NotionContextMatcher
 from config.context_cache import ContextCache, context_cache
@@ -221,6 +222,9 @@ def test_build_context_payload(monkeypatch):
 
     dummy_streamlit = types.SimpleNamespace(
         warning=lambda *args, **kwargs: None,
+        info=lambda *args, **kwargs: None,
+        caption=lambda *args, **kwargs: None,
+        success=lambda *args, **kwargs: None,
         session_state={},
         cache_resource=_identity_decorator,
         cache_data=_identity_decorator,
@@ -248,6 +252,9 @@ def test_build_context_payload(monkeypatch):
             self.calls.append((page_id, domain))
             return DummyPage(page_id, domain or 'unknown')
 
+        def fetch_pages_full(self, page_ids, domains=None):
+            return [PageFetchResult(pid, page=self.fetch_page_full(pid, (domains or {}).get(pid))) for pid in page_ids]
+
         def format_context_for_llm(self, pages):
             return '\n'.join(page.title for page in pages)
 
@@ -0,0 +1,248 @@
+"""Tests unitaires pour le client Notion asynchrone et sa façade synchrone."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from agents.notion_async_client import AsyncNotionClient, AsyncNotionContextFetcher, SyncNotionClient
+from agents.notion_context_fetcher import NotionContextFetcher, NotionPageContent
+from config.context_cache import context_cache
+from config.notion_rate_limiter import NotionRateLimiter
+
+
+PAGES = {
+    "page-1": {
+        "id": "page-1",
+        "last_edited_time": "2025-10-04T16:00:00Z",
+        "properties": {"Nom": {"type": "title", "title": [{"plain_text": "Lysandre"}]}},
+    },
+}
+
+BLOCKS = {
+    "page-1": [
+        {"id": "b1", "type": "heading_1", "has_children": True, "heading_1": {"rich_text": [{"plain_text": "Identité"}]}},
+        {"id": "b2", "type": "paragraph", "has_children": False, "paragraph": {"rich_text": [{"plain_text": "Cartographe"}]}},
+    ],
+    "b1": [
+        {"id": "b1-1", "type": "toggle", "has_children": False, "toggle": {"rich_text": [{"plain_text": "Secret"}]}},
+    ],
+}
+
+
+def _make_transport(calls: List[str], throttle_once: bool = False) -> httpx.MockTransport:
+    state = {"throttled": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        calls.append(f"{request.method} {path}")
+        if throttle_once and not state["throttled"]:
+            state["throttled"] = True
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        parts = path.strip("/").split("/")
+        if parts[1] == "pages" and request.method == "GET":
+            return httpx.Response(200, json=PAGES[parts[2]])
+        if parts[1] == "pages" and request.method == "POST":
+            body = json.loads(request.content)
+            return httpx.Response(200, json={"id": "new-page", "parent": body["parent"]})
+        if parts[1] == "blocks":
+            return httpx.Response(200, json={"results": BLOCKS.get(parts[2], []), "has_more": False})
+        if parts[1] == "databases":
+            return httpx.Response(200, json={"results": list(PAGES.values()), "has_more": False})
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
+
+
+def _client(calls: List[str], **kwargs: Any) -> AsyncNotionClient:
+    return AsyncNotionClient(
+        headers={"Authorization": "Bearer test"},
+        transport=_make_transport(calls, **kwargs),
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+
+
+def test_async_client_renders_same_markdown_as_sync_walk():
+    calls: List[str] = []
+
+    async def run() -> str:
+        async with _client(calls) as client:
+            return await client.retrieve_page_content("page-1")
+
+    content = asyncio.run(run())
+    assert content.split("\n") == ["# Identité", "  ▶ Secret", "Cartographe"]
+    assert sorted(calls) == ["GET /v1/blocks/b1/children", "GET /v1/blocks/page-1/children"]
+
+
+def test_async_client_retries_on_429():
+    calls: List[str] = []
+
+    async def run() -> Dict[str, Any]:
+        async with _client(calls, throttle_once=True) as client:
+            return await client.retrieve_page("page-1")
+
+    record = asyncio.run(run())
+    assert record["id"] == "page-1"
+    assert calls == ["GET /v1/pages/page-1", "GET /v1/pages/page-1"]
+
+
+def test_async_fetcher_fetches_metadata_and_content_concurrently():
+    calls: List[str] = []
+    fetcher = AsyncNotionContextFetcher(client=_client(calls))
+
+    async def run() -> NotionPageContent:
+        try:
+            return await fetcher.fetch_page_full("page-1", domain="personnages")
+        finally:
+            await fetcher.client.aclose()
+
+    page = asyncio.run(run())
+    assert isinstance(page, NotionPageContent)
+    assert page.title == "Lysandre"
+    assert "Secret" in page.content
+    assert context_cache.get("full", "page-1") is page
+
+
+def test_sync_facade_plugs_into_notion_context_fetcher():
+    calls: List[str] = []
+    facade = SyncNotionClient(_client(calls))
+    try:
+        fetcher = NotionContextFetcher(client=facade)
+        page = fetcher.fetch_page_full("page-1", domain="personnages")
+        listing = facade.list_pages("db-1")
+        created = facade.create_page("2806e4d21b458012a744d8d6723c8be1", {"Nom": {"title": []}})
+    finally:
+        facade.close()
+
+    assert page.title == "Lysandre"
+    assert "Cartographe" in page.content
+    assert [record["id"] for record in listing] == ["page-1"]
+    assert created["id"] == "new-page"
+
+
+def test_create_page_refuses_non_sandbox_database():
+    calls: List[str] = []
+    facade = SyncNotionClient(_client(calls))
+    try:
+        with pytest.raises(PermissionError):
+            facade.create_page("1886e4d21b4581a29340f77f5f2e5885", {})
+    finally:
+        facade.close()
+    assert calls == []
+
+
+def test_async_listing_is_uncapped_and_shares_the_sync_state(monkeypatch):
+    monkeypatch.setenv("NOTION_MAX_RECORDS", "2")
+    records = [
+        {"id": f"p{index}", "last_edited_time": f"2025-10-0{index}T10:00:00.000Z", "properties": {}}
+        for index in range(1, 4)
+    ]
+    queries: List[Dict[str, Any]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        queries.append(json.loads(request.content))
+        return httpx.Response(200, json={"results": records, "has_more": False})
+
+    client = AsyncNotionClient(
+        headers={"Authorization": "Bearer test"},
+        transport=httpx.MockTransport(handler),
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    fetcher = AsyncNotionContextFetcher(client=client)
+    fetcher.SANDBOX_DATABASES = {"lieux": "db-lieux"}
+
+    async def run(force_refresh: bool) -> Dict[str, Any]:
+        return await fetcher.fetch_all_databases(force_refresh=force_refresh)
+
+    listing = asyncio.run(run(False))
+    assert [preview.id for preview in listing["lieux"]] == ["p1", "p2", "p3"]
+    assert context_cache.get("list", "lieux:db-lieux") == listing["lieux"]
+    assert context_cache.get("record", "p3")["domain"] == "lieux"
+
+    # Refresh forcé : requête delta depuis la page la plus récente (état disque partagé)
+    asyncio.run(run(True))
+    assert "filter" not in queries[0]
+    assert queries[1]["filter"]["last_edited_time"] == {"on_or_after": "2025-10-03T10:00:00.000Z"}
+    asyncio.run(client.aclose())
+
+
+def test_fetchers_share_one_sync_facade(monkeypatch):
+    from agents import notion_async_client
+    from config.notion_config import NotionConfig
+
+    created: List[object] = []
+
+    class FakeFacade:
+        def __init__(self) -> None:
+            created.append(self)
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setenv("NOTION_ASYNC_CLIENT", "true")
+    monkeypatch.setattr(NotionConfig, "validate_token", staticmethod(lambda *args: True))
+    monkeypatch.setattr(notion_async_client, "SyncNotionClient", FakeFacade)
+    monkeypatch.setattr(notion_async_client, "_shared_sync_client", None)
+
+    first = NotionContextFetcher()._build_fallback_client()
+    second = NotionContextFetcher()._build_fallback_client()
+
+    assert first is second and len(created) == 1
+
+
+def test_create_page_appends_blocks_beyond_the_first_hundred():
+    sent: List[tuple] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        sent.append((request.method, request.url.path, len(body.get("children", []))))
+        if request.method == "POST":
+            return httpx.Response(200, json={"id": "new-page", "url": "https://notion.so/new-page"})
+        return httpx.Response(200, json={"results": []})
+
+    client = AsyncNotionClient(
+        headers={"Authorization": "Bearer test"},
+        transport=httpx.MockTransport(handler),
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    children = [{"paragraph": {"rich_text": [{"text": {"content": str(index)}}]}} for index in range(250)]
+
+    async def run() -> Dict[str, Any]:
+        async with client:
+            return await client.create_page("2806e4d21b458012a744d8d6723c8be1", {}, children)
+
+    assert asyncio.run(run())["id"] == "new-page"
+    assert sent == [
+        ("POST", "/v1/pages", 100),
+        ("PATCH", "/v1/blocks/new-page/children", 100),
+        ("PATCH", "/v1/blocks/new-page/children", 50),
+    ]
+
+
+def test_async_writes_are_not_retried_on_server_errors():
+    calls: List[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        return httpx.Response(502)
+
+    client = AsyncNotionClient(
+        headers={"Authorization": "Bearer test"},
+        transport=httpx.MockTransport(handler),
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    client.backoff_factor = 0
+
+    async def run() -> None:
+        async with client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.create_page("2806e4d21b458012a744d8d6723c8be1", {})
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.retrieve_page("page-1")
+
+    asyncio.run(run())
+    assert calls == ["POST", "GET", "GET", "GET", "GET"]
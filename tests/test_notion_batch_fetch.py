@@ -0,0 +1,74 @@
+"""Tests unitaires pour le chargement concurrent de pages complètes (fetch_pages_full)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+from agents.notion_context_fetcher import NotionContextFetcher, PageFetchResult
+
+
+class SlowPageClient:
+    def __init__(self, latency: float = 0.05, failing: str | None = None) -> None:
+        self.latency = latency
+        self.failing = failing
+        self.content_calls: List[str] = []
+        self.lock = threading.Lock()
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:  # pragma: no cover - unused
+        return []
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        if page_id == self.failing:
+            raise RuntimeError("HTTP 404")
+        return {"id": page_id, "title": f"Titre {page_id}", "last_edited_time": "2025-10-01T10:00:00.000Z"}
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        with self.lock:
+            self.content_calls.append(page_id)
+        time.sleep(self.latency)
+        return f"Contenu {page_id}"
+
+
+def test_batch_keeps_request_order_and_dedupes():
+    client = SlowPageClient()
+    fetcher = NotionContextFetcher(client=client)
+    results = fetcher.fetch_pages_full(["p1", "p2", "p1", "p3"], domains={"p2": "lieux"})
+
+    assert [r.page_id for r in results] == ["p1", "p2", "p3"]
+    assert all(r.ok for r in results)
+    assert results[1].page.domain == "lieux"
+    assert sorted(client.content_calls) == ["p1", "p2", "p3"]
+
+
+def test_batch_runs_misses_concurrently(monkeypatch):
+    monkeypatch.setenv("NOTION_PAGE_CONCURRENCY", "8")
+    fetcher = NotionContextFetcher(client=SlowPageClient(latency=0.1))
+    start = time.monotonic()
+    results = fetcher.fetch_pages_full([f"p{i}" for i in range(8)])
+    assert time.monotonic() - start < 0.5
+    assert len(results) == 8
+
+
+def test_cache_hits_are_reported_before_misses_complete():
+    client = SlowPageClient(latency=0.1)
+    fetcher = NotionContextFetcher(client=client)
+    fetcher.fetch_page_full("cached")
+    client.content_calls.clear()
+
+    reported: List[str] = []
+    results = fetcher.fetch_pages_full(["slow", "cached"], on_result=lambda r: reported.append(r.page_id))
+
+    assert reported == ["cached", "slow"]
+    assert [r.page_id for r in results] == ["slow", "cached"]
+    assert client.content_calls == ["slow"]
+
+
+def test_failing_page_is_reported_without_aborting_batch():
+    fetcher = NotionContextFetcher(client=SlowPageClient(failing="p2"))
+    results = fetcher.fetch_pages_full(["p1", "p2", "p3"])
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert isinstance(results[1], PageFetchResult)
+    assert "404" in str(results[1].error)
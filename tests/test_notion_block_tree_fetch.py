@@ -0,0 +1,120 @@
+"""Tests unitaires pour la récupération concurrente (BFS) des blocs Notion."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.notion_context_fetcher import DirectNotionClient
+from config.notion_rate_limiter import NotionRateLimiter
+from tests.conftest import FakeResponse
+
+
+def _block(block_id: str, block_type: str, text: str, has_children: bool = False) -> Dict[str, Any]:
+    return {
+        "id": block_id,
+        "type": block_type,
+        "has_children": has_children,
+        block_type: {"rich_text": [{"plain_text": text}]},
+    }
+
+
+def _make_client(tree: Dict[str, List[Dict[str, Any]]], page_size: int = 100, latency: float = 0.0, concurrency: int = 4):
+    """Client dont ``_request`` sert l'arbre en mémoire (pagination simulée)."""
+
+    client = DirectNotionClient(
+        headers={"Authorization": "Bearer test"},
+        max_concurrency=concurrency,
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    stats = {"calls": [], "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def fake_request(method: str, url: str, **kwargs):
+        block_id = url.rstrip("/").split("/")[-2]
+        start = int((kwargs.get("params") or {}).get("start_cursor") or 0)
+        with lock:
+            stats["calls"].append((block_id, start))
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            time.sleep(latency)
+            if block_id not in tree:
+                return FakeResponse(status_code=404)
+            children = tree[block_id]
+            chunk = children[start : start + page_size]
+            end = start + len(chunk)
+            has_more = end < len(children)
+            return FakeResponse({"results": chunk, "has_more": has_more, "next_cursor": str(end) if has_more else None})
+        finally:
+            with lock:
+                stats["in_flight"] -= 1
+
+    client._request = fake_request  # type: ignore[assignment]
+    return client, stats
+
+
+@pytest.fixture
+def nested_tree() -> Dict[str, List[Dict[str, Any]]]:
+    return {
+        "page-root": [
+            _block("h1", "heading_1", "Identité", has_children=True),
+            _block("p1", "paragraph", "Intro"),
+            _block("t1", "toggle", "Secrets", has_children=True),
+        ],
+        "h1": [
+            _block("h1-a", "bulleted_list_item", "Âge: 42"),
+            _block("h1-b", "callout", "Note", has_children=True),
+        ],
+        "h1-b": [_block("h1-b-1", "quote", "Citation")],
+        "t1": [_block("t1-a", "numbered_list_item", "Premier"), _block("t1-b", "heading_2", "Sous-titre")],
+    }
+
+
+def test_bfs_fetch_preserves_document_order(nested_tree):
+    client, _ = _make_client(nested_tree)
+    content = client.retrieve_page_content("page-root")
+    assert content.split("\n") == [
+        "# Identité",
+        "  - Âge: 42",
+        "  💡 Note",
+        "    > Citation",
+        "Intro",
+        "▶ Secrets",
+        "  1. Premier",
+        "  ## Sous-titre",
+    ]
+
+
+def test_bfs_fetch_follows_child_pagination():
+    tree = {"page-root": [_block(f"p{i}", "paragraph", f"Ligne {i}") for i in range(7)]}
+    client, stats = _make_client(tree, page_size=3)
+    content = client.retrieve_page_content("page-root")
+    assert content.split("\n") == [f"Ligne {i}" for i in range(7)]
+    assert stats["calls"] == [("page-root", 0), ("page-root", 3), ("page-root", 6)]
+
+
+def test_bfs_fetch_runs_each_level_concurrently():
+    tree: Dict[str, List[Dict[str, Any]]] = {
+        "page-root": [_block(f"t{i}", "toggle", f"Toggle {i}", has_children=True) for i in range(8)],
+    }
+    for i in range(8):
+        tree[f"t{i}"] = [_block(f"t{i}-p", "paragraph", f"Contenu {i}")]
+    client, stats = _make_client(tree, latency=0.05, concurrency=4)
+
+    content = client.retrieve_page_content("page-root")
+
+    assert "  Contenu 7" in content.split("\n")
+    assert len(stats["calls"]) == 9
+    assert 1 < stats["max_in_flight"] <= 4
+
+
+def test_bfs_fetch_ignores_failing_children(nested_tree):
+    del nested_tree["t1"]
+    client, _ = _make_client(nested_tree)
+    content = client.retrieve_page_content("page-root")
+    assert "▶ Secrets" in content
+    assert "Premier" not in content
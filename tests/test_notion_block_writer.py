@@ -0,0 +1,106 @@
+"""Tests unitaires pour l'export Notion par lots (découpage des blocs et du rich text)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.notion_block_writer import (
+    MAX_TEXT_LENGTH,
+    PartialPageError,
+    create_page_with_blocks,
+    markdown_to_blocks,
+    split_text,
+)
+from tests.conftest import FakeResponse
+
+
+def _text(block: Dict[str, Any]) -> str:
+    (body,) = block.values()
+    return "".join(segment["text"]["content"] for segment in body["rich_text"])
+
+
+def test_long_paragraph_is_split_into_segments_without_loss():
+    paragraph = "Lysandre cartographie les marées. " * 200
+    blocks = markdown_to_blocks(f"# Identité\n{paragraph}")
+
+    assert list(blocks[0]) == ["heading_1"]
+    segments = blocks[1]["paragraph"]["rich_text"]
+    assert len(segments) == 4
+    assert all(len(segment["text"]["content"]) <= MAX_TEXT_LENGTH for segment in segments)
+    assert _text(blocks[1]) == paragraph
+
+
+def test_split_counts_astral_characters_as_two_units():
+    chunks = split_text("🗺" * 1500)
+    assert [len(chunk) for chunk in chunks] == [1000, 500]
+
+
+def test_huge_paragraph_continues_in_next_block():
+    blocks = markdown_to_blocks("x" * (MAX_TEXT_LENGTH * 150))
+    assert [len(block["paragraph"]["rich_text"]) for block in blocks] == [100, 50]
+
+
+class RecordingTransport:
+    def __init__(self, fail_on_patch: int = 0) -> None:
+        self.calls: List[Dict[str, Any]] = []
+        self.fail_on_patch = fail_on_patch
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append({"method": "POST", "url": url, **kwargs})
+        return FakeResponse({"id": "page-1", "url": "https://notion.so/page-1"})
+
+    def patch(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append({"method": "PATCH", "url": url, **kwargs})
+        patches = sum(call["method"] == "PATCH" for call in self.calls)
+        return FakeResponse(status_code=500 if patches == self.fail_on_patch else 200)
+
+
+def test_large_page_is_created_then_appended_in_ordered_batches():
+    content = "\n".join(f"Ligne {index}" for index in range(250))
+    blocks = markdown_to_blocks(content)
+    transport = RecordingTransport()
+    progress: List[tuple] = []
+
+    page = create_page_with_blocks(
+        {"parent": {"database_id": "db"}, "properties": {}},
+        blocks,
+        {"Authorization": "Bearer test"},
+        transport=transport,  # type: ignore[arg-type]
+        on_progress=lambda sent, total: progress.append((sent, total)),
+    )
+
+    assert page["id"] == "page-1"
+    assert [(call["method"], call["url"], len(call["json"]["children"])) for call in transport.calls] == [
+        ("POST", "pages", 100),
+        ("PATCH", "blocks/page-1/children", 100),
+        ("PATCH", "blocks/page-1/children", 50),
+    ]
+    sent = [block for call in transport.calls for block in call["json"]["children"]]
+    assert [_text(block) for block in sent] == [f"Ligne {index}" for index in range(250)]
+    assert progress == [(100, 250), (200, 250), (250, 250)]
+
+
+def test_failed_batch_stops_the_export():
+    blocks = markdown_to_blocks("\n".join("x" for _ in range(350)))
+    transport = RecordingTransport(fail_on_patch=1)
+
+    with pytest.raises(RuntimeError):
+        create_page_with_blocks({"properties": {}}, blocks, {}, transport=transport)  # type: ignore[arg-type]
+
+    assert [call["method"] for call in transport.calls] == ["POST", "PATCH"]
+
+
+def test_failure_on_second_batch_reports_the_created_page():
+    blocks = markdown_to_blocks("\n".join("x" for _ in range(350)))
+    transport = RecordingTransport(fail_on_patch=2)
+
+    with pytest.raises(PartialPageError) as excinfo:
+        create_page_with_blocks({"properties": {}}, blocks, {}, transport=transport)  # type: ignore[arg-type]
+
+    error = excinfo.value
+    assert (error.page_id, error.page_url) == ("page-1", "https://notion.so/page-1")
+    assert (error.blocks_written, error.total_blocks) == (200, 350)
+    assert isinstance(error.__cause__, RuntimeError)
+    assert [call["method"] for call in transport.calls] == ["POST", "PATCH", "PATCH"]
@@ -0,0 +1,122 @@
+"""Tests unitaires pour le préchauffage du cache Notion."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from agents import notion_cache_warmup
+from agents.notion_cache_warmup import WarmupProgress, recent_context_pages, warm_up
+from agents.notion_context_fetcher import PageFetchResult
+from agents.notion_relation_resolver import NotionRelationResolver
+from config.notion_config import NotionConfig
+from config.notion_rate_limiter import RequestPriority, current_priority
+
+
+def _write_output(directory, name: str, selected: List[str], previews: List[Dict[str, Any]], age: float) -> None:
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps({"context": {"selected_ids": selected, "previews": previews}}), encoding="utf-8")
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+def test_recent_context_pages_orders_by_recency_and_dedupes(tmp_path):
+    _write_output(tmp_path, "old", ["p3", "p1"], [], age=100)
+    _write_output(tmp_path, "new", ["p1", "p2"], [{"id": "p1", "domain": "lieux"}], age=10)
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+    assert recent_context_pages(tmp_path) == [("p1", "lieux"), ("p2", None), ("p3", None)]
+    assert recent_context_pages(tmp_path, limit=2) == [("p1", "lieux"), ("p2", None)]
+
+
+class FakeFetcher:
+    SANDBOX_DATABASES = {"personnages": "db-perso", "lieux": "db-lieux", "objets": None}
+
+    def __init__(self) -> None:
+        self.calls: List[Any] = []
+        self.priorities: List[RequestPriority] = []
+
+    def iter_databases(self, domains=None):
+        self.priorities.append(current_priority())
+        for domain in domains:
+            yield domain, ["preview"] * 2
+
+    def fetch_page_full(self, page_id: str, domain: str = None):
+        self.calls.append(("full", page_id, domain))
+        raise RuntimeError("offline")
+
+    def fetch_pages_full(self, page_ids, domains=None, on_result=None):
+        self.calls.append(("batch", list(page_ids), dict(domains or {})))
+        results = [PageFetchResult(page_id, page=object()) for page_id in page_ids]
+        for result in results:
+            on_result(result)
+        return results
+
+
+class FakeResolver:
+    def __init__(self) -> None:
+        self.domains: List[str] = []
+
+    def fetch_entity_names(self, domain: str) -> Dict[str, str]:
+        self.domains.append(domain)
+        return {f"{domain}-name": f"{domain}-id"}
+
+
+def test_warm_up_prefetches_every_step_and_reports_progress(tmp_path):
+    _write_output(tmp_path, "run", ["p1", "p2"], [{"id": "p2", "domain": "lieux"}], age=0)
+    fetcher, resolver = FakeFetcher(), FakeResolver()
+    updates: List[WarmupProgress] = []
+
+    result = warm_up(fetcher=fetcher, resolver=resolver, outputs_dir=tmp_path, on_progress=updates.append)
+
+    assert fetcher.priorities == [RequestPriority.BACKGROUND]
+    assert fetcher.calls == [
+        ("full", NotionConfig.VISION_PAGE_ID, "vision"),
+        ("batch", ["p1", "p2"], {"p1": None, "p2": "lieux"}),
+    ]
+    assert resolver.domains == list(notion_cache_warmup.RESOLVER_DOMAINS)
+    assert result.finished
+    assert result.counts == {"pages": 4, "recent": 2, "names": 5}
+    assert result.errors == ["vision: offline"]
+    steps = [update.step for update in updates]
+    assert steps.index("listings") < steps.index("vision") < steps.index("recent") < steps.index("resolver")
+    assert updates[-1].finished
+
+
+def test_resolver_reuses_a_warmed_name_index():
+    warmed = NotionRelationResolver()
+    warmed._notion_client = type("Client", (), {
+        "iter_pages": lambda self, *args, **kwargs: iter([
+            {"id": "id-1", "properties": {"Nom": {"type": "title", "title": [{"plain_text": "Lysandre"}]}}}
+        ])
+    })()
+    warmed.fetch_entity_names("personnages")
+
+    fresh = NotionRelationResolver()
+    fresh._notion_client = None  # served from the shared index, no listing
+    match = fresh.find_match("Lysandre", "personnages")
+
+    assert match is not None and match.notion_id == "id-1"
+
+
+def test_background_warm_up_runs_once(monkeypatch):
+    calls: List[Any] = []
+
+    def fake_warm_up(on_progress=None, **kwargs):
+        calls.append(kwargs)
+        on_progress(WarmupProgress(step="done", finished=True))
+        return "report"
+
+    monkeypatch.setattr(notion_cache_warmup, "warm_up", fake_warm_up)
+    monkeypatch.setattr(notion_cache_warmup, "_future", None)
+    monkeypatch.setattr(notion_cache_warmup, "_status", WarmupProgress())
+
+    first = notion_cache_warmup.start_background_warm_up(max_recent=5)
+    second = notion_cache_warmup.start_background_warm_up(max_recent=5)
+
+    assert first is second
+    assert first.result(timeout=5) == "report"
+    assert calls == [{"max_recent": 5}]
+    assert notion_cache_warmup.warmup_status().finished
@@ -0,0 +1,150 @@
+"""Unit tests for the BM25 full-content ranker."""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Dict, List, Optional
+
+import pytest
+
+from agents.notion_content_ranker import ContentRanker, tokenize
+from agents.notion_context_fetcher import NotionPageContent, NotionPagePreview
+from agents.notion_context_index import ContextTokenIndex
+from agents.notion_context_matcher import NotionContextMatcher
+from agents.notion_semantic_index import SemanticIndex
+
+DOCS = {
+    "leviathan": "Le Léviathan pétrifié respire encore. Les marées du Léviathan sculptent la pierre.",
+    "port": "Port Salin, cité marchande des cartographes et des marées.",
+    "foret": "Forêt des Murmures, bois ancien peuplé de veilleurs.",
+    "guilde": "Guilde des cartographes : archives, cartes vivantes et relevés des marées.",
+}
+
+
+def _reference_bm25(query: str, docs: Dict[str, str], k1: float = 1.2, b: float = 0.75) -> Dict[str, float]:
+    tokens = {page_id: tokenize(text) for page_id, text in docs.items()}
+    average = sum(len(t) for t in tokens.values()) / len(tokens)
+    n_docs = len(docs)
+    terms = set(tokenize(query))
+    idf = {}
+    for term in terms:
+        df = sum(1 for t in tokens.values() if term in t)
+        idf[term] = math.log1p((n_docs - df + 0.5) / (df + 0.5))
+    scores = {}
+    for page_id, doc_tokens in tokens.items():
+        counts = Counter(doc_tokens)
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc_tokens) / average))
+        scores[page_id] = min(score / sum(idf.values()), 1.0)
+    return scores
+
+
+def _ranker() -> ContentRanker:
+    ranker = ContentRanker()
+    for page_id, text in DOCS.items():
+        ranker.upsert(page_id, text, version="v1")
+    return ranker
+
+
+def test_rank_matches_reference_bm25():
+    query = "Les cartographes étudient les marées du Léviathan"
+    expected = _reference_bm25(query, DOCS)
+
+    ranked = _ranker().rank(query)
+
+    assert [page_id for page_id, _ in ranked] == sorted(
+        (page_id for page_id, score in expected.items() if score > 0), key=lambda p: -expected[p]
+    )
+    for page_id, score in ranked:
+        assert score == pytest.approx(expected[page_id], rel=1e-5)
+        assert 0.0 < score <= 1.0
+
+
+def test_rank_filters_allowed_pages_and_top_k():
+    ranker = _ranker()
+
+    assert [page_id for page_id, _ in ranker.rank("marées", allowed={"port", "foret"})] == ["port"]
+    assert len(ranker.rank("marées", top_k=2)) == 2
+    assert ranker.rank("inconnu") == []
+    assert ranker.score("veilleurs", "foret") > 0 and ranker.score("veilleurs", "absent") == 0.0
+
+
+def test_upsert_is_versioned_and_remove_unindexes():
+    ranker = _ranker()
+
+    assert not ranker.upsert("foret", "autre texte", version="v1")
+    assert ranker.upsert("foret", "Forêt engloutie par les marées", version="v2")
+    assert ranker.has("foret", "v2") and not ranker.has("foret", "v1")
+    assert "foret" in {page_id for page_id, _ in ranker.rank("engloutie")}
+
+    ranker.remove("foret")
+    assert ranker.rank("engloutie") == []
+    assert len(ranker) == len(DOCS) - 1
+
+
+def _preview(page_id: str, title: str, summary: str = "") -> NotionPagePreview:
+    return NotionPagePreview(
+        id=page_id, title=title, domain="lieux", summary=summary, tags=[], last_edited="v1", token_estimate=10
+    )
+
+
+class CachedFetcher:
+    """Fetcher double: ``cached`` pages are in cache, the others cost a request."""
+
+    def __init__(self, cached: Dict[str, str], remote: Dict[str, str]) -> None:
+        self.cached = cached
+        self.remote = remote
+        self.fetched: List[str] = []
+
+    def _payload(self, page_id: str, content: str) -> NotionPageContent:
+        return NotionPageContent(
+            id=page_id, title=page_id, domain="lieux", summary="", tags=[], last_edited="v1",
+            token_estimate=10, content=content, properties={},
+        )
+
+    def cached_page_full(self, page_id: str, version: Optional[str] = None, domain: Optional[str] = None):
+        content = self.cached.get(page_id)
+        return None if content is None else self._payload(page_id, content)
+
+    def fetch_page_full(self, page_id: str, domain: Optional[str] = None):
+        self.fetched.append(page_id)
+        return self._payload(page_id, self.remote.get(page_id) or self.cached.get(page_id, ""))
+
+
+def test_suggest_context_ranks_cached_full_contents_by_default():
+    pages = [_preview(f"p{i}", f"Fiche {i}", "Sans rapport") for i in range(20)]
+    pages.append(_preview("body", "Chronique", "Sans rapport"))
+    fetcher = CachedFetcher(
+        cached={"body": "La chasseuse de primes traque son créateur dans la Vieille Ville"}, remote={}
+    )
+    matcher = NotionContextMatcher(
+        fetcher=fetcher, index=ContextTokenIndex(), ranker=ContentRanker(), semantic=SemanticIndex(persist=False)
+    )
+
+    suggestions = matcher.suggest_context(
+        "Une chasseuse de primes traque son créateur", max_fiches=2, available_pages=pages
+    )
+
+    assert suggestions[0].page.id == "body"
+    assert suggestions[0].score >= 0.7 and suggestions[0].auto_select
+
+
+def test_refine_pool_indexes_fetched_contents_once():
+    pages = [_preview("p1", "Port Salin", "cartographes"), _preview("p2", "Guilde", "cartographes")]
+    fetcher = CachedFetcher(cached={}, remote={"p1": "Port des cartographes", "p2": "Guilde des cartographes"})
+    ranker = ContentRanker()
+    matcher = NotionContextMatcher(
+        fetcher=fetcher, index=ContextTokenIndex(), ranker=ranker, semantic=SemanticIndex(persist=False)
+    )
+
+    matcher.suggest_context("Les cartographes", max_fiches=1, available_pages=pages)
+    first_fetches = list(fetcher.fetched)
+    matcher.suggest_context("Les cartographes", max_fiches=1, available_pages=pages)
+
+    assert sorted(first_fetches) == ["p1", "p2"]
+    assert fetcher.fetched == first_fetches
+    assert ranker.has("p1", "v1") and ranker.has("p2", "v1")
@@ -0,0 +1,110 @@
+"""Unit tests for the inverted token index behind context suggestions."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import List
+
+from agents.notion_context_fetcher import NotionPagePreview
+from agents.notion_context_index import ContextTokenIndex, _normalise_text
+from agents.notion_context_matcher import NotionContextMatcher
+from agents.notion_semantic_index import SemanticIndex
+
+
+def _preview(page_id: str, title: str, summary: str = "", domain: str = "lieux", tags=()) -> NotionPagePreview:
+    return NotionPagePreview(
+        id=page_id,
+        title=title,
+        domain=domain,
+        summary=summary,
+        tags=list(tags),
+        last_edited="2025-10-01T10:00:00.000Z",
+        token_estimate=10,
+    )
+
+
+PAGES: List[NotionPagePreview] = [
+    _preview("p1", "Léviathan Pétrifié", "Colosse marin figé dans la pierre"),
+    _preview("p2", "Port Salin", "Cité portuaire des cartographes", tags=["commerce"]),
+    _preview("p3", "Alteir", "Cartographe exilée", domain="personnages"),
+    _preview("p4", "Forêt des Murmures", "Bois ancien"),
+    _preview("p5", "Confrérie des Veilleurs", "Ordre de cartographes", domain="communautes"),
+]
+
+
+def test_search_matches_linear_scoring():
+    brief = "La cartographe Alteir cherche le Léviathan avec la confrérie"
+    keywords = NotionContextMatcher.extract_keywords(brief)
+    index = ContextTokenIndex()
+    positions = index.sync(PAGES)
+
+    results = index.search(keywords, set(_normalise_text(brief).split()), allowed=positions)
+    linear = [c for c in NotionContextMatcher.fuzzy_match_pages(keywords, PAGES) if c.score > 0]
+    linear.sort(key=lambda c: c.score, reverse=True)
+
+    assert [(indexed.page.id, score) for indexed, score, _ in results] == [(c.page.id, c.score) for c in linear]
+    assert "p4" not in {indexed.page.id for indexed, _, _ in results}
+
+
+def test_title_postings_surface_pages_mentioned_in_the_brief():
+    index = ContextTokenIndex()
+    positions = index.sync([_preview("p1", "L'Inéluctable"), _preview("p2", "Autre lieu")])
+
+    # "l'ineluctable" is a single keyword, but the normalised title token is "ineluctable"
+    results = index.search(["l'ineluctable"], {"ineluctable"}, allowed=positions)
+
+    assert [(indexed.page.id, score) for indexed, score, _ in results] == [("p1", 0.0)]
+
+
+def test_sync_only_reindexes_changed_pages():
+    index = ContextTokenIndex()
+    index.sync(PAGES)
+    assert index.updates == len(PAGES)
+
+    # Same content delivered as new objects (e.g. listing reloaded from the cache)
+    index.sync([replace(page) for page in PAGES])
+    assert index.updates == len(PAGES)
+
+    edited = replace(PAGES[3], summary="Bois hanté par un léviathan", last_edited="2025-10-02T10:00:00.000Z")
+    positions = index.sync(PAGES[:3] + [edited] + PAGES[4:])
+    assert index.updates == len(PAGES) + 1
+    hits = index.search(["leviathan"], allowed=positions)
+    assert {indexed.page.id for indexed, _, _ in hits} == {"p1", "p4"}
+
+
+def test_sync_drops_pages_removed_from_a_synced_domain_only():
+    index = ContextTokenIndex()
+    index.sync(PAGES)
+
+    # Listing of "lieux" without p2; the other domains are not part of this sync
+    index.sync([page for page in PAGES if page.domain == "lieux" and page.id != "p2"])
+
+    assert index.get("p2") is None
+    assert index.get("p3") is not None and index.get("p5") is not None
+    assert index.search(["commerce"]) == []
+
+
+def test_search_respects_allowed_pages_and_top_k():
+    index = ContextTokenIndex()
+    index.sync(PAGES)
+    allowed = {"p2": 0, "p5": 1}
+
+    results = index.search(["cartographes"], allowed=allowed)
+    assert [indexed.page.id for indexed, _, _ in results] == ["p2", "p5"]
+    assert len(index.search(["cartographes"], allowed=allowed, top_k=1)) == 1
+
+
+def test_suggest_context_uses_index_and_pads_with_unmatched_pages():
+    index = ContextTokenIndex()
+    matcher = NotionContextMatcher(fetcher=object(), index=index, semantic=SemanticIndex(persist=False))
+
+    suggestions = matcher.suggest_context(
+        "Une cartographe rencontre le Léviathan Pétrifié",
+        max_fiches=4,
+        available_pages=PAGES,
+    )
+
+    ids = [s.page.id for s in suggestions]
+    assert ids[0] == "p1" and suggestions[0].auto_select
+    assert len(ids) == 4 and len(set(ids)) == 4
+    assert len(index) == len(PAGES)
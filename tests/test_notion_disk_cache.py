@@ -0,0 +1,136 @@
+"""Tests unitaires pour le cache disque Notion (SQLite WAL, versionné par last_edited_time)."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+from agents.notion_context_fetcher import NotionContextFetcher, NotionPageContent
+from config.context_cache import context_cache
+from config.notion_disk_cache import NotionDiskCache
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class CountingClient:
+    def __init__(self, last_edited_time: str = "2025-10-04T16:00:00Z") -> None:
+        self.last_edited_time = last_edited_time
+        self.calls: List[str] = []
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        return []
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        self.calls.append(f"page:{page_id}")
+        return {
+            "id": page_id,
+            "last_edited_time": self.last_edited_time,
+            "properties": {"Nom": {"type": "title", "title": [{"plain_text": "Lysandre"}]}},
+        }
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        self.calls.append(f"content:{page_id}")
+        return f"# Identité\nCartographe ({self.last_edited_time})"
+
+
+def test_get_returns_value_only_for_matching_version(tmp_path):
+    cache = NotionDiskCache(path=tmp_path / "cache.sqlite3", enabled=True)
+    cache.set("full", "page-1", {"content": "v1"}, version="t1")
+
+    assert cache.get("full", "page-1", "t1") == {"content": "v1"}
+    assert cache.get("full", "page-1", "t2") is None
+    assert cache.get("full", "page-1") == {"content": "v1"}
+
+    cache.set("full", "page-1", {"content": "v2"}, version="t2")
+    assert cache.get("full", "page-1", "t1") is None
+    assert cache.stats() == {"full": 1}
+
+    cache.invalidate("full")
+    assert cache.get("full", "page-1") is None
+
+
+def test_disabled_cache_is_a_no_op(tmp_path):
+    cache = NotionDiskCache(path=tmp_path / "cache.sqlite3", enabled=False)
+    cache.set("full", "page-1", "value", version="t1")
+    assert cache.get("full", "page-1", "t1") is None
+    assert not (tmp_path / "cache.sqlite3").exists()
+
+
+def test_restart_skips_block_walk_when_page_unchanged():
+    client = CountingClient()
+    first = NotionContextFetcher(client=client).fetch_page_full("page-1", domain="personnages")
+    assert sorted(client.calls) == ["content:page-1", "page:page-1"]
+
+    # Simulate a new process: memory tier is empty, disk tier survives
+    context_cache.clear()
+    client.calls.clear()
+    second = NotionContextFetcher(client=client).fetch_page_full("page-1", domain="personnages")
+
+    assert isinstance(second, NotionPageContent)
+    assert second.content == first.content
+    assert client.calls == ["page:page-1"]
+
+
+def test_edited_page_is_refetched():
+    client = CountingClient()
+    NotionContextFetcher(client=client).fetch_page_full("page-1", domain="personnages")
+
+    context_cache.clear()
+    client.calls.clear()
+    client.last_edited_time = "2025-10-05T09:00:00Z"
+    page = NotionContextFetcher(client=client).fetch_page_full("page-1", domain="personnages")
+
+    assert sorted(client.calls) == ["content:page-1", "page:page-1"]
+    assert "2025-10-05T09:00:00Z" in page.content
+
+
+def test_preview_reuses_stored_block_tree():
+    client = CountingClient()
+    fetcher = NotionContextFetcher(client=client)
+    fetcher.fetch_page_full("page-1", domain="personnages")
+    client.calls.clear()
+
+    preview = fetcher.fetch_page_preview("page-1", domain="personnages")
+
+    assert preview.title == "Lysandre"
+    assert client.calls == ["page:page-1"]
+
+
+def test_force_refresh_bypasses_disk_tier():
+    client = CountingClient()
+    fetcher = NotionContextFetcher(client=client)
+    fetcher.fetch_page_full("page-1")
+    client.calls.clear()
+
+    fetcher.fetch_page_full("page-1", force_refresh=True)
+    assert sorted(client.calls) == ["content:page-1", "page:page-1"]
+
+
+def test_concurrent_writers_threads_and_processes(tmp_path):
+    path = tmp_path / "shared.sqlite3"
+    cache = NotionDiskCache(path=path, enabled=True)
+    script = (
+        "import sys\n"
+        "from config.notion_disk_cache import NotionDiskCache\n"
+        "cache = NotionDiskCache(path=sys.argv[1], enabled=True)\n"
+        "for i in range(50):\n"
+        "    cache.set('full', f'proc-{i}', {'i': i}, version='t')\n"
+    )
+    process = subprocess.Popen([sys.executable, "-c", script, str(path)], cwd=REPO_ROOT)
+
+    def writer(offset: int) -> None:
+        for i in range(50):
+            cache.set("full", f"thread-{offset}-{i}", {"i": i}, version="t")
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert process.wait(timeout=30) == 0
+
+    assert cache.stats() == {"full": 250}
+    assert cache.get("full", "proc-49", "t") == {"i": 49}
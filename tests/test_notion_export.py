@@ -320,6 +320,43 @@ def test_notion_properties_lieu(sample_lieu_content):
     assert notion_properties["Taille"]["select"]["name"] == "Secteur"
 
 
+@pytest.mark.unit
+def test_relation_names_split_once_per_field():
+    """Les noms relationnels sont découpés par une seule règle (Espèce : premier nom seul)"""
+    from app.streamlit_app.results import RELATION_FIELDS, relation_names
+
+    assert relation_names("Guilde des Cartographes, Veilleurs;  Ordre ;") == [
+        "Guilde des Cartographes",
+        "Veilleurs",
+        "Ordre",
+    ]
+    assert relation_names("Humains; Elfes", multiple=False) == ["Humains"]
+    assert [field for field, _, multiple in RELATION_FIELDS["personnages"] if not multiple] == ["Espèce"]
+
+
+@pytest.mark.unit
+def test_field_relations_dedupe_aliases_of_one_page():
+    """Deux alias d'une même fiche dans un champ ne donnent qu'une relation"""
+    from agents.notion_relation_resolver import EntityMatch, ResolutionReport
+    from app.streamlit_app.results import field_relations
+
+    lysandre = EntityMatch("Lysandre", "Lysandre", "id-lys", 1.0, "personnages")
+    report = ResolutionReport(
+        matches={
+            "personnages": {
+                "Lysandre": lysandre,
+                "La Cartographe": EntityMatch("La Cartographe", "Lysandre", "id-lys", 0.85, "personnages"),
+                "Inconnu": None,
+            }
+        }
+    )
+
+    resolved, unresolved = field_relations(report, "personnages", ["Lysandre", "La Cartographe", "Inconnu"])
+
+    assert [(r["id"], r["original"]) for r in resolved] == [("id-lys", "Lysandre")]
+    assert unresolved == ["Inconnu"]
+
+
 # ============================================================================
 # TESTS D'INTÉGRATION - API Notion (avec mock)
 # ============================================================================
@@ -453,4 +490,3 @@ def test_property_types_mapping():
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
-
@@ -0,0 +1,152 @@
+"""Tests unitaires pour la synchronisation incrémentale des listings Notion."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.notion_context_fetcher import DirectNotionClient, NotionContextFetcher
+from config.context_cache import context_cache
+from config.notion_rate_limiter import NotionRateLimiter
+from tests.conftest import FakeResponse
+
+PERSONNAGES_DB = "2806e4d21b458012a744d8d6723c8be1"
+
+
+@pytest.fixture(autouse=True)
+def only_personnages(monkeypatch):
+    monkeypatch.setattr(
+        NotionContextFetcher,
+        "SANDBOX_DATABASES",
+        {"personnages": PERSONNAGES_DB, "lieux": None},
+    )
+
+
+def _record(page_id: str, title: str, edited: str) -> Dict[str, Any]:
+    return {
+        "id": page_id,
+        "last_edited_time": edited,
+        "properties": {"Nom": {"type": "title", "title": [{"plain_text": title}]}},
+    }
+
+
+class DeltaClient:
+    """Fake client simulant une base Notion modifiable."""
+
+    def __init__(self) -> None:
+        self.pages: Dict[str, Dict[str, Any]] = {
+            "p1": _record("p1", "Lysandre", "2025-10-01T10:00:00.000Z"),
+            "p2": _record("p2", "Mirelle", "2025-10-02T10:00:00.000Z"),
+        }
+        self.calls: List[str] = []
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        self.calls.append("full")
+        return list(self.pages.values())
+
+    def list_pages_edited_since(self, database_id: str, since: str) -> List[Dict[str, Any]]:
+        self.calls.append(f"delta:{since}")
+        return sorted(
+            (page for page in self.pages.values() if page["last_edited_time"] >= since),
+            key=lambda page: page["last_edited_time"],
+            reverse=True,
+        )
+
+    def list_page_ids(self, database_id: str) -> List[str]:
+        self.calls.append("ids")
+        return list(self.pages)
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:  # pragma: no cover - unused
+        return self.pages[page_id]
+
+    def retrieve_page_content(self, page_id: str) -> str:  # pragma: no cover - unused
+        return ""
+
+
+def _titles(fetcher: NotionContextFetcher, force_refresh: bool = True) -> List[str]:
+    return sorted(preview.title for preview in fetcher.fetch_all_databases(force_refresh=force_refresh)["personnages"])
+
+
+def test_refresh_queries_only_pages_edited_since_high_water_mark():
+    client = DeltaClient()
+    fetcher = NotionContextFetcher(client=client, incremental_sync=True)
+    assert _titles(fetcher) == ["Lysandre", "Mirelle"]
+    assert client.calls == ["full"]
+
+    client.pages["p1"] = _record("p1", "Lysandre la Cartographe", "2025-10-03T08:00:00.000Z")
+    client.pages["p3"] = _record("p3", "Orvane", "2025-10-03T09:00:00.000Z")
+    client.calls.clear()
+
+    assert _titles(fetcher) == ["Lysandre la Cartographe", "Mirelle", "Orvane"]
+    assert client.calls == ["delta:2025-10-02T10:00:00.000Z"]
+
+
+def test_restart_resumes_from_disk_state():
+    client = DeltaClient()
+    NotionContextFetcher(client=client, incremental_sync=True).fetch_all_databases()
+    context_cache.clear()
+    client.calls.clear()
+
+    titles = _titles(NotionContextFetcher(client=client, incremental_sync=True), force_refresh=False)
+
+    assert titles == ["Lysandre", "Mirelle"]
+    assert client.calls == ["delta:2025-10-02T10:00:00.000Z"]
+
+
+def test_reconciliation_drops_deleted_pages():
+    client = DeltaClient()
+    fetcher = NotionContextFetcher(client=client, incremental_sync=True)
+    fetcher.fetch_all_databases()
+    del client.pages["p2"]
+
+    # Deletions are invisible to the delta query until the reconciliation is due
+    assert _titles(fetcher) == ["Lysandre", "Mirelle"]
+
+    fetcher.reconcile_interval = 0
+    client.calls.clear()
+    assert _titles(fetcher) == ["Lysandre"]
+    assert client.calls == ["delta:2025-10-02T10:00:00.000Z", "ids"]
+
+
+def test_disabled_incremental_sync_lists_everything():
+    client = DeltaClient()
+    fetcher = NotionContextFetcher(client=client, incremental_sync=False)
+    fetcher.fetch_all_databases()
+    fetcher.fetch_all_databases(force_refresh=True)
+    assert client.calls == ["full", "full"]
+
+
+def test_direct_client_sends_filter_and_stops_at_older_records():
+    client = DirectNotionClient(
+        headers={"Authorization": "Bearer test"},
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    payloads: List[Dict[str, Any]] = []
+    batches = [
+        # A client ignoring the filter still stops at the first older record
+        {
+            "results": [
+                _record("p3", "Orvane", "2025-10-03T09:00:00.000Z"),
+                _record("p1", "Lysandre", "2025-10-01T10:00:00.000Z"),
+            ],
+            "has_more": True,
+            "next_cursor": "c1",
+        },
+        {"results": [_record("p0", "Ancien", "2025-09-01T10:00:00.000Z")], "has_more": False},
+    ]
+
+    def fake_request(method: str, url: str, **kwargs):
+        payloads.append(kwargs["json"])
+        return FakeResponse(batches[len(payloads) - 1])
+
+    client._request = fake_request  # type: ignore[assignment]
+    changed = client.list_pages_edited_since("db", "2025-10-02T10:00:00.000Z")
+
+    assert [record["id"] for record in changed] == ["p3"]
+    assert len(payloads) == 1
+    assert payloads[0]["filter"] == {
+        "timestamp": "last_edited_time",
+        "last_edited_time": {"on_or_after": "2025-10-02T10:00:00.000Z"},
+    }
+    assert payloads[0]["sorts"] == [{"timestamp": "last_edited_time", "direction": "descending"}]
@@ -0,0 +1,154 @@
+"""Tests unitaires pour l'itération paginée des bases Notion (iter_pages)."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from agents.notion_async_client import AsyncNotionClient, SyncNotionClient
+from agents.notion_context_fetcher import DirectNotionClient, NotionContextFetcher
+from config.notion_rate_limiter import NotionRateLimiter
+from tests.conftest import FakeResponse
+
+RECORDS = [{"id": f"p{i}", "last_edited_time": "2025-10-01T10:00:00.000Z"} for i in range(25)]
+
+
+def _page(start: int, size: int) -> Dict[str, Any]:
+    chunk = RECORDS[start : start + size]
+    end = start + len(chunk)
+    has_more = end < len(RECORDS)
+    return {"results": chunk, "has_more": has_more, "next_cursor": str(end) if has_more else None}
+
+
+def _direct_client(monkeypatch, size: int = 10):
+    monkeypatch.setenv("NOTION_MAX_RECORDS", "12")
+    client = DirectNotionClient(
+        headers={"Authorization": "Bearer test"},
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    calls: List[Dict[str, Any]] = []
+
+    def fake_request(method: str, url: str, **kwargs):
+        calls.append(kwargs)
+        return FakeResponse(_page(int(kwargs["json"].get("start_cursor") or 0), size))
+
+    client._request = fake_request  # type: ignore[assignment]
+    return client, calls
+
+
+def test_iter_pages_yields_whole_database_without_cap(monkeypatch):
+    client, calls = _direct_client(monkeypatch)
+    assert [r["id"] for r in client.iter_pages("db")] == [r["id"] for r in RECORDS]
+    assert len(calls) == 3
+
+
+def test_iter_pages_stops_querying_when_caller_stops(monkeypatch):
+    client, calls = _direct_client(monkeypatch)
+    for record in client.iter_pages("db"):
+        if record["id"] == "p3":
+            break
+    assert len(calls) == 1
+
+
+def test_iter_pages_forwards_filter_sorts_and_properties(monkeypatch):
+    client, calls = _direct_client(monkeypatch)
+    query_filter = {"property": "Statut", "select": {"equals": "Publié"}}
+    sorts = [{"property": "Nom", "direction": "ascending"}]
+    next(client.iter_pages("db", filter=query_filter, sorts=sorts, filter_properties=["title"]))
+    assert calls[0]["json"]["filter"] == query_filter
+    assert calls[0]["json"]["sorts"] == sorts
+    assert calls[0]["params"] == {"filter_properties": ["title"]}
+
+
+def test_list_pages_keeps_its_cap(monkeypatch):
+    client, _ = _direct_client(monkeypatch)
+    assert len(client.list_pages("db")) == 12
+
+
+def _legacy_record(page_id: str, name: str, status: str, edited: str) -> Dict[str, Any]:
+    return {
+        "id": page_id,
+        "last_edited_time": edited,
+        "properties": {
+            "Nom": {"type": "title", "title": [{"plain_text": name}]},
+            "Statut": {"type": "select", "select": {"name": status} if status else None},
+        },
+    }
+
+
+def test_fetcher_filters_and_sorts_legacy_clients_client_side():
+    records = [
+        _legacy_record("a", "Lysandre", "Publié", "2025-10-01T10:00:00.000Z"),
+        _legacy_record("b", "Mirelle", "Brouillon", "2025-10-03T10:00:00.000Z"),
+        _legacy_record("c", "Orsolya", "Publié", "2025-10-02T10:00:00.000Z"),
+        _legacy_record("d", "Lyra", "", "2025-10-04T10:00:00.000Z"),
+    ]
+
+    class LegacyClient:
+        def list_pages(self, database_id: str):
+            return records
+
+    fetcher = NotionContextFetcher(client=LegacyClient())  # type: ignore[arg-type]
+
+    def ids(**kwargs: Any) -> List[str]:
+        return [r["id"] for r in fetcher.iter_database_pages("db", **kwargs)]
+
+    assert ids() == ["a", "b", "c", "d"]
+    assert ids(
+        filter={"property": "Statut", "select": {"equals": "Publié"}},
+        sorts=[{"timestamp": "last_edited_time", "direction": "descending"}],
+    ) == ["c", "a"]
+    assert ids(
+        filter={
+            "or": [
+                {"property": "Nom", "title": {"starts_with": "Ly"}},
+                {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": "2025-10-03T00:00:00.000Z"}},
+            ]
+        },
+        sorts=[{"property": "Nom", "direction": "ascending"}],
+    ) == ["d", "a", "b"]
+    assert ids(filter={"property": "Statut", "select": {"is_empty": True}}) == ["d"]
+    with pytest.raises(ValueError):
+        ids(filter={"property": "Nom", "formula": {"string": {"equals": "x"}}})
+
+
+def test_async_iter_pages_and_sync_facade():
+    requests_seen: List[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        import json
+
+        start = int(json.loads(request.content).get("start_cursor") or 0)
+        requests_seen.append(start)
+        return httpx.Response(200, json=_page(start, 10))
+
+    async_client = AsyncNotionClient(
+        headers={"Authorization": "Bearer test"},
+        transport=httpx.MockTransport(handler),
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+
+    async def collect() -> List[str]:
+        return [record["id"] async for record in async_client.iter_pages("db")]
+
+    assert len(asyncio.run(collect())) == 25
+
+    requests_seen.clear()
+    facade = SyncNotionClient(AsyncNotionClient(
+        headers={"Authorization": "Bearer test"},
+        transport=httpx.MockTransport(handler),
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    ))
+    try:
+        first = []
+        for record in facade.iter_pages("db"):
+            first.append(record["id"])
+            if len(first) == 5:
+                break
+    finally:
+        facade.close()
+    assert first == ["p0", "p1", "p2", "p3", "p4"]
+    assert requests_seen == [0]
@@ -0,0 +1,135 @@
+"""Tests unitaires pour l'index de noms partagé du résolveur de relations."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from agents.notion_name_index import SharedNameIndex, shared_name_index
+from agents.notion_relation_resolver import NotionRelationResolver
+from config.context_cache import context_cache
+
+DB = "1886e4d2-1b45-81a2-9340-f77f5f2e5885"  # Personnages (principale)
+
+
+@pytest.fixture(autouse=True)
+def default_intervals(monkeypatch):
+    monkeypatch.setattr(shared_name_index, "refresh_interval", 300.0)
+    monkeypatch.setattr(shared_name_index, "reconcile_interval", 6 * 3600.0)
+
+
+def _record(page_id: str, title: str, edited: str) -> Dict[str, Any]:
+    return {
+        "id": page_id,
+        "url": f"https://notion.so/{page_id}",
+        "last_edited_time": edited,
+        "properties": {"Nom": {"type": "title", "title": [{"plain_text": title}]}},
+    }
+
+
+class NamesClient:
+    """Fake client : ``iter_pages`` avec filtre ``last_edited_time`` et tri décroissant."""
+
+    def __init__(self) -> None:
+        self.pages: Dict[str, Dict[str, Any]] = {
+            "p1": _record("p1", "Lysandre", "2025-10-01T10:00:00.000Z"),
+            "p2": _record("p2", "Le Mirelle", "2025-10-02T10:00:00.000Z"),
+        }
+        self.calls: List[str] = []
+
+    def iter_pages(self, database_id, filter: Optional[Dict[str, Any]] = None, sorts=None, filter_properties=None, page_size=None):
+        assert database_id == DB and filter_properties == ["title"]
+        if filter is None:
+            self.calls.append("full")
+            return iter(list(self.pages.values()))
+        since = filter["last_edited_time"]["on_or_after"]
+        self.calls.append(f"delta:{since}")
+        edited = sorted(self.pages.values(), key=lambda page: page["last_edited_time"], reverse=True)
+        return iter([page for page in edited if page["last_edited_time"] >= since])
+
+
+def _resolver(client: NamesClient) -> NotionRelationResolver:
+    resolver = NotionRelationResolver()
+    resolver._notion_client = client
+    return resolver
+
+
+def test_new_resolvers_reuse_the_index_without_listing():
+    client = NamesClient()
+    assert _resolver(client).fetch_entity_names("personnages") == {"lysandre": "p1", "mirelle": "p2"}
+    assert client.calls == ["full"]
+
+    # Nouvel export dans le même processus
+    assert _resolver(client).find_match("Mirelle", "personnages").notion_id == "p2"
+    # Autre processus : mémoire vide, index relu sur disque
+    context_cache.clear()
+    assert _resolver(client).find_match("Lysandre", "personnages").matched_name == "Lysandre"
+    assert client.calls == ["full"]
+
+
+def test_refresh_queries_only_pages_edited_since_the_newest_known(monkeypatch):
+    client = NamesClient()
+    first = _resolver(client).fetch_entity_names("personnages")
+    monkeypatch.setattr(shared_name_index, "refresh_interval", 0.0)
+
+    # Rien n'a changé : même dictionnaire (index n-grammes conservé)
+    assert _resolver(client).fetch_entity_names("personnages") is first
+
+    client.pages["p1"] = _record("p1", "Lysandre Kerlain", "2025-10-03T10:00:00.000Z")
+    client.pages["p3"] = _record("p3", "Orsolya", "2025-10-03T11:00:00.000Z")
+    refreshed = _resolver(client).fetch_entity_names("personnages")
+
+    assert refreshed == {"lysandre kerlain": "p1", "mirelle": "p2", "orsolya": "p3"}
+    assert client.calls == ["full", "delta:2025-10-02T10:00:00.000Z", "delta:2025-10-02T10:00:00.000Z"]
+
+
+def test_force_refresh_is_incremental():
+    client = NamesClient()
+    resolver = _resolver(client)
+    resolver.fetch_entity_names("personnages")
+    client.pages["p2"] = _record("p2", "Mirelle d'Ambre", "2025-10-04T10:00:00.000Z")
+
+    assert resolver.fetch_entity_names("personnages", force_refresh=True)["mirelle d'ambre"] == "p2"
+    assert client.calls == ["full", "delta:2025-10-02T10:00:00.000Z"]
+
+
+def test_reconciliation_drops_deleted_pages(monkeypatch):
+    client = NamesClient()
+    index = SharedNameIndex(refresh_interval=0.0, reconcile_interval=0.0)
+    index.get(DB, lambda: client)
+    del client.pages["p1"]
+
+    names = index.get(DB, lambda: client)
+
+    assert names.entities == {"mirelle": "p2"}
+    assert client.calls == ["full", "delta:2025-10-02T10:00:00.000Z", "full"]
+
+
+def test_failed_refresh_keeps_serving_the_previous_names():
+    client = NamesClient()
+    index = SharedNameIndex(refresh_interval=0.0)
+    before = index.get(DB, lambda: client)
+
+    class Offline:
+        def iter_pages(self, *args, **kwargs):
+            raise RuntimeError("offline")
+
+    served = index.get(DB, Offline)
+    assert served.entities is before.entities and served.checked_at == before.checked_at
+    # Autre processus : l'index relu sur disque est servi
+    context_cache.clear()
+    assert index.get(DB, Offline).entities == {"lysandre": "p1", "mirelle": "p2"}
+    # Le prochain appel réessaie
+    assert index.get(DB, lambda: client).entities == before.entities
+    assert client.calls == ["full", "delta:2025-10-02T10:00:00.000Z"]
+
+
+def test_failed_first_listing_propagates():
+    class Offline:
+        def iter_pages(self, *args, **kwargs):
+            raise RuntimeError("offline")
+
+    with pytest.raises(RuntimeError):
+        SharedNameIndex().get(DB, Offline)
+    assert _resolver(Offline()).fetch_entity_names("personnages") == {}
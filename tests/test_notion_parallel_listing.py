@@ -0,0 +1,80 @@
+"""Tests unitaires pour le listing concurrent des domaines Notion."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.notion_context_fetcher import NotionContextFetcher
+from config.notion_rate_limiter import RequestPriority, current_priority, notion_priority
+
+DATABASES = {"personnages": "db-perso", "lieux": "db-lieux", "communautes": "db-commu", "objets": None}
+LATENCY = {"db-perso": 0.15, "db-lieux": 0.05, "db-commu": 0.10}
+
+
+@pytest.fixture(autouse=True)
+def sandbox_databases(monkeypatch):
+    monkeypatch.setattr(NotionContextFetcher, "SANDBOX_DATABASES", DATABASES)
+
+
+class SlowClient:
+    def __init__(self, failing: str | None = None) -> None:
+        self.failing = failing
+        self.priorities: List[RequestPriority] = []
+        self.lock = threading.Lock()
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            self.priorities.append(current_priority())
+        time.sleep(LATENCY[database_id])
+        if database_id == self.failing:
+            raise RuntimeError("HTTP 500")
+        return [{"id": f"{database_id}-1", "title": database_id, "last_edited_time": "2025-10-01T10:00:00.000Z"}]
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:  # pragma: no cover - unused
+        return {}
+
+    def retrieve_page_content(self, page_id: str) -> str:  # pragma: no cover - unused
+        return ""
+
+
+def test_domains_are_listed_concurrently_and_streamed_by_completion():
+    fetcher = NotionContextFetcher(client=SlowClient())
+    start = time.monotonic()
+    order = [domain for domain, _ in fetcher.iter_databases()]
+    elapsed = time.monotonic() - start
+
+    assert order == ["objets", "lieux", "communautes", "personnages"]
+    # Sum of latencies is 0.30s; concurrent listing is bounded by the slowest domain
+    assert elapsed < 0.25
+
+
+def test_fetch_all_databases_keeps_declaration_order_and_uses_cache():
+    client = SlowClient()
+    fetcher = NotionContextFetcher(client=client)
+    first = fetcher.fetch_all_databases()
+    assert list(first) == list(DATABASES)
+    assert [p.title for p in first["lieux"]] == ["db-lieux"]
+
+    client.priorities.clear()
+    fetcher.fetch_all_databases()
+    assert client.priorities == []
+
+
+def test_failing_domain_does_not_hide_the_others():
+    fetcher = NotionContextFetcher(client=SlowClient(failing="db-lieux"))
+    received: List[str] = []
+    with pytest.raises(RuntimeError):
+        for domain, _ in fetcher.iter_databases():
+            received.append(domain)
+    assert sorted(received) == ["communautes", "objets", "personnages"]
+
+
+def test_workers_inherit_request_priority():
+    client = SlowClient()
+    with notion_priority(RequestPriority.BACKGROUND):
+        NotionContextFetcher(client=client).fetch_all_databases()
+    assert client.priorities == [RequestPriority.BACKGROUND] * 3
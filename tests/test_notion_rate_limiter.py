@@ -0,0 +1,118 @@
+"""Tests unitaires pour le limiteur de débit Notion partagé."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+
+from config.notion_rate_limiter import (
+    NotionRateLimiter,
+    RateLimitTimeout,
+    RequestPriority,
+    current_priority,
+    notion_priority,
+    parse_retry_after,
+)
+from tests.conftest import FakeResponse
+
+
+def test_burst_is_served_immediately_then_rate_applies():
+    limiter = NotionRateLimiter(rate=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.05
+
+    limiter.acquire()
+    # 4th token needs ~1/20s of refill
+    assert time.monotonic() - start >= 0.04
+    assert limiter.stats.acquired == 4
+
+
+def test_timeout_raises_and_releases_ticket():
+    limiter = NotionRateLimiter(rate=0.5, burst=1)
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.05)
+    assert limiter.snapshot()["waiting"] == 0
+
+
+def test_throttle_pauses_callers_and_halves_rate():
+    limiter = NotionRateLimiter(rate=10, burst=5)
+    assert limiter.observe(FakeResponse(status_code=429, headers={"Retry-After": "0.1"})) is True
+    assert limiter.rate == 5
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+    # Successful responses progressively restore the base rate
+    for _ in range(10):
+        limiter.observe(FakeResponse())
+    assert limiter.rate == 10
+
+
+def test_interactive_requests_go_before_background():
+    limiter = NotionRateLimiter(rate=20, burst=1)
+    limiter.acquire()  # empty the bucket
+    order: List[str] = []
+
+    def worker(name: str, priority: RequestPriority) -> None:
+        limiter.acquire(priority)
+        order.append(name)
+
+    background = [threading.Thread(target=worker, args=(f"bg{i}", RequestPriority.BACKGROUND)) for i in range(3)]
+    for thread in background:
+        thread.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=worker, args=("ui", RequestPriority.INTERACTIVE))
+    interactive.start()
+    for thread in background + [interactive]:
+        thread.join(timeout=2)
+
+    assert order[0] == "ui"
+    assert sorted(order[1:]) == ["bg0", "bg1", "bg2"]
+
+
+def test_priority_context_manager_sets_default_priority():
+    assert current_priority() is RequestPriority.INTERACTIVE
+    with notion_priority(RequestPriority.BACKGROUND):
+        assert current_priority() is RequestPriority.BACKGROUND
+    assert current_priority() is RequestPriority.INTERACTIVE
+
+
+def test_async_acquire_shares_the_bucket():
+    limiter = NotionRateLimiter(rate=50, burst=2)
+
+    async def run() -> float:
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(4)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.03
+    assert limiter.stats.acquired == 4
+
+
+def test_send_retries_on_429():
+    limiter = NotionRateLimiter(rate=1000, burst=10)
+    responses = [FakeResponse(status_code=429, headers={"Retry-After": "0"}), FakeResponse(status_code=429, headers={"Retry-After": "0"}), FakeResponse()]
+    calls: List[int] = []
+
+    def request_fn():
+        calls.append(1)
+        return responses[len(calls) - 1]
+
+    response = limiter.send(request_fn)
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert limiter.stats.throttled == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"Retry-After": "2"}) == 2.0
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after(None) is None
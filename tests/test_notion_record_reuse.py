@@ -0,0 +1,102 @@
+"""Tests unitaires: réutilisation des enregistrements de listing et récupération parallèle."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.notion_context_fetcher import NotionContextFetcher
+
+PERSONNAGES_DB = "db-perso"
+
+
+@pytest.fixture(autouse=True)
+def sandbox_databases(monkeypatch):
+    monkeypatch.setattr(NotionContextFetcher, "SANDBOX_DATABASES", {"personnages": PERSONNAGES_DB})
+
+
+class RecordingClient:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.edited = "2025-10-01T10:00:00.000Z"
+        self.calls: List[str] = []
+        self.lock = threading.Lock()
+
+    def _record(self, page_id: str) -> Dict[str, Any]:
+        return {
+            "id": page_id,
+            "last_edited_time": self.edited,
+            "properties": {"Nom": {"type": "title", "title": [{"plain_text": "Lysandre"}]}},
+        }
+
+    def _log(self, call: str) -> None:
+        with self.lock:
+            self.calls.append(call)
+        time.sleep(self.latency)
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        self._log("list")
+        return [self._record("page-1")]
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        self._log(f"page:{page_id}")
+        return self._record(page_id)
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        self._log(f"content:{page_id}")
+        return f"Cartographe ({self.edited})"
+
+
+def test_preview_of_listed_page_needs_no_network_call():
+    client = RecordingClient()
+    fetcher = NotionContextFetcher(client=client)
+    fetcher.fetch_all_databases()
+    client.calls.clear()
+
+    preview = fetcher.fetch_page_preview("page-1")
+
+    assert preview.title == "Lysandre"
+    assert preview.domain == "personnages"
+    assert client.calls == []
+
+
+def test_full_page_of_listed_page_skips_retrieve_page():
+    client = RecordingClient()
+    fetcher = NotionContextFetcher(client=client)
+    fetcher.fetch_all_databases()
+    client.calls.clear()
+
+    page = fetcher.fetch_page_full("page-1")
+
+    assert page.domain == "personnages"
+    assert client.calls == ["content:page-1"]
+
+
+def test_unknown_page_fetches_metadata_and_content_in_parallel():
+    client = RecordingClient(latency=0.1)
+    start = time.monotonic()
+    page = NotionContextFetcher(client=client).fetch_page_full("page-1")
+    elapsed = time.monotonic() - start
+
+    assert page.content.startswith("Cartographe")
+    assert sorted(client.calls) == ["content:page-1", "page:page-1"]
+    assert elapsed < 0.18
+
+
+def test_newer_listing_invalidates_cached_full_page():
+    client = RecordingClient()
+    fetcher = NotionContextFetcher(client=client)
+    fetcher.fetch_all_databases()
+    fetcher.fetch_page_full("page-1")
+
+    client.edited = "2025-10-03T08:00:00.000Z"
+    fetcher.fetch_all_databases(force_refresh=True)
+    client.calls.clear()
+    page = fetcher.fetch_page_full("page-1")
+
+    assert client.calls == ["content:page-1"]
+    assert page.last_edited == "2025-10-03T08:00:00.000Z"
+    assert "2025-10-03" in page.content
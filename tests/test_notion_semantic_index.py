@@ -0,0 +1,154 @@
+"""Unit tests for the embedding providers and the semantic context index."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from agents.notion_context_fetcher import NotionPagePreview
+from agents.notion_context_index import ContextTokenIndex
+from agents.notion_context_matcher import NotionContextMatcher
+from agents.notion_content_ranker import ContentRanker
+from agents.notion_embeddings import EmbeddingProvider, HashedNgramEmbeddings, create_embedding_provider
+from agents.notion_semantic_index import SemanticIndex
+
+TEXTS = {
+    "carto": "Une cartographe exilée dessine les marées",
+    "guilde": "La guilde de cartographie recense les exils",
+    "foret": "Forêt ancienne peuplée de veilleurs silencieux",
+}
+
+
+class CountingTexts:
+    def __init__(self, texts: Dict[str, str]) -> None:
+        self.texts = texts
+        self.calls: List[str] = []
+
+    def __call__(self, page_id: str) -> str:
+        self.calls.append(page_id)
+        return self.texts[page_id]
+
+
+def _index(tmp_path, **kwargs) -> SemanticIndex:
+    return SemanticIndex(provider=HashedNgramEmbeddings(dimension=128), path=tmp_path / "vectors.npz", **kwargs)
+
+
+def test_hashed_embeddings_are_deterministic_unit_vectors():
+    provider = HashedNgramEmbeddings(dimension=128)
+    vectors = provider.embed(list(TEXTS.values()) + [""])
+
+    assert vectors.shape == (4, 128) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1.0)
+    assert not vectors[3].any()
+    assert np.array_equal(vectors, HashedNgramEmbeddings(dimension=128).embed(list(TEXTS.values()) + [""]))
+    # Shared roots ("cartograph", "exil") without any identical word
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2] + 0.1
+
+
+def test_unknown_provider_falls_back_to_hashed(monkeypatch):
+    monkeypatch.setenv("CONTEXT_EMBEDDINGS_DIM", "64")
+    provider = create_embedding_provider("nope")
+    assert provider.name == "hashed" and provider.dimension == 64
+
+
+def test_provider_without_embed_cannot_be_built():
+    class Nameless(EmbeddingProvider):
+        name = "nameless"
+
+    with pytest.raises(TypeError):
+        Nameless()
+
+
+def test_sync_embeds_only_new_or_edited_pages(tmp_path):
+    index = _index(tmp_path, persist=False)
+    texts = CountingTexts(dict(TEXTS))
+
+    assert index.sync([(page_id, "v1") for page_id in TEXTS], texts) == 3
+    assert index.sync([(page_id, "v1") for page_id in TEXTS], texts) == 0
+
+    texts.texts["foret"] = "Forêt des cartographes exilés"
+    assert index.sync([("carto", "v1"), ("guilde", "v1"), ("foret", "v2")], texts) == 1
+    assert texts.calls == ["carto", "guilde", "foret", "foret"]
+    assert index.version("foret") == "v2" and len(index) == 3
+
+
+def test_search_many_is_a_batched_cosine_top_k(tmp_path):
+    index = _index(tmp_path, persist=False)
+    index.sync([(page_id, "v1") for page_id in TEXTS], TEXTS.__getitem__)
+    queries = ["cartographie des exilés", "veilleurs de la forêt"]
+
+    batched = index.search_many(queries, top_k=2)
+
+    for hits, query in zip(batched, queries):
+        single = index.search(query, top_k=2)
+        assert [page_id for page_id, _ in hits] == [page_id for page_id, _ in single]
+        assert [score for _, score in hits] == pytest.approx([score for _, score in single], rel=1e-5)
+    assert batched[0][0][0] in {"carto", "guilde"} and batched[1][0][0] == "foret"
+    assert all(len(hits) == 2 and hits[0][1] >= hits[1][1] for hits in batched)
+    assert [page_id for page_id, _ in index.search(queries[0], top_k=3, allowed={"foret"})] == ["foret"]
+    assert index.search(queries[1], top_k=3, min_score=0.99) == []
+
+
+def test_index_is_persisted_and_reloaded_without_re_embedding(tmp_path):
+    first = _index(tmp_path, save_delay=0)
+    first.sync([(page_id, "v1") for page_id in TEXTS], TEXTS.__getitem__)
+    assert (tmp_path / "vectors.npz").exists()
+
+    second = _index(tmp_path)
+    texts = CountingTexts(dict(TEXTS))
+    assert second.sync([(page_id, "v1") for page_id in TEXTS], texts) == 0
+    assert texts.calls == []
+    assert second.search("veilleurs", top_k=1)[0][0] == first.search("veilleurs", top_k=1)[0][0] == "foret"
+
+    other_space = SemanticIndex(provider=HashedNgramEmbeddings(dimension=64), path=tmp_path / "vectors.npz", save_delay=0)
+    assert other_space.sync([("carto", "v1")], TEXTS.__getitem__) == 1
+
+
+def test_saves_are_debounced_off_the_sync_path(tmp_path, monkeypatch):
+    index = _index(tmp_path, save_delay=60)
+    saves: List[int] = []
+    monkeypatch.setattr(index, "save", lambda: saves.append(len(index)))
+
+    index.sync([("carto", "v1")], TEXTS.__getitem__)
+    index.sync([("guilde", "v1"), ("foret", "v1")], TEXTS.__getitem__)
+    assert saves == [] and index._save_timer is not None
+
+    index.flush()
+    index.flush()
+    assert saves == [3] and index._save_timer is None
+
+
+def test_remove_keeps_the_remaining_rows_consistent(tmp_path):
+    index = _index(tmp_path, persist=False)
+    index.sync([(page_id, "v1") for page_id in TEXTS], TEXTS.__getitem__)
+
+    index.remove(["carto"])
+
+    assert len(index) == 2 and index.version("carto") is None
+    assert index.search("veilleurs silencieux", top_k=1)[0][0] == "foret"
+    assert {page_id for page_id, _ in index.search("cartographe", top_k=3)} == {"guilde", "foret"}
+
+
+def test_suggest_context_adds_semantic_neighbours(tmp_path):
+    def _preview(page_id: str, title: str, summary: str) -> NotionPagePreview:
+        return NotionPagePreview(
+            id=page_id, title=title, domain="lieux", summary=summary, tags=[], last_edited="v1", token_estimate=10
+        )
+
+    pages = [_preview(f"p{i}", f"Fiche {i}", "Sans rapport aucun") for i in range(10)]
+    pages.append(_preview("guilde", "Hall des Relevés", "La cartographie des exils"))
+    matcher = NotionContextMatcher(
+        fetcher=object(), index=ContextTokenIndex(), ranker=ContentRanker(), semantic=_index(tmp_path, persist=False)
+    )
+
+    brief = "Des cartographes exilés"
+    with_semantic = matcher.suggest_context(brief, max_fiches=3, available_pages=pages, use_full_content=False)
+    without = matcher.suggest_context(
+        brief, max_fiches=3, available_pages=pages, use_full_content=False, use_semantic=False
+    )
+
+    assert with_semantic[0].page.id == "guilde" and 0 < with_semantic[0].score < 0.7
+    assert not with_semantic[0].auto_select
+    assert "guilde" not in [s.page.id for s in without]
@@ -0,0 +1,116 @@
+"""Tests unitaires pour la coalescence des requêtes Notion (single-flight)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+from agents.notion_context_fetcher import NotionContextFetcher
+from config.single_flight import SingleFlight
+
+
+def _run_concurrently(fn, count: int = 8) -> List[Any]:
+    barrier = threading.Barrier(count)
+    results: List[Any] = [None] * count
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            results[index] = fn()
+        except Exception as e:  # collected for assertions
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_single_flight_shares_result_and_errors():
+    flight = SingleFlight()
+    calls: List[int] = []
+
+    def slow() -> str:
+        calls.append(1)
+        time.sleep(0.1)
+        return "ok"
+
+    assert _run_concurrently(lambda: flight.do("k", slow)) == ["ok"] * 8
+    assert len(calls) == 1
+    assert flight.coalesced == 7
+    assert flight.in_flight() == 0
+
+    def failing() -> str:
+        time.sleep(0.05)
+        raise RuntimeError("HTTP 502")
+
+    errors = _run_concurrently(lambda: flight.do("k", failing), count=4)
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    # The key is released: the next call runs again
+    assert flight.do("k", lambda: "again") == "again"
+
+
+class SlowClient:
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+        self.lock = threading.Lock()
+
+    def _log(self, call: str) -> None:
+        with self.lock:
+            self.calls.append(call)
+        time.sleep(0.1)
+
+    def list_pages(self, database_id: str) -> List[Dict[str, Any]]:
+        self._log(f"list:{database_id}")
+        return [{"id": "page-1", "title": "Lysandre", "last_edited_time": "2025-10-01T10:00:00.000Z"}]
+
+    def retrieve_page(self, page_id: str) -> Dict[str, Any]:
+        self._log(f"page:{page_id}")
+        return {"id": page_id, "title": "Lysandre", "last_edited_time": "2025-10-01T10:00:00.000Z"}
+
+    def retrieve_page_content(self, page_id: str) -> str:
+        self._log(f"content:{page_id}")
+        return "Cartographe"
+
+
+def test_concurrent_sessions_share_one_page_fetch():
+    client = SlowClient()
+    # One fetcher per Streamlit session, same process
+    fetchers = [NotionContextFetcher(client=client) for _ in range(8)]
+    counter = iter(range(8))
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            fetcher = fetchers[next(counter)]
+        return fetcher.fetch_page_full("page-1", domain="personnages")
+
+    pages = _run_concurrently(fetch)
+    assert all(page.content == "Cartographe" for page in pages)
+    assert sorted(client.calls) == ["content:page-1", "page:page-1"]
+
+
+def test_concurrent_listings_are_coalesced(monkeypatch):
+    monkeypatch.setattr(NotionContextFetcher, "SANDBOX_DATABASES", {"personnages": "db-perso"})
+    client = SlowClient()
+    results = _run_concurrently(lambda: NotionContextFetcher(client=client).fetch_all_databases(), count=6)
+    assert all([p.title for p in r["personnages"]] == ["Lysandre"] for r in results)
+    assert client.calls == ["list:db-perso"]
+
+
+def test_forced_refresh_does_not_join_a_normal_load():
+    client = SlowClient()
+    fetcher = NotionContextFetcher(client=client)
+    flags = iter([False, True])
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            force_refresh = next(flags)
+        return fetcher.fetch_page_full("page-1", domain="personnages", force_refresh=force_refresh)
+
+    _run_concurrently(fetch, count=2)
+    assert sorted(client.calls) == ["content:page-1", "content:page-1", "page:page-1", "page:page-1"]
@@ -0,0 +1,122 @@
+"""Tests unitaires pour le transport HTTP Notion partagé (pool, timeouts, métriques)."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+from benchmarks.fake_notion_server import FakeNotionServer, build_block_tree
+from config.notion_rate_limiter import NotionRateLimiter
+from config.notion_transport import NOTION_API_URL, NotionTransport
+from tests.conftest import FakeResponse
+
+
+@pytest.fixture
+def server():
+    with FakeNotionServer(build_block_tree(depth=1, fanout=3), latency=0) as fake:
+        yield fake
+
+
+@pytest.fixture
+def transport(server):
+    instance = NotionTransport(
+        base_url=server.base_url,
+        timeout=5,
+        rate_limiter=NotionRateLimiter(rate=1000, burst=1000),
+    )
+    yield instance
+    instance.close()
+
+
+def test_sequential_calls_reuse_one_keep_alive_connection(server, transport):
+    for _ in range(5):
+        response = transport.get("blocks/page-root/children")
+        assert response.status_code == 200
+
+    pools = transport.session.get_adapter(server.base_url).poolmanager.pools
+    assert server.request_count == 5
+    assert [pools[key].num_connections for key in pools.keys()] == [1]
+
+
+def test_relative_urls_target_base_url_and_metrics_are_recorded(server, transport):
+    ok = transport.get("/blocks/page-root/children")
+    missing = transport.get(f"{server.base_url}/blocks/unknown/children")
+
+    assert len(ok.json()["results"]) == 3
+    assert missing.status_code == 404
+    snapshot = transport.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["errors"] == 1
+    assert snapshot["by_status"] == {200: 1, 404: 1}
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        self.calls.append({"method": method, "url": url, **kwargs})
+        raise ConnectionError("offline")
+
+    def close(self) -> None:
+        return None
+
+
+class CountingLimiter:
+    def __init__(self) -> None:
+        self.sent = 0
+
+    def send(self, fn, priority=None, max_retries=3):
+        self.sent += 1
+        return fn()
+
+
+def test_default_timeout_limiter_and_connection_errors():
+    default_limiter = CountingLimiter()
+    private_limiter = CountingLimiter()
+    transport = NotionTransport(timeout=7, rate_limiter=default_limiter)  # type: ignore[arg-type]
+    session = RecordingSession()
+    transport._session = session
+
+    with pytest.raises(ConnectionError):
+        transport.post("pages", json={"a": 1})
+    with pytest.raises(ConnectionError):
+        transport.patch("blocks/b/children", timeout=30, rate_limiter=private_limiter)
+
+    assert [(call["method"], call["url"], call["timeout"]) for call in session.calls] == [
+        ("POST", "https://api.notion.com/v1/pages", 7.0),
+        ("PATCH", "https://api.notion.com/v1/blocks/b/children", 30),
+    ]
+    assert (default_limiter.sent, private_limiter.sent) == (1, 1)
+    assert transport.snapshot()["errors"] == 2
+
+
+class FlakySession:
+    """Répond 502 puis 200 à chaque requête."""
+
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def request(self, method: str, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append(method)
+        return FakeResponse(status_code=502 if len(self.calls) == 1 else 200)
+
+    def close(self) -> None:
+        return None
+
+
+def test_writes_are_never_replayed_after_a_server_error():
+    retry = NotionTransport().session.get_adapter(NOTION_API_URL).max_retries
+    assert retry.is_retry("GET", 502) and not retry.is_retry("POST", 502) and not retry.is_retry("PATCH", 502)
+
+    transport = NotionTransport(rate_limiter=CountingLimiter())  # type: ignore[arg-type]
+    transport.backoff_factor = 0
+    transport._session = FlakySession()
+    assert transport.post("pages", json={}).status_code == 502
+    assert transport._session.calls == ["POST"]
+
+    # Requête de base (POST en lecture seule) : rejouée
+    transport._session = FlakySession()
+    assert transport.post("databases/db/query", json={}, idempotent=True).status_code == 200
+    assert transport._session.calls == ["POST", "POST"]
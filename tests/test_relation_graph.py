@@ -0,0 +1,127 @@
+"""Tests des index d'adjacence et du stockage compact de ``RelationGraph``."""
+
+from __future__ import annotations
+
+import random
+
+from agents.relation_graph import Entity, EntityType, Relation, RelationGraph, RelationType
+
+
+def _random_graph(nodes: int = 200, edges: int = 1500, seed: int = 4) -> RelationGraph:
+    rng = random.Random(seed)
+    graph = RelationGraph()
+    for index in range(nodes):
+        graph.add_entity(Entity(id=f"e{index}", name=f"Entité {index}", type=rng.choice(list(EntityType))))
+    for _ in range(edges):
+        graph.add_relation(
+            Relation(
+                source_id=f"e{rng.randrange(nodes)}",
+                target_id=f"e{rng.randrange(nodes)}",
+                type=rng.choice(list(RelationType)),
+                bidirectional=rng.random() < 0.2,
+            )
+        )
+    return graph
+
+
+def test_indexed_queries_match_linear_scans():
+    graph = _random_graph()
+
+    for entity_id, entity in graph.entities.items():
+        outgoing = [r for r in graph.relations if r.source_id == entity_id]
+        incoming = [r for r in graph.relations if r.target_id == entity_id]
+        assert graph.get_relations_from(entity_id) == outgoing
+        assert graph.get_relations_to(entity_id) == incoming
+        assert graph.degree(entity_id) == len(graph.get_all_relations(entity_id)) == len(outgoing) + len(incoming)
+        assert graph.get_neighbors(entity_id) == {graph.entities[r.target_id] for r in outgoing} | {
+            graph.entities[r.source_id] for r in incoming
+        }
+    for relation_type in RelationType:
+        assert graph.get_relations_by_type(relation_type) == [r for r in graph.relations if r.type == relation_type]
+
+
+def test_stats_counts_every_type():
+    graph = _random_graph()
+    stats = graph.stats()
+
+    assert stats["total_entities"] == 200 and stats["total_relations"] == 1500
+    assert stats["entity_types"] == {
+        entity_type.value: len([e for e in graph.entities.values() if e.type == entity_type]) for entity_type in EntityType
+    }
+    assert sum(stats["relation_types"].values()) == 1500
+    assert stats["avg_connections_per_entity"] == 7.5
+
+
+def test_compact_edge_store_and_missing_entities(capsys):
+    graph = RelationGraph()
+    graph.add_entity(Entity(id="a", name="Lysandre", type=EntityType.CHARACTER))
+    graph.add_entity(Entity(id="b", name="Vallée", type=EntityType.LOCATION))
+    graph.add_relation(Relation(source_id="a", target_id="b", type=RelationType.LIVES_IN))
+    graph.add_relation(Relation(source_id="a", target_id="zz", type=RelationType.VISITS))
+    # Réajouter une entité conserve son id entier et ses arêtes
+    graph.add_entity(Entity(id="a", name="Lysandre Kerlain", type=EntityType.CHARACTER))
+
+    assert "not found" in capsys.readouterr().out
+    assert list(graph._edge_source) == [0] and list(graph._edge_target) == [1]
+    assert graph.out_degree("a") == 1 and graph.in_degree("b") == 1
+    assert graph.degree("zz") == 0 and graph.get_relations_from("zz") == [] and graph.get_neighbors("zz") == set()
+    assert graph.get_neighbors("b") == {graph.entities["a"]}
+    assert graph.stats()["relation_types"][RelationType.LIVES_IN.value] == 1
+
+
+def _chain() -> RelationGraph:
+    """a -> b -> c -> d, e -> b (ALLIED_WITH), hors parcours : z"""
+    graph = RelationGraph()
+    for entity_id in "abcdez":
+        graph.add_entity(Entity(id=entity_id, name=entity_id.upper(), type=EntityType.CHARACTER))
+    for source, target in ("ab", "bc", "cd"):
+        graph.add_relation(Relation(source_id=source, target_id=target, type=RelationType.KNOWS))
+    graph.add_relation(Relation(source_id="e", target_id="b", type=RelationType.ALLIED_WITH))
+    return graph
+
+
+def test_subgraph_follows_directions_and_depth():
+    graph = _chain()
+
+    out = graph.get_subgraph(["b"], depth=1)
+    assert set(out.entities) == {"b", "c"}
+    assert [(r.source_id, r.target_id) for r in out.relations] == [("b", "c")]
+    assert set(graph.get_subgraph(["b"], depth=1, direction="in").entities) == {"b", "a", "e"}
+    assert set(graph.get_subgraph(["b"], depth=2, direction="both").entities) == {"a", "b", "c", "d", "e"}
+    assert set(graph.get_subgraph(["a"], depth=5).entities) == {"a", "b", "c", "d"}
+    assert set(graph.get_subgraph(["b", "unknown"], depth=0).entities) == {"b"}
+
+
+def test_subgraph_filters_budget_and_shared_objects():
+    graph = _chain()
+
+    typed = graph.get_subgraph(["b"], depth=2, direction="both", relation_types=[RelationType.ALLIED_WITH])
+    assert set(typed.entities) == {"b", "e"} and [r.type for r in typed.relations] == [RelationType.ALLIED_WITH]
+
+    limited = graph.get_subgraph(["b"], depth=3, direction="both", max_nodes=3)
+    assert len(limited.entities) == 3 and "d" not in limited.entities
+
+    view = graph.get_subgraph(["a"], depth=1)
+    assert view.entities["a"] is graph.entities["a"] and view.relations[0] is graph.relations[0]
+    assert view.get_relations_from("a") == [graph.relations[0]]
+
+
+def test_subgraph_matches_reference_bfs_on_random_graph():
+    graph = _random_graph(nodes=300, edges=900, seed=8)
+
+    for start in ("e0", "e17", "e150"):
+        for depth in (1, 2, 3):
+            expected, frontier = {start}, {start}
+            for _ in range(depth):
+                frontier = {
+                    other
+                    for r in graph.relations
+                    for node, other in ((r.source_id, r.target_id), (r.target_id, r.source_id))
+                    if node in frontier
+                } - expected
+                expected |= frontier
+            subgraph = graph.get_subgraph([start], depth=depth, direction="both")
+            assert set(subgraph.entities) == expected
+            assert len(subgraph.relations) == sum(
+                1 for r in graph.relations if r.source_id in expected and r.target_id in expected
+            )
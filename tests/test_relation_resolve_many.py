@@ -0,0 +1,85 @@
+"""Tests de la résolution groupée multi-domaines (``resolve_many``)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List
+
+from agents.notion_relation_resolver import NotionRelationResolver
+from config.notion_rate_limiter import RequestPriority, current_priority, notion_priority
+
+DOMAINS: Dict[str, Dict[str, str]] = {
+    "personnages": {"lysandre": "id-lys", "mirelle": "id-mir"},
+    "communautes": {"guilde des cartographes": "id-guilde"},
+    "especes": {"humains": "id-hum"},
+}
+
+
+class SlowResolver(NotionRelationResolver):
+    """Chargement d'index simulé : ``delay`` secondes par domaine."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__(fuzzy_threshold=0.80)
+        self.delay = delay
+        self.loads: List[str] = []
+        self.priorities: List[RequestPriority] = []
+        self._loads_lock = threading.Lock()
+
+    def fetch_entity_names(self, domain: str, force_refresh: bool = False) -> Dict[str, str]:
+        if domain in self.cache and not force_refresh:
+            return self.cache[domain]
+        with self._loads_lock:
+            self.loads.append(domain)
+            self.priorities.append(current_priority())
+        time.sleep(self.delay)
+        entities = DOMAINS.get(domain, {})
+        if entities:
+            self.cache[domain] = entities
+            self.cache_metadata[domain] = {
+                notion_id: {"name": name.title(), "url": ""} for name, notion_id in entities.items()
+            }
+        return entities
+
+
+def test_domain_indexes_load_concurrently():
+    resolver = SlowResolver(delay=0.2)
+
+    start = time.perf_counter()
+    with notion_priority(RequestPriority.BACKGROUND):
+        report = resolver.resolve_many(
+            {"personnages": ["Lysandre"], "communautes": ["Guilde des Cartographes"], "especes": ["Humain"]}
+        )
+    elapsed = time.perf_counter() - start
+
+    assert sorted(resolver.loads) == ["communautes", "especes", "personnages"]
+    assert elapsed < 0.45 and report.load_seconds < 0.45
+    assert resolver.priorities == [RequestPriority.BACKGROUND] * 3
+    assert [match.notion_id for match in report.resolved("especes")] == ["id-hum"]
+    assert report.resolved_count == 3 and report.unresolved_count == 0
+
+
+def test_report_dedupes_by_notion_id_like_resolve_relations():
+    resolver = SlowResolver()
+    names = ["Lysandre", "lysandre", "Inconnu", "Mirelle"]
+
+    report = resolver.resolve_many({"personnages": names})
+
+    assert report.relations["personnages"] == resolver.resolve_relations(names, "personnages")
+    assert report.duplicates["personnages"] == ["lysandre"]
+    assert report.find("personnages", "lysandre").notion_id == "id-lys"
+    assert report.unresolved("personnages") == ["Inconnu"]
+    assert [match.notion_id for match in report.resolved("personnages")] == ["id-lys", "id-mir"]
+
+
+def test_cached_and_unknown_domains():
+    resolver = SlowResolver()
+    resolver.fetch_entity_names("personnages")
+    resolver.loads.clear()
+
+    report = resolver.resolve_many({"personnages": ["Mirelle"], "objets": ["Boussole"], "lieux": []})
+
+    assert resolver.loads == ["objets"]
+    assert report.unavailable == ["objets"]
+    assert report.unresolved("objets") == ["Boussole"]
+    assert "lieux" not in report.relations
@@ -0,0 +1,138 @@
+"""Tests de l'index n-grammes et de la mémoïsation du résolveur de relations."""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from agents import notion_relation_resolver
+from agents.notion_relation_resolver import NameNgramIndex, NotionRelationResolver
+
+ONSETS = ["b", "c", "d", "g", "k", "l", "m", "n", "p", "r", "s", "t", "v", "br", "dr", "gr", "th", "qu", "st"]
+VOWELS = ["a", "e", "i", "o", "u", "ou", "ai", "ei", "au", "y"]
+CODAS = ["", "", "", "n", "r", "l", "s", "nd", "rk", "x"]
+PATTERNS = ["{0}", "{0} {1}", "{0}", "guilde des {0}", "cite de {0}", "ordre du {0}", "{0} le {1}", "humain {0}"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS) for _ in range(rng.randint(1, 3)))
+
+
+def _names(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(rng.choice(PATTERNS).format(_word(rng), _word(rng)))
+    return sorted(names)
+
+
+def _dense_names(count: int, seed: int) -> List[str]:
+    """Alphabet réduit : beaucoup de paires proches sans trigramme commun."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(" ".join("".join(rng.choice("abc") for _ in range(rng.randint(1, 7))) for _ in range(rng.randint(1, 2))))
+    return sorted(names)
+
+
+def _variants(names: List[str], count: int, seed: int) -> List[str]:
+    """Requêtes réalistes : exactes, fautes de frappe, préfixes, mots isolés, inconnues."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.randrange(6)
+        if kind == 0:
+            queries.append(name)
+        elif kind == 1 and len(name) > 3:
+            i = rng.randrange(len(name))
+            queries.append(name[:i] + rng.choice("aeiouxz") + name[i + 1:])
+        elif kind == 2:
+            queries.append(name[: max(1, len(name) // 2)])
+        elif kind == 3:
+            queries.append(rng.choice(name.split()))
+        elif kind == 4:
+            queries.append(name + "s")
+        else:
+            queries.append("".join(rng.choice("bcdfgklmnprst") for _ in range(rng.randint(1, 8))))
+    return queries
+
+
+def _resolver(names: List[str], threshold: float = 0.80) -> NotionRelationResolver:
+    resolver = NotionRelationResolver(fuzzy_threshold=threshold)
+    entities = {name: f"id-{position}" for position, name in enumerate(names)}
+    resolver.cache["lieux"] = entities
+    resolver.cache_metadata["lieux"] = {notion_id: {"name": name, "url": ""} for name, notion_id in entities.items()}
+    return resolver
+
+
+def _linear_match(resolver: NotionRelationResolver, query: str) -> Optional[Tuple[str, float]]:
+    """Parcours complet de référence (comportement historique de find_match)."""
+    normalized = resolver.normalize_name(query)
+    entities: Dict[str, str] = resolver.cache["lieux"]
+    if normalized in entities:
+        return entities[normalized], 1.0
+    best, best_score = None, 0.0
+    for name, notion_id in sorted(entities.items()):
+        score = resolver.calculate_similarity(normalized, name)
+        if score > best_score:
+            best, best_score = notion_id, score
+    return (best, best_score) if best and best_score >= resolver.fuzzy_threshold else None
+
+
+@pytest.mark.parametrize("threshold", [0.80, 0.90, 0.60])
+@pytest.mark.parametrize("make_names", [_names, _dense_names])
+def test_indexed_find_match_equals_linear_scan(make_names, threshold):
+    names = make_names(600, seed=3)
+    resolver = _resolver(names, threshold)
+
+    for query in _variants(names, 150, seed=5):
+        match = resolver.find_match(query, "lieux")
+        expected = _linear_match(resolver, query)
+        assert ((match.notion_id, match.confidence) if match else None) == expected, query
+
+
+def test_shortlist_is_a_fraction_of_the_domain():
+    names = _names(3000, seed=7)
+    index = NameNgramIndex(names)
+    sizes = []
+    for query in _variants(names, 200, seed=9):
+        if len(query) >= 3:
+            partial, bounds = index.shortlist(query, 0.80)
+            sizes.append(len(partial | set(bounds)))
+
+    assert index.names == sorted(names)
+    assert sum(sizes) / len(sizes) < len(names) / 10
+
+
+def test_substring_candidates_without_shared_trigram():
+    index = NameNgramIndex(["ab", "bardin kerlain", "velor", "ki le girst"])
+    # "ab" est préfixe de "abc" sans trigramme commun
+    assert index.best("abc", 0.80)[0] == "ab"
+    # "koi" / "ki" : premiers mots à 0.80 (score 0.85) sans trigramme commun
+    assert index.best("koi", 0.80) == ("ki le girst", 0.85)
+    assert index.best("zzz", 0.80) == (None, 0.0)
+
+
+def test_similarity_is_memoised():
+    resolver = _resolver(["bardin kerlain", "velor"])
+    notion_relation_resolver._similarity.cache_clear()
+
+    resolver.find_match("bardin kerlan", "lieux")
+    misses = notion_relation_resolver._similarity.cache_info().misses
+    resolver.find_match("bardin kerlan", "lieux")
+
+    info = notion_relation_resolver._similarity.cache_info()
+    assert info.misses == misses and info.hits >= misses
+
+
+def test_name_index_is_rebuilt_when_entities_change():
+    resolver = _resolver(["bardin kerlain"])
+    first = resolver.name_index("lieux", resolver.cache["lieux"])
+    assert resolver.name_index("lieux", resolver.cache["lieux"]) is first
+
+    resolver.cache["lieux"] = {"velor": "id-9"}
+    resolver.cache_metadata["lieux"] = {"id-9": {"name": "Velor", "url": ""}}
+    assert resolver.find_match("velors", "lieux").notion_id == "id-9"